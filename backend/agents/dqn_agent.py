@@ -1,9 +1,77 @@
 import os
+import threading
 import torch  #type: ignore
 import torch.nn as nn  #type: ignore
 import torch.optim as optim  #type: ignore
 import numpy as np
+from typing import Optional, Sequence
 from core.base_agent import BaseAgent
+from agents.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from agents.inference_backends import InferenceBackend, create_backend, INFERENCE_BACKENDS
+from core.checkpoint_writer import get_checkpoint_writer
+
+
+# Widths of the hidden layers of the Q-network
+DEFAULT_HIDDEN_SIZES = (128, 128)
+
+
+def build_q_network(
+    state_size: int, num_actions: int, hidden_sizes: Sequence[int] = DEFAULT_HIDDEN_SIZES
+) -> nn.Module:
+    """
+    Build the multilayer perceptron used to estimate Q-values.
+
+    Args:
+        state_size (int): Size of the input state.
+        num_actions (int): Number of actions.
+        hidden_sizes (Sequence[int]): Width of each hidden layer.
+
+    Returns:
+        nn.Module: The Q-network.
+    """
+    layers = []
+    for width in hidden_sizes:
+        layers += [nn.Linear(state_size, width), nn.ReLU()]
+        state_size = width
+    return nn.Sequential(*layers, nn.Linear(state_size, num_actions))
+
+
+def load_q_network(state_size: int, num_actions: int, path: str) -> nn.Module:
+    """
+    Load a Q-network checkpoint for inference, with the layer widths stored in the checkpoint.
+
+    Args:
+        state_size (int): Size of the input state.
+        num_actions (int): Number of actions.
+        path (str): Path of the checkpoint file.
+
+    Returns:
+        nn.Module: The Q-network on the CPU, in evaluation mode.
+    """
+    state_dict = torch.load(path, map_location="cpu")
+    hidden_sizes = [weight.shape[0] for name, weight in state_dict.items() if name.endswith("weight")][:-1]
+    model = build_q_network(state_size, num_actions, hidden_sizes)
+    model.load_state_dict(state_dict)
+    return model.eval()
+
+
+def load_inference_backend(
+    backend: str, num_threads: Optional[int], state_size: int, num_actions: int, path: str
+) -> InferenceBackend:
+    """
+    Load a Q-network checkpoint into an inference backend.
+
+    Args:
+        backend (str): One of INFERENCE_BACKENDS.
+        num_threads (Optional[int]): Threads used by the backend.
+        state_size (int): Size of the input state.
+        num_actions (int): Number of actions.
+        path (str): Path of the checkpoint file.
+
+    Returns:
+        InferenceBackend: The backend.
+    """
+    return create_backend(backend, load_q_network(state_size, num_actions, path), state_size, num_threads)
 
 
 class DQNAgent(BaseAgent):
@@ -12,7 +80,12 @@ class DQNAgent(BaseAgent):
     """
     def __init__(
         self, learning_rate: float = 0.001, gamma: float = 0.99,
-        epsilon: float = 1.0, epsilon_decay: float = 0.995, epsilon_min: float = 0.01
+        epsilon: float = 1.0, epsilon_decay: float = 0.995, epsilon_min: float = 0.01,
+        buffer_capacity: int = 100_000, batch_size: int = 64,
+        train_freq: int = 4, learning_starts: int = 1_000,
+        prioritized_replay: bool = False, per_alpha: float = 0.6, per_beta: float = 0.4,
+        inference_backend: str = "eager", inference_threads: Optional[int] = None,
+        hidden_sizes: Sequence[int] = DEFAULT_HIDDEN_SIZES, load_model: bool = True
     ):
         """
         Initialize the DQNAgent.
@@ -23,13 +96,46 @@ class DQNAgent(BaseAgent):
             epsilon (float): Initial exploration rate.
             epsilon_decay (float): Decay rate for exploration.
             epsilon_min (float): Minimum exploration rate.
+            buffer_capacity (int): Number of transitions kept in the replay buffer.
+            batch_size (int): Minibatch size for each gradient step.
+            train_freq (int): Number of transitions collected between gradient steps.
+            learning_starts (int): Transitions collected before training begins.
+            prioritized_replay (bool): Sample transitions proportionally to their TD error.
+            per_alpha (float): Prioritization exponent for prioritized replay.
+            per_beta (float): Initial importance-sampling exponent for prioritized replay.
+            inference_backend (str): Backend of greedy inference, one of INFERENCE_BACKENDS.
+            inference_threads (Optional[int]): Threads used by the inference backend, the process setting if None.
+            hidden_sizes (Sequence[int]): Width of each hidden layer of the Q-network.
+            load_model (bool): Start from the saved model of the game when the agent is initialized.
         """
+        if inference_backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend '{inference_backend}'")
         super().__init__(num_actions=None)
         self.learning_rate = learning_rate
         self.gamma = gamma
         self.epsilon = epsilon
         self.epsilon_decay = epsilon_decay
         self.epsilon_min = epsilon_min
+        self.buffer_capacity = buffer_capacity
+        self.batch_size = batch_size
+        self.train_freq = train_freq
+        self.learning_starts = learning_starts
+        self.prioritized_replay = prioritized_replay
+        self.per_alpha = per_alpha
+        self.per_beta = per_beta
+        self.num_steps = 0
+        self.num_updates = 0
+        self.last_loss = None
+        self.inference_backend = inference_backend
+        self.inference_threads = inference_threads
+        self.hidden_sizes = tuple(hidden_sizes)
+        self.load_model = load_model
+        # Incremented whenever the weights change, so inference backends know when to re-export them
+        self.weights_version = 0
+        # Held while the weights are overwritten from a training process, and by the eager backend reading them
+        self.weights_lock = threading.Lock()
+        self._backend = None
+        self._backend_weights = None
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.initialized = False
 
@@ -44,22 +150,62 @@ class DQNAgent(BaseAgent):
         self.env = env
         self.num_actions = env.get_num_actions()
         self.state_size = getattr(env, "state_size", len(env.get_state()))
-        self.filename = os.path.join("models", f"dqn_model_{game}.pth")
-
-        self.model = nn.Sequential(
-            nn.Linear(self.state_size, 128),
-            nn.ReLU(),
-            nn.Linear(128, 128),
-            nn.ReLU(),
-            nn.Linear(128, self.num_actions)
-        )
+        # Each observation mode has its own input size, hence its own model file
+        mode = getattr(env, "observation_mode", None)
+        suffix = f"_{mode}" if mode not in (None, "coords", "absolute") else ""
+        self.filename = os.path.join("models", f"dqn_model_{game}{suffix}.pth")
+        self.metric_labels = (game, game)
+
+        self.model = build_q_network(self.state_size, self.num_actions, self.hidden_sizes)
 
-        self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
+        self.optimizer = self._build_optimizer()
         self.criterion = nn.MSELoss()
+        if self.prioritized_replay:
+            self.memory = PrioritizedReplayBuffer(
+                self.buffer_capacity, self.state_size, alpha=self.per_alpha, beta=self.per_beta
+            )
+        else:
+            self.memory = ReplayBuffer(self.buffer_capacity, self.state_size)
         self.model.to(self.device)
-        self._load_model()
+        self._allocate_buffers()
+        if self.load_model:
+            self._load_model()
         self.initialized = True
 
+    def _build_optimizer(self) -> optim.Optimizer:
+        """
+        Build the Adam optimizer, using the fused kernel when this torch build supports it.
+
+        The fused kernel updates all parameters in one pass, with far fewer
+        temporary tensors per gradient step than the per-parameter loop.
+
+        Returns:
+            optim.Optimizer: The optimizer.
+        """
+        try:
+            return optim.Adam(self.model.parameters(), lr=self.learning_rate, fused=True)
+        except (RuntimeError, TypeError):
+            return optim.Adam(self.model.parameters(), lr=self.learning_rate)
+
+    def _allocate_buffers(self) -> None:
+        """
+        Allocate the reusable float32 buffers of the hot path.
+
+        The NumPy arrays and the CPU tensors share memory through `torch.from_numpy`,
+        so filling an array needs no tensor allocation.
+        """
+        self._state_input = np.zeros((1, self.state_size), dtype=np.float32)
+        self._state_tensor = torch.from_numpy(self._state_input)
+        self._batch = (
+            np.zeros((self.batch_size, self.state_size), dtype=np.float32),
+            np.zeros(self.batch_size, dtype=np.int64),
+            np.zeros(self.batch_size, dtype=np.float32),
+            np.zeros((self.batch_size, self.state_size), dtype=np.float32),
+            np.zeros(self.batch_size, dtype=np.float32),
+        )
+        self._batch_tensors = tuple(torch.from_numpy(array) for array in self._batch)
+        self.last_q_values = None
+
     def train(self, num_episodes: int) -> None:
         """
         Train the agent for a specified number of episodes.
@@ -69,32 +215,68 @@ class DQNAgent(BaseAgent):
         """
         for episode in range(num_episodes):
             state = self.env.reset()
-            state = torch.FloatTensor(state).to(self.device)
             done = False
             total_reward = 0
 
             while not done:
                 action = self.get_action(state)
-                next_state, reward, done, _ = self.env.step(action)
-                next_state = torch.FloatTensor(next_state).to(self.device)
-                target = reward + (1 - done) * self.gamma * torch.max(self.model(next_state).detach())
-                prediction = self.model(state)[action]
-                loss = self.criterion(prediction, target)
-                self.optimizer.zero_grad()
-                loss.backward()
-                self.optimizer.step()
+                next_state, reward, done = self.env.step(action)
+                self.update(state, action, reward, next_state, done)
                 state = next_state
                 total_reward += reward
 
-            self.epsilon = max(self.epsilon * self.epsilon_decay, self.epsilon_min)
+            self.decay_epsilon()
             print(f"Episode {episode + 1}/{num_episodes} - Reward: {total_reward:.2f}")
 
-    def get_action(self, state: torch.Tensor, is_inferencing: bool = False) -> int:
+    def decay_epsilon(self) -> None:
+        """
+        Decay the exploration rate at the end of an episode.
+        """
+        self.epsilon = max(self.epsilon * self.epsilon_decay, self.epsilon_min)
+
+    def set_inference_backend(self, name: str, num_threads: Optional[int] = None) -> None:
+        """
+        Select the backend used for greedy actions during inference.
+
+        Args:
+            name (str): One of INFERENCE_BACKENDS.
+            num_threads (Optional[int]): Threads used by the backend, the process setting if None.
+        """
+        if name not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend '{name}', expected one of {', '.join(INFERENCE_BACKENDS)}")
+        self.inference_backend = name
+        self.inference_threads = num_threads
+        self._backend = None
+
+    def get_inference_backend(self) -> InferenceBackend:
+        """
+        Get the inference backend, re-exporting the network if `weights_version` changed since the last export.
+
+        Returns:
+            InferenceBackend: The backend, in sync with the network.
+        """
+        weights = self.weights_version
+        if self._backend is None:
+            with self.weights_lock:
+                self._backend = create_backend(
+                    self.inference_backend, self.model, self.state_size, self.inference_threads, self.weights_lock
+                )
+        elif weights != self._backend_weights:
+            with self.weights_lock:
+                self._backend.sync(self.model)
+        self._backend_weights = weights
+        return self._backend
+
+    def get_action(self, state, is_inferencing: bool = False) -> int:
         """
         Select an action using an epsilon-greedy policy.
 
+        During inference greedy actions come from the selected inference
+        backend. Otherwise the Q-values of greedy selections are kept in
+        `last_q_values`, so callers can read them without a second forward pass.
+
         Args:
-            state (torch.Tensor): The current state.
+            state: The current state, as an array or tensor.
             is_inferencing (bool): Use a lower epsilon value during inference.
 
         Returns:
@@ -103,33 +285,83 @@ class DQNAgent(BaseAgent):
         epsilon = self.epsilon if not is_inferencing else self.epsilon_min
         if np.random.rand() < epsilon:
             return np.random.randint(0, self.num_actions)
+        if is_inferencing:
+            return self.get_inference_backend().act(state)
 
-        with torch.no_grad():
-            state = state.unsqueeze(0).to(self.device)
-            q_values = self.model(state)
-            return torch.argmax(q_values).item()
+        # Copy into the shared input buffer instead of building a new tensor
+        self._state_input[0] = state
+        with torch.inference_mode():
+            q_values = self.model(self._state_tensor.to(self.device))[0]
+        self.last_q_values = q_values
+        return int(q_values.argmax())
+
+    def get_actions(self, states: np.ndarray, is_inferencing: bool = False) -> np.ndarray:
+        """
+        Select one action per state with a single batched forward pass.
 
-    def update(self, state, action: int, reward: float, next_state) -> None:
+        Args:
+            states (np.ndarray): Array of shape (batch, state_size).
+            is_inferencing (bool): Use a lower epsilon value during inference.
+
+        Returns:
+            np.ndarray: Selected actions.
         """
-        Update the model based on the observed transition.
+        epsilon = self.epsilon if not is_inferencing else self.epsilon_min
+        if is_inferencing:
+            actions = self.get_inference_backend().actions(states)
+        else:
+            with torch.inference_mode():
+                batch = torch.as_tensor(states, dtype=torch.float32, device=self.device)
+                actions = torch.argmax(self.model(batch), dim=1).cpu().numpy()
+        explore = np.random.rand(len(actions)) < epsilon
+        actions[explore] = np.random.randint(0, self.num_actions, size=int(explore.sum()))
+        return actions
+
+    def update(self, state, action: int, reward: float, next_state, done: bool = False) -> None:
+        """
+        Store the observed transition and train on a replay minibatch every `train_freq` steps.
 
         Args:
             state: Current state.
             action (int): Action taken.
             reward (float): Reward received.
             next_state: Next state.
+            done (bool): Whether the episode ended on this transition.
         """
-        state = torch.FloatTensor(state).to(self.device)
-        next_state = torch.FloatTensor(next_state).to(self.device)
-        reward = torch.FloatTensor([reward]).to(self.device)
+        self.memory.add(state, action, reward, next_state, done)
+        self.num_steps += 1
+        if (len(self.memory) >= max(self.batch_size, self.learning_starts)
+                and self.num_steps % self.train_freq == 0):
+            self._train_step()
 
-        target = reward + self.gamma * torch.max(self.model(next_state).detach())
-        prediction = self.model(state)[action]
+    def _train_step(self) -> None:
+        """
+        Run one gradient step on a minibatch sampled from the replay buffer.
+        """
+        # The minibatch is gathered into the preallocated arrays behind `_batch_tensors`
+        batch = self.memory.sample(self.batch_size, out=self._batch)
+        states, actions, rewards, next_states, dones = (
+            tensor.to(self.device, non_blocking=True) for tensor in self._batch_tensors
+        )
+
+        with torch.no_grad():
+            next_q = self.model(next_states).max(dim=1).values
+            target = rewards + self.gamma * (1 - dones) * next_q
+        prediction = self.model(states).gather(1, actions.unsqueeze(1)).squeeze(1)
 
-        loss = self.criterion(prediction, target)
+        if self.prioritized_replay:
+            indices, weights = batch[5], torch.from_numpy(batch[6]).to(self.device)
+            td_errors = prediction - target
+            loss = (weights * td_errors.pow(2)).mean()
+            self.memory.update_priorities(indices, td_errors.detach().cpu().numpy())
+        else:
+            loss = self.criterion(prediction, target)
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
+        self.num_updates += 1
+        self.weights_version += 1
+        self.last_loss = loss.item()
 
     def _load_model(self) -> None:
         """
@@ -138,15 +370,28 @@ class DQNAgent(BaseAgent):
         if os.path.exists(self.filename):
             try:
                 self.model.load_state_dict(torch.load(self.filename))
+                self.weights_version += 1
                 print(f"✅ Model loaded from '{self.filename}'.")
             except Exception as e:
                 print(f"❌ Error loading model: {e}")
         else:
             print(f"No existing model found at '{self.filename}'.")
 
-    def save_model(self) -> None:
+    def save_model(self):
         """
-        Save the model state to file.
+        Save the model state to file in the background.
+
+        The weights are copied synchronously; serialization and the atomic,
+        versioned write happen on the checkpoint writer thread.
+
+        Returns:
+            Future: Resolves to the checkpoint version once written.
         """
-        torch.save(self.model.state_dict(), self.filename)
-        print(f"✅ Model saved to '{self.filename}'.")
+        state_dict = {k: v.detach().to("cpu", copy=True) for k, v in self.model.state_dict().items()}
+        filename = self.filename
+        future = get_checkpoint_writer().submit(filename, lambda f: torch.save(state_dict, f), self.metric_labels)
+        future.add_done_callback(lambda done: print(
+            f"✅ Model saved to '{filename}' (version {done.result()})." if done.exception() is None
+            else f"❌ Error saving model: {done.exception()}"
+        ))
+        return future
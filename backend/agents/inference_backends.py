@@ -0,0 +1,304 @@
+import copy
+import time
+import warnings
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+import numpy as np
+import torch  #type: ignore
+import torch.nn as nn  #type: ignore
+from typing import Optional
+
+try:
+    from threadpoolctl import threadpool_limits  #type: ignore
+except ImportError:
+    threadpool_limits = None
+
+
+class InferenceBackend(ABC):
+    """
+    Greedy action selection with a Q-network exported for CPU inference.
+
+    Backends other than "eager" work on a converted copy of the weights and
+    must be rebuilt with `sync` when the network is trained or reloaded.
+    `num_threads` applies to this backend's forward passes only: the previous
+    thread count is restored after each call.
+    """
+    name = "base"
+
+    def __init__(self, model: nn.Module, state_size: int, num_threads: Optional[int] = None, lock=None) -> None:
+        """
+        Export the network.
+
+        Args:
+            model (nn.Module): The Q-network.
+            state_size (int): Size of the input state.
+            num_threads (Optional[int]): Threads used by the forward pass, the process setting if None.
+            lock: Lock held by writers of the network's weights; backends reading it live take it too.
+        """
+        self.state_size = state_size
+        self.num_threads = num_threads
+        self.lock = lock if lock is not None else nullcontext()
+        self._input = np.zeros((1, state_size), dtype=np.float32)
+        self.sync(model)
+
+    @abstractmethod
+    def sync(self, model: nn.Module) -> None:
+        """
+        Rebuild the backend from the current weights of the network.
+
+        Args:
+            model (nn.Module): The Q-network.
+        """
+        pass
+
+    @abstractmethod
+    def q_values(self, states: np.ndarray) -> np.ndarray:
+        """
+        Compute the Q-values of a batch of states.
+
+        Args:
+            states (np.ndarray): Array of shape (batch, state_size).
+
+        Returns:
+            np.ndarray: Array of shape (batch, num_actions).
+        """
+        pass
+
+    def act(self, state) -> int:
+        """
+        Select the greedy action of a single state.
+
+        Args:
+            state: The state.
+
+        Returns:
+            int: The action.
+        """
+        self._input[0] = state
+        return int(self.q_values(self._input)[0].argmax())
+
+    def actions(self, states: np.ndarray) -> np.ndarray:
+        return self.q_values(np.asarray(states, dtype=np.float32)).argmax(axis=1)
+
+
+class _TorchBackend(InferenceBackend):
+    """
+    Base class of the backends running a torch module on the CPU.
+    """
+    def __init__(self, model: nn.Module, state_size: int, num_threads: Optional[int] = None, lock=None) -> None:
+        super().__init__(model, state_size, num_threads, lock)
+        self._input_tensor = torch.from_numpy(self._input)
+
+    def _forward(self, batch: torch.Tensor) -> torch.Tensor:
+        previous = torch.get_num_threads()
+        if self.num_threads and previous != self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        try:
+            with torch.inference_mode():
+                return self.module(batch)
+        finally:
+            if self.num_threads and previous != self.num_threads:
+                torch.set_num_threads(previous)
+
+    def q_values(self, states: np.ndarray) -> np.ndarray:
+        return self._forward(torch.as_tensor(states, dtype=torch.float32)).numpy()
+
+    def act(self, state) -> int:
+        self._input[0] = state
+        return int(self._forward(self._input_tensor)[0].argmax())
+
+
+class EagerBackend(_TorchBackend):
+    """
+    The network itself, run eagerly on the CPU; follows training without syncing when it lives on the CPU.
+    """
+    name = "eager"
+
+    def sync(self, model: nn.Module) -> None:
+        self.module = model if next(model.parameters()).device.type == "cpu" else _cpu_copy(model)
+
+    def _forward(self, batch: torch.Tensor) -> torch.Tensor:
+        # The module may be the live network, whose weights can be rewritten from another thread
+        with self.lock:
+            return super()._forward(batch)
+
+
+class TorchScriptBackend(_TorchBackend):
+    """
+    A traced and frozen TorchScript module: the weights become constants of a
+    fused graph, which removes most of the Python dispatch of nn.Sequential.
+    """
+    name = "torchscript"
+
+    def sync(self, model: nn.Module) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # torch.jit is deprecated in recent versions but still the fastest CPU path
+            traced = torch.jit.trace(_cpu_copy(model), torch.zeros(1, self.state_size))
+            self.module = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+
+class QuantizedBackend(_TorchBackend):
+    """
+    Linear layers dynamically quantized to int8 weights, with activations quantized on the fly.
+    """
+    name = "quantized"
+
+    def sync(self, model: nn.Module) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.module = torch.ao.quantization.quantize_dynamic(_cpu_copy(model), {nn.Linear}, dtype=torch.qint8)
+
+
+class NumpyBackend(InferenceBackend):
+    """
+    The MLP evaluated with NumPy matmuls on weights exported from the state_dict.
+
+    Single-state calls write every activation into preallocated buffers, so an
+    action costs three small matmuls and no allocation.
+    """
+    name = "numpy"
+
+    def sync(self, model: nn.Module) -> None:
+        self.layers = []
+        relu = False
+        for module in reversed(list(model.children())):
+            if isinstance(module, nn.ReLU):
+                relu = True
+            elif isinstance(module, nn.Linear):
+                weight = module.weight.detach().cpu().numpy().T.astype(np.float32, order="C")
+                bias = module.bias.detach().cpu().numpy().astype(np.float32)
+                self.layers.append((weight, bias, relu))
+                relu = False
+            else:
+                raise ValueError(f"Unsupported layer {type(module).__name__} for the NumPy backend")
+        self.layers.reverse()
+        self._buffers = [np.zeros((1, weight.shape[1]), dtype=np.float32) for weight, _, _ in self.layers]
+
+    def q_values(self, states: np.ndarray) -> np.ndarray:
+        if threadpool_limits is not None and self.num_threads:
+            with threadpool_limits(self.num_threads):
+                return self._forward(states)
+        return self._forward(states)
+
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        for weight, bias, relu in self.layers:
+            x = x @ weight
+            x += bias
+            if relu:
+                np.maximum(x, 0, out=x)
+        return x
+
+    def act(self, state) -> int:
+        if threadpool_limits is not None and self.num_threads:
+            self._input[0] = state
+            return int(self.q_values(self._input)[0].argmax())
+        x = self._input
+        x[0] = state
+        for (weight, bias, relu), out in zip(self.layers, self._buffers):
+            np.matmul(x, weight, out=out)
+            out += bias
+            if relu:
+                np.maximum(out, 0, out=out)
+            x = out
+        return int(x[0].argmax())
+
+
+INFERENCE_BACKENDS = {
+    backend.name: backend for backend in (EagerBackend, TorchScriptBackend, QuantizedBackend, NumpyBackend)
+}
+
+
+def create_backend(
+    name: str, model: nn.Module, state_size: int, num_threads: Optional[int] = None, lock=None
+) -> InferenceBackend:
+    """
+    Build an inference backend by name.
+
+    Args:
+        name (str): One of INFERENCE_BACKENDS.
+        model (nn.Module): The Q-network.
+        state_size (int): Size of the input state.
+        num_threads (Optional[int]): Threads used by the forward pass.
+        lock: Lock held by writers of the network's weights.
+
+    Returns:
+        InferenceBackend: The backend.
+    """
+    if name not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}', expected one of {', '.join(INFERENCE_BACKENDS)}")
+    return INFERENCE_BACKENDS[name](model, state_size, num_threads, lock)
+
+
+def compare_backends(
+    model: nn.Module, state_size: int, num_threads: Optional[int] = None, duration: float = 0.2,
+    batch_size: int = 64
+) -> dict:
+    """
+    Measure every backend on random states and check that it agrees with the network.
+
+    Args:
+        model (nn.Module): The Q-network.
+        state_size (int): Size of the input state.
+        num_threads (Optional[int]): Threads used by the forward passes.
+        duration (float): Seconds measured per backend and call type.
+        batch_size (int): Batch size of the batched measurement.
+
+    Returns:
+        dict: Per backend, the latency of one action and of a batch in microseconds,
+            and the fraction of states where its greedy action matches the eager network.
+    """
+    rng = np.random.default_rng(0)
+    states = rng.standard_normal((batch_size, state_size)).astype(np.float32)
+    with torch.inference_mode():
+        reference = _cpu_copy(model)(torch.from_numpy(states)).argmax(dim=1).numpy()
+
+    results = {}
+    for name in INFERENCE_BACKENDS:
+        try:
+            backend = create_backend(name, model, state_size, num_threads)
+        except Exception as e:
+            results[name] = {"error": str(e)}
+            continue
+        results[name] = {
+            "action_us": _latency(lambda: backend.act(states[0]), duration),
+            "batch_us": _latency(lambda: backend.actions(states), duration),
+            "agreement": float(np.mean(backend.actions(states) == reference)),
+        }
+    return results
+
+
+def fastest_backend(results: dict) -> str:
+    """
+    Pick the backend with the lowest single-action latency among those that agree with the network.
+
+    Args:
+        results (dict): Output of `compare_backends`.
+
+    Returns:
+        str: The backend name.
+    """
+    candidates = {
+        name: result["action_us"] for name, result in results.items()
+        if "error" not in result and result["agreement"] >= 0.95
+    }
+    return min(candidates, key=candidates.get) if candidates else "eager"
+
+
+def _latency(fn, duration: float) -> float:
+    fn()  # Warm up
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(50):
+            fn()
+        calls += 50
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return elapsed / calls * 1e6
+
+
+def _cpu_copy(model: nn.Module) -> nn.Module:
+    """
+    Copy a network to the CPU in evaluation mode, leaving the original untouched.
+    """
+    return copy.deepcopy(model).cpu().eval()
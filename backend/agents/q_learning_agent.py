@@ -1,17 +1,38 @@
 import os
 import numpy as np
+from typing import Callable, Optional
 from core.base_agent import BaseAgent
+from core.checkpoint_writer import get_checkpoint_writer
+from agents.q_table import QTable, RoundingDiscretizer
 
 
 class QLearningAgent(BaseAgent):
     """
     Q-Learning agent implementation.
+
+    Observations are discretized into integer keys, mapped to dense rows of a
+    contiguous float32 Q-table, and updated in vectorized batches, so the
+    agent can learn from several environments at once.
     """
-    def __init__(self):
+    def __init__(
+        self, discretizer: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        max_states: Optional[int] = None, memory_budget_mb: Optional[float] = None, load_model: bool = True
+    ):
         """
         Initialize the QLearningAgent.
+
+        Args:
+            discretizer (Optional[Callable]): Maps a batch of observations to integer keys,
+                defaults to rounding every feature.
+            max_states (Optional[int]): Maximum number of states kept in the Q-table.
+            memory_budget_mb (Optional[float]): Memory budget of the Q-table, used to derive
+                `max_states` from the state size once the environment is known.
+            load_model (bool): Start from the saved Q-table, read when the agent is first initialized.
         """
-        self.q_table = {}
+        self.discretizer = discretizer or RoundingDiscretizer()
+        self.max_states = max_states
+        self.memory_budget_mb = memory_budget_mb
+        self.q_table = None
         self.alpha = 0.1
         self.gamma = 0.99
         self.epsilon = 0.1
@@ -19,17 +40,30 @@ class QLearningAgent(BaseAgent):
         self.epsilon_min = 0.01
         self.inference_epsilon = 0.01
         self.filename = os.path.join("models", "q_learning_model.npy")
+        self.metric_labels = ("", "q_learning")
         self.initialized = False
-        self._load_model()
+        self.load_model = load_model
 
     def initialize(self, env) -> None:
         """
         Initialize the agent with the environment.
 
         Args:
-            env: The environment instance with attribute `num_actions`.
+            env: The environment instance.
         """
-        self.num_actions = env.num_actions
+        self.num_actions = getattr(env, "num_actions", None) or env.get_num_actions()
+        if self.memory_budget_mb is not None:
+            state = np.asarray(env.get_state())
+            key_size = self.discretizer(state.reshape(-1, state.shape[-1])[:1]).shape[1]
+            budget = QTable.states_for_budget(int(self.memory_budget_mb * 2 ** 20), key_size, self.num_actions)
+            self.max_states = min(self.max_states or budget, budget)
+        if self.load_model:
+            self.load_model = False
+            self._load_model()
+        if self.q_table is None or self.q_table.num_actions != self.num_actions:
+            self.q_table = QTable(self.num_actions, max_states=self.max_states)
+        elif self.q_table.max_states != self.max_states:
+            self.q_table = QTable.from_records(self.q_table.to_records(), max_states=self.max_states)
         self.initialized = True
 
     def get_action(self, state, is_inferencing: bool = False) -> int:
@@ -43,19 +77,31 @@ class QLearningAgent(BaseAgent):
         Returns:
             int: Selected action.
         """
-        if state not in self.q_table:
-            self.q_table[state] = np.zeros(self.num_actions)
+        return int(self.get_actions(np.asarray(state)[None], is_inferencing)[0])
 
-        epsilon = self.inference_epsilon if is_inferencing else self.epsilon
-        if np.random.uniform(0, 1) < epsilon:
-            return np.random.randint(0, self.num_actions)
+    def get_actions(self, states: np.ndarray, is_inferencing: bool = False) -> np.ndarray:
+        """
+        Choose one action per state using an epsilon-greedy policy.
 
-        if np.all(self.q_table[state] == self.q_table[state][0]):
-            return np.random.randint(0, self.num_actions)
+        Unknown states and states whose Q-values are all equal get a random action.
 
-        return int(np.argmax(self.q_table[state]))
+        Args:
+            states (np.ndarray): Array of shape (batch, state_size).
+            is_inferencing (bool): Whether the agent is in inference mode.
 
-    def update(self, state, action: int, reward: float, next_state) -> None:
+        Returns:
+            np.ndarray: Selected actions.
+        """
+        rows = self.q_table.lookup(self.discretizer(states))
+        q_values = self.q_table.q_values(np.maximum(rows, 0))
+        actions = np.argmax(q_values, axis=1)
+
+        epsilon = self.inference_epsilon if is_inferencing else self.epsilon
+        explore = (np.random.rand(len(rows)) < epsilon) | (rows < 0) | np.all(q_values == q_values[:, :1], axis=1)
+        actions[explore] = np.random.randint(0, self.num_actions, size=int(explore.sum()))
+        return actions
+
+    def update(self, state, action: int, reward: float, next_state, done: bool = False) -> None:
         """
         Update the Q-table based on the transition.
 
@@ -64,44 +110,92 @@ class QLearningAgent(BaseAgent):
             action (int): Action taken.
             reward (float): Reward received.
             next_state: Next state.
+            done (bool): Whether the episode ended on this transition.
         """
-        if state not in self.q_table:
-            self.q_table[state] = np.random.uniform(low=-0.01, high=0.01, size=self.num_actions)
-        if next_state not in self.q_table:
-            self.q_table[next_state] = np.random.uniform(low=-0.01, high=0.01, size=self.num_actions)
-
-        if np.all(self.q_table[next_state] == self.q_table[next_state][0]):
-            self.q_table[next_state] += np.random.uniform(low=-0.01, high=0.01, size=self.num_actions)
+        self.update_batch(
+            np.asarray(state)[None], np.array([action]), np.array([reward]),
+            np.asarray(next_state)[None], np.array([done])
+        )
+
+    def update_batch(
+        self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+        next_states: np.ndarray, dones: np.ndarray
+    ) -> None:
+        """
+        Update the Q-table with a batch of transitions, e.g. one step of a vectorized environment.
 
-        target = reward + self.gamma * np.max(self.q_table[next_state])
-        self.q_table[state][action] += self.alpha * (target - self.q_table[state][action])
-        self.epsilon = max(self.epsilon * self.epsilon_decay, self.epsilon_min)
+        Args:
+            states (np.ndarray): Current states, shape (batch, state_size).
+            actions (np.ndarray): Actions taken.
+            rewards (np.ndarray): Rewards received.
+            next_states (np.ndarray): Next states, shape (batch, state_size).
+            dones (np.ndarray): Whether each transition ended its episode.
+        """
+        rows = self.q_table.indices(self.discretizer(states))
+        next_rows = self.q_table.indices(self.discretizer(next_states))
+        self.q_table.update(rows, actions, rewards, next_rows, dones, self.alpha, self.gamma)
+        self.epsilon = max(self.epsilon * self.epsilon_decay ** len(rows), self.epsilon_min)
 
     def _load_model(self) -> None:
         """
         Load the Q-table from file if it exists.
+
+        The file is memory-mapped and copied into the table, without unpickling.
+        A legacy pickled dict table is converted once and saved in the new format
+        on the next save.
         """
         if os.path.exists(self.filename):
             try:
-                self.q_table = np.load(self.filename, allow_pickle=True).item()
-                print("✅ Loaded existing Q-table from model.npy")
+                records = np.load(self.filename, mmap_mode="r", allow_pickle=False)
+                self.q_table = QTable.from_records(records)
+                print(f"✅ Loaded existing Q-table from '{self.filename}' ({len(self.q_table)} states).")
+            except ValueError:
+                self._load_legacy_model()
             except Exception as e:
                 print(f"Error loading model: {e}")
         else:
             print("No existing model found. Starting from scratch.")
 
+    def _load_legacy_model(self) -> None:
+        try:
+            legacy = np.load(self.filename, allow_pickle=True).item()
+            num_actions = len(next(iter(legacy.values()))) if legacy else 1
+            self.q_table = QTable.from_dict(legacy, num_actions)
+            print(f"✅ Converted legacy Q-table from '{self.filename}' ({len(self.q_table)} states).")
+        except Exception as e:
+            print(f"Error loading model: {e}")
+
+    def table_stats(self) -> dict:
+        """
+        Report the Q-table occupancy, hit rate and evictions.
+
+        Returns:
+            dict: Table statistics.
+        """
+        return self.q_table.stats() if self.q_table is not None else {}
+
     def get_model(self):
         """
         Retrieve the current Q-table.
 
         Returns:
-            dict: The Q-table.
+            QTable: The Q-table.
         """
         return self.q_table
 
-    def save_model(self) -> None:
+    def save_model(self):
         """
-        Save the Q-table to file.
+        Save the Q-table to file in the background, as a plain structured `.npy` array.
+
+        Returns:
+            Future: Resolves to the checkpoint version once written.
         """
-        np.save(self.filename, self.q_table)
-        print(f"✅ Model saved to '{self.filename}'.")
+        records = self.q_table.to_records()
+        filename = self.filename
+        future = get_checkpoint_writer().submit(
+            filename, lambda f: np.save(f, records, allow_pickle=False), self.metric_labels)
+        future.add_done_callback(lambda done: print(
+            f"✅ Model saved to '{filename}' (version {done.result()})." if done.exception() is None
+            else f"❌ Error saving model: {done.exception()}"
+        ))
+        return future
@@ -0,0 +1,349 @@
+import numpy as np
+from typing import Optional
+
+
+class RoundingDiscretizer:
+    """
+    Discretize observations by rounding every feature to a multiple of `step`.
+
+    With the default step of 1, integer observations (Snake coordinates) are
+    used as they are.
+    """
+    def __init__(self, step: float = 1.0) -> None:
+        """
+        Initialize the discretizer.
+
+        Args:
+            step (float): Width of a bucket.
+        """
+        self.step = step
+
+    def __call__(self, observations: np.ndarray) -> np.ndarray:
+        return np.rint(np.asarray(observations, dtype=np.float64) / self.step).astype(np.int64)
+
+
+class BinDiscretizer:
+    """
+    Discretize observations into a fixed number of uniform bins per feature.
+    """
+    def __init__(self, low, high, bins) -> None:
+        """
+        Initialize the discretizer.
+
+        Args:
+            low (float | array): Lower bound of every feature (or of each feature).
+            high (float | array): Upper bound of every feature (or of each feature).
+            bins (int | array): Number of bins of every feature (or of each feature).
+        """
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.bins = np.asarray(bins, dtype=np.int64)
+
+    def __call__(self, observations: np.ndarray) -> np.ndarray:
+        scaled = (np.asarray(observations, dtype=np.float64) - self.low) / (self.high - self.low)
+        return np.clip((scaled * self.bins).astype(np.int64), 0, self.bins - 1)
+
+
+class QTable:
+    """
+    Tabular Q-value store with dense integer state indices.
+
+    Discretized states are mapped to row indices by a hash index over their
+    bytes; the Q-values of all states live in one contiguous float32 array of
+    shape (capacity, num_actions) that doubles when full. Updates are
+    vectorized over batches of transitions.
+
+    With `max_states` set, the table keeps a visit count and a last-access
+    tick per row, and once the budget is reached it evicts the coldest rows
+    (fewest visits, then least recently used) to make room. Rows accessed
+    since the last update are never evicted, so indices returned for the
+    batch being processed stay valid; freed rows are reused by later inserts.
+    A batch touching more states than the budget temporarily overflows it.
+    """
+    # Approximate per-state overhead of the hash index (bytes object + dict slot)
+    INDEX_OVERHEAD = 120
+
+    def __init__(
+        self, num_actions: int, capacity: int = 1024, init_scale: float = 0.01,
+        seed: Optional[int] = None, max_states: Optional[int] = None, evict_fraction: float = 0.05
+    ) -> None:
+        """
+        Initialize an empty table.
+
+        Args:
+            num_actions (int): Number of actions.
+            capacity (int): Initial number of rows.
+            init_scale (float): New rows are drawn uniformly in [-init_scale, init_scale].
+            seed (Optional[int]): Seed of the initialization generator.
+            max_states (Optional[int]): Maximum number of states kept, unbounded if None.
+            evict_fraction (float): Fraction of `max_states` evicted at once when the table is full.
+        """
+        self.num_actions = num_actions
+        self.init_scale = init_scale
+        self.rng = np.random.default_rng(seed)
+        self.max_states = max_states
+        self.evict_fraction = evict_fraction
+        if max_states is not None:
+            capacity = min(capacity, max_states)
+        self.values = np.zeros((capacity, num_actions), dtype=np.float32)
+        self.keys = None
+        self.key_bytes = [None] * capacity
+        self.visits = np.zeros(capacity, dtype=np.int64)
+        self.last_access = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = []
+        self.index = {}
+        self.size = 0
+        self.high_water = 0
+        self.clock = 1
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key) -> bool:
+        return self._key_bytes(np.asarray(key, dtype=np.int64).reshape(1, -1))[0] in self.index
+
+    @classmethod
+    def states_for_budget(cls, budget_bytes: int, key_size: int, num_actions: int) -> int:
+        """
+        Number of states that fit in a memory budget.
+
+        Args:
+            budget_bytes (int): Memory budget in bytes.
+            key_size (int): Number of features of a discretized state.
+            num_actions (int): Number of actions.
+
+        Returns:
+            int: Maximum number of states.
+        """
+        per_state = 4 * num_actions + 2 * 8 * key_size + 8 + 8 + 1 + cls.INDEX_OVERHEAD
+        return max(1, int(budget_bytes // per_state))
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Get the row indices of discretized states without inserting missing ones.
+
+        Args:
+            keys (np.ndarray): Integer array of shape (batch, key_size).
+
+        Returns:
+            np.ndarray: Row indices, -1 for unknown states.
+        """
+        index = self.index
+        rows = np.fromiter((index.get(k, -1) for k in self._key_bytes(keys)), dtype=np.int64, count=len(keys))
+        found = rows[rows >= 0]
+        self.last_access[found] = self.clock
+        self.hits += len(found)
+        self.misses += len(rows) - len(found)
+        return rows
+
+    def indices(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Get the row indices of discretized states, inserting missing ones.
+
+        Args:
+            keys (np.ndarray): Integer array of shape (batch, key_size).
+
+        Returns:
+            np.ndarray: Row indices.
+        """
+        keys = np.ascontiguousarray(keys, dtype=np.int64)
+        if self.keys is None:
+            self.keys = np.zeros((len(self.values), keys.shape[1]), dtype=np.int64)
+        index = self.index
+        result = np.empty(len(keys), dtype=np.int64)
+        inserted = 0
+        for i, key in enumerate(self._key_bytes(keys)):
+            row = index.get(key)
+            if row is None:
+                row = self._insert(key, keys[i])
+                inserted += 1
+            else:
+                # Stamp hits right away so an insert later in the batch cannot evict them
+                self.last_access[row] = self.clock
+            result[i] = row
+        self.hits += len(result) - inserted
+        self.misses += inserted
+        return result
+
+    def q_values(self, rows: np.ndarray) -> np.ndarray:
+        return self.values[rows]
+
+    def update(
+        self, rows: np.ndarray, actions: np.ndarray, rewards: np.ndarray, next_rows: np.ndarray,
+        dones: np.ndarray, alpha: float, gamma: float
+    ) -> np.ndarray:
+        """
+        Apply one Q-learning update per transition of a batch.
+
+        Targets are computed from the values before the update, and repeated
+        (state, action) pairs accumulate their corrections with `np.add.at`.
+
+        Args:
+            rows (np.ndarray): Row indices of the states.
+            actions (np.ndarray): Actions taken.
+            rewards (np.ndarray): Rewards received.
+            next_rows (np.ndarray): Row indices of the next states.
+            dones (np.ndarray): Whether each transition ended its episode.
+            alpha (float): Learning rate.
+            gamma (float): Discount factor.
+
+        Returns:
+            np.ndarray: The temporal-difference errors.
+        """
+        values = self.values
+        actions = np.asarray(actions, dtype=np.int64)
+        not_done = 1.0 - np.asarray(dones, dtype=np.float32)
+        targets = np.asarray(rewards, dtype=np.float32) + gamma * not_done * values[next_rows].max(axis=1)
+        td_errors = targets - values[rows, actions]
+        np.add.at(values, (rows, actions), alpha * td_errors)
+        np.add.at(self.visits, rows, 1)
+        self.clock += 1
+        return td_errors
+
+    def stats(self) -> dict:
+        """
+        Report the occupancy, hit rate and evictions of the table.
+
+        Returns:
+            dict: Table statistics.
+        """
+        lookups = self.hits + self.misses
+        key_size = self.keys.shape[1] if self.keys is not None else 0
+        per_state = 4 * self.num_actions + 2 * 8 * key_size + 8 + 8 + 1
+        return {
+            "states": self.size,
+            "capacity": len(self.values),
+            "max_states": self.max_states,
+            "occupancy": self.size / self.max_states if self.max_states else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_bytes": len(self.values) * per_state + self.size * self.INDEX_OVERHEAD,
+        }
+
+    def _insert(self, key: bytes, key_row: np.ndarray) -> int:
+        if self.max_states is not None and self.size >= self.max_states:
+            self._evict(max(1, int(self.max_states * self.evict_fraction)))
+        if self.free:
+            row = self.free.pop()
+        else:
+            row = self.high_water
+            if row == len(self.values):
+                self._grow(2 * row if self.max_states is None else max(min(2 * row, self.max_states), row + 64))
+            self.high_water += 1
+        self.values[row] = self.rng.uniform(-self.init_scale, self.init_scale, self.num_actions)
+        self.keys[row] = key_row
+        self.key_bytes[row] = key
+        self.visits[row] = 0
+        self.last_access[row] = self.clock
+        self.alive[row] = True
+        self.index[key] = row
+        self.size += 1
+        return row
+
+    def _evict(self, count: int) -> None:
+        candidates = np.flatnonzero(self.alive[:self.high_water] & (self.last_access[:self.high_water] < self.clock))
+        if not len(candidates):
+            # Every state is used by the current batch: overflow until the next eviction
+            return
+        count = min(count, len(candidates))
+        order = np.lexsort((self.last_access[candidates], self.visits[candidates]))
+        victims = candidates[order[:count]]
+        for row in victims.tolist():
+            del self.index[self.key_bytes[row]]
+            self.key_bytes[row] = None
+        self.alive[victims] = False
+        self.free.extend(victims.tolist())
+        self.size -= count
+        self.evictions += count
+
+    def _grow(self, capacity: int) -> None:
+        def grown(array, shape, dtype):
+            result = np.zeros(shape, dtype=dtype)
+            result[:self.high_water] = array[:self.high_water]
+            return result
+
+        self.values = grown(self.values, (capacity, self.num_actions), np.float32)
+        self.keys = grown(self.keys, (capacity, self.keys.shape[1]), np.int64)
+        self.visits = grown(self.visits, capacity, np.int64)
+        self.last_access = grown(self.last_access, capacity, np.int64)
+        self.alive = grown(self.alive, capacity, bool)
+        self.key_bytes.extend([None] * (capacity - len(self.key_bytes)))
+
+    @staticmethod
+    def _key_bytes(keys: np.ndarray) -> list:
+        keys = np.ascontiguousarray(keys, dtype=np.int64)
+        return [row.tobytes() for row in keys]
+
+    def to_records(self) -> np.ndarray:
+        """
+        Copy the table into a structured array (state key, Q-values, visits), suitable for `np.save`.
+
+        Returns:
+            np.ndarray: One record per state.
+        """
+        key_size = self.keys.shape[1] if self.keys is not None else 0
+        rows = np.flatnonzero(self.alive[:self.high_water])
+        records = np.empty(len(rows), dtype=self.record_dtype(key_size, self.num_actions))
+        if len(rows):
+            records["key"] = self.keys[rows]
+            records["q"] = self.values[rows]
+            records["visits"] = self.visits[rows]
+        return records
+
+    @staticmethod
+    def record_dtype(key_size: int, num_actions: int) -> np.dtype:
+        return np.dtype([("key", "<i8", (key_size,)), ("q", "<f4", (num_actions,)), ("visits", "<i8")])
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, **kwargs) -> "QTable":
+        """
+        Build a table from records produced by `to_records` (or a memory-map of them).
+
+        When the table is bounded, only the most visited states that fit are kept.
+
+        Args:
+            records (np.ndarray): Structured array with "key" and "q" fields.
+            **kwargs: Extra arguments for the constructor.
+
+        Returns:
+            QTable: The table.
+        """
+        num_actions = records.dtype["q"].shape[0]
+        has_visits = "visits" in records.dtype.names
+        max_states = kwargs.get("max_states")
+        if max_states is not None and len(records) > max_states:
+            keep = np.argsort(-records["visits"], kind="stable")[:max_states] if has_visits else np.arange(max_states)
+            records = records[np.sort(keep)]
+        table = cls(num_actions, capacity=max(1024, len(records)), **kwargs)
+        if len(records):
+            rows = table.indices(records["key"])
+            table.values[rows] = records["q"]
+            if has_visits:
+                table.visits[rows] = records["visits"]
+            table.hits = table.misses = 0
+        return table
+
+    @classmethod
+    def from_dict(cls, q_table: dict, num_actions: int, **kwargs) -> "QTable":
+        """
+        Build a table from a legacy dict mapping state tuples to Q-value arrays.
+
+        Args:
+            q_table (dict): The legacy table.
+            num_actions (int): Number of actions.
+            **kwargs: Extra arguments for the constructor.
+
+        Returns:
+            QTable: The table.
+        """
+        keys = np.array([np.ravel(key) for key in q_table], dtype=np.int64).reshape(len(q_table), -1)
+        values = np.array(list(q_table.values()), dtype=np.float32).reshape(len(q_table), num_actions)
+        records = np.empty(len(q_table), dtype=cls.record_dtype(keys.shape[1], num_actions)[["key", "q"]])
+        records["key"], records["q"] = keys, values
+        return cls.from_records(records, **kwargs)
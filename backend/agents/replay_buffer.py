@@ -0,0 +1,266 @@
+import numpy as np
+from typing import Optional
+
+
+class ReplayBuffer:
+    """
+    Fixed-size experience replay backed by preallocated contiguous arrays.
+
+    Transitions are written into a ring buffer, so inserts are O(1) and the
+    memory footprint never grows once the buffer is allocated.
+    """
+    def __init__(self, capacity: int, state_size: int, seed: Optional[int] = None) -> None:
+        """
+        Initialize the replay buffer.
+
+        Args:
+            capacity (int): Maximum number of transitions kept.
+            state_size (int): Size of a flattened state.
+            seed (Optional[int]): Seed for the sampling generator.
+        """
+        self.capacity = capacity
+        self.state_size = state_size
+        self.rng = np.random.default_rng(seed)
+
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+
+        self.index = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, state, action: int, reward: float, next_state, done: bool) -> int:
+        """
+        Store a single transition, overwriting the oldest one when full.
+
+        Args:
+            state: Current state.
+            action (int): Action taken.
+            reward (float): Reward received.
+            next_state: Next state.
+            done (bool): Whether the episode ended on this transition.
+
+        Returns:
+            int: Slot the transition was written to.
+        """
+        i = self.index
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.index = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return i
+
+    def add_batch(self, states, actions, rewards, next_states, dones) -> np.ndarray:
+        """
+        Store a batch of transitions, e.g. one step of a vectorized environment.
+
+        Args:
+            states: Array of shape (n, state_size).
+            actions: Array of shape (n,).
+            rewards: Array of shape (n,).
+            next_states: Array of shape (n, state_size).
+            dones: Array of shape (n,).
+
+        Returns:
+            np.ndarray: Slots the transitions were written to.
+        """
+        n = len(actions)
+        idx = (self.index + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self.index = int((self.index + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+        return idx
+
+    def sample(self, batch_size: int, out: Optional[tuple] = None):
+        """
+        Sample a minibatch of transitions uniformly at random.
+
+        Args:
+            batch_size (int): Number of transitions to sample.
+            out (Optional[tuple]): Preallocated (states, actions, rewards, next_states, dones)
+                arrays of length `batch_size` to gather into instead of allocating new ones.
+
+        Returns:
+            tuple: Arrays (states, actions, rewards, next_states, dones).
+        """
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return self._gather(idx, out)
+
+    def _gather(self, idx: np.ndarray, out: Optional[tuple] = None) -> tuple:
+        """
+        Gather the transitions at `idx`, optionally into preallocated arrays.
+
+        Args:
+            idx (np.ndarray): Slots to gather.
+            out (Optional[tuple]): Destination arrays, or None to allocate new ones.
+
+        Returns:
+            tuple: Arrays (states, actions, rewards, next_states, dones).
+        """
+        sources = (self.states, self.actions, self.rewards, self.next_states, self.dones)
+        if out is None:
+            return tuple(source[idx] for source in sources)
+        for source, dest in zip(sources, out):
+            np.take(source, idx, axis=0, out=dest)
+        return out
+
+
+class SumTree:
+    """
+    Array-backed binary sum-tree over a fixed number of leaf priorities.
+
+    The tree is stored as a 1-indexed heap whose leaves are padded to a power
+    of two, so batched updates and prefix-sum searches walk one level at a
+    time with vectorized NumPy operations in O(log N).
+    """
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialize the sum-tree with all priorities set to zero.
+
+        Args:
+            capacity (int): Number of leaves.
+        """
+        self.capacity = capacity
+        self.depth = max(1, int(np.ceil(np.log2(capacity))))
+        self.num_leaves = 1 << self.depth
+        self.tree = np.zeros(2 * self.num_leaves, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def get(self, idx: np.ndarray) -> np.ndarray:
+        """
+        Get the priorities of the given leaves.
+
+        Args:
+            idx (np.ndarray): Leaf indices.
+
+        Returns:
+            np.ndarray: Leaf priorities.
+        """
+        return self.tree[np.asarray(idx) + self.num_leaves]
+
+    def update(self, idx: np.ndarray, priorities: np.ndarray) -> None:
+        """
+        Set the priorities of a batch of leaves and refresh their ancestors.
+
+        Args:
+            idx (np.ndarray): Leaf indices.
+            priorities (np.ndarray): New priorities.
+        """
+        nodes = np.asarray(idx) + self.num_leaves
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes >> 1)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """
+        Find the leaves whose cumulative priority range contains each value.
+
+        Args:
+            values (np.ndarray): Values in [0, total).
+
+        Returns:
+            np.ndarray: Leaf indices.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values >= left_sum
+            values -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        return np.minimum(nodes - self.num_leaves, self.capacity - 1)
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer that samples transitions proportionally to their TD error.
+
+    Priorities live in a `SumTree`, so sampling a minibatch and updating its
+    priorities both cost O(log N) per transition. Sampling returns
+    importance-sampling weights that correct for the non-uniform distribution.
+    """
+    def __init__(
+        self, capacity: int, state_size: int, alpha: float = 0.6, beta: float = 0.4,
+        beta_increment: float = 1e-4, epsilon: float = 1e-6, seed: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the prioritized replay buffer.
+
+        Args:
+            capacity (int): Maximum number of transitions kept.
+            state_size (int): Size of a flattened state.
+            alpha (float): How strongly priorities skew sampling (0 is uniform).
+            beta (float): Initial importance-sampling correction exponent.
+            beta_increment (float): Amount added to beta after each sample, up to 1.
+            epsilon (float): Small constant keeping every priority positive.
+            seed (Optional[int]): Seed for the sampling generator.
+        """
+        super().__init__(capacity, state_size, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+
+    def add(self, state, action: int, reward: float, next_state, done: bool) -> int:
+        i = super().add(state, action, reward, next_state, done)
+        self.tree.update(np.array([i]), self.max_priority ** self.alpha)
+        return i
+
+    def add_batch(self, states, actions, rewards, next_states, dones) -> np.ndarray:
+        idx = super().add_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(idx, self.max_priority ** self.alpha)
+        return idx
+
+    def sample(self, batch_size: int, out: Optional[tuple] = None):
+        """
+        Sample a minibatch with stratified proportional prioritization.
+
+        Args:
+            batch_size (int): Number of transitions to sample.
+            out (Optional[tuple]): Preallocated arrays for the transitions, see `ReplayBuffer.sample`.
+
+        Returns:
+            tuple: Arrays (states, actions, rewards, next_states, dones, indices, weights).
+        """
+        total = self.tree.total
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.get(idx) / total
+        weights = (self.size * probs) ** (-self.beta)
+        weights = (weights / weights.max()).astype(np.float32)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+
+        return self._gather(idx, out) + (idx, weights)
+
+    def update_priorities(self, idx: np.ndarray, td_errors: np.ndarray) -> None:
+        """
+        Update the priorities of sampled transitions from their TD errors.
+
+        Args:
+            idx (np.ndarray): Indices returned by `sample`.
+            td_errors (np.ndarray): TD errors of the sampled transitions.
+        """
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(idx, priorities ** self.alpha)
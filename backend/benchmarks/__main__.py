@@ -0,0 +1,58 @@
+"""
+Run the benchmark suite from the backend directory:
+
+    python -m benchmarks                          # run everything, print the results
+    python -m benchmarks --output results.json    # also write the results
+    python -m benchmarks --update-baseline        # store the results as the new baseline
+    python -m benchmarks --compare                # compare to the baseline, exit 1 on regressions
+    python -m benchmarks env. dqn. --duration 2   # only benchmarks starting with the given prefixes
+"""
+import argparse
+import os
+import sys
+
+from benchmarks.suite import BENCHMARKS, compare, load_json, run_suite, save_json
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark environments, agents and streaming.")
+    parser.add_argument("names", nargs="*", help="Benchmark name prefixes to run (default: all).")
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds measured per benchmark.")
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements per benchmark, the best is kept.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare the results to the baseline.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown flagged as a regression.")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, unit, _) in BENCHMARKS.items():
+            print(f"{name} ({unit})")
+        return 0
+
+    results = run_suite(args.names, args.duration, args.repeat)
+    if args.output:
+        save_json(args.output, results)
+    if args.update_baseline:
+        # Keep the baseline entries of benchmarks that were not run
+        previous = load_json(args.baseline)["results"] if os.path.exists(args.baseline) else {}
+        save_json(args.baseline, {"meta": results["meta"], "results": {**previous, **results["results"]}})
+        print(f"✅ Baseline written to '{args.baseline}'.")
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline found at '{args.baseline}'.")
+            return 1
+        regressions = compare(results, load_json(args.baseline), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print("✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
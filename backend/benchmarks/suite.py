@@ -0,0 +1,324 @@
+import asyncio
+import json
+import os
+import platform
+import random
+import time
+import numpy as np
+import torch  #type: ignore
+from typing import Callable, Optional
+
+from environnements.pong_env import PongEnv
+from environnements.snake_env import SnakeEnv
+from environnements.vec_snake_env import VecSnakeEnv
+from agents.dqn_agent import DQNAgent
+from agents.inference_backends import INFERENCE_BACKENDS
+from agents.q_learning_agent import QLearningAgent
+
+
+# Registered benchmarks: name -> (function, unit, higher_is_better)
+BENCHMARKS = {}
+
+
+def benchmark(name: str, unit: str, higher_is_better: bool = True) -> Callable:
+    """
+    Register a benchmark function returning a single measurement.
+
+    Args:
+        name (str): Name of the benchmark in the results.
+        unit (str): Unit of the measurement.
+        higher_is_better (bool): Whether larger values are improvements.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def register(fn: Callable[[float], float]) -> Callable[[float], float]:
+        BENCHMARKS[name] = (fn, unit, higher_is_better)
+        return fn
+    return register
+
+
+def _seed(seed: int = 0) -> None:
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def _rate(fn: Callable[[], int], duration: float) -> float:
+    """
+    Call `fn` repeatedly for about `duration` seconds and return the items processed per second.
+
+    Args:
+        fn (Callable): Runs one batch of work and returns the number of items processed.
+        duration (float): Measurement time in seconds.
+
+    Returns:
+        float: Items per second.
+    """
+    fn()  # Warm up caches and lazy initialization
+    items = 0
+    start = time.perf_counter()
+    while True:
+        items += fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return items / elapsed
+
+
+def _env_steps(env, num_actions: int, steps: int = 1000) -> Callable[[], int]:
+    actions = np.random.randint(0, num_actions, size=steps).tolist()
+
+    def run() -> int:
+        for action in actions:
+            if env.step(action)[2]:
+                env.reset()
+        return steps
+    return run
+
+
+def _dqn_agent(env, game: str = "benchmark") -> DQNAgent:
+    agent = DQNAgent(learning_starts=64, epsilon=0.0, epsilon_min=0.0)
+    agent.initialize(env, game)
+    return agent
+
+
+for _grid in (10, 20, 30):
+    benchmark(f"env.snake_g{_grid}.steps_per_sec", "steps/s")(
+        lambda duration, g=_grid: _rate(_env_steps(SnakeEnv(grid_size=g), 4), duration)
+    )
+
+
+@benchmark("env.pong.steps_per_sec", "steps/s")
+def bench_pong_env(duration: float) -> float:
+    return _rate(_env_steps(PongEnv(), 3), duration)
+
+
+@benchmark("env.vec_snake_64.steps_per_sec", "steps/s")
+def bench_vec_snake_env(duration: float) -> float:
+    env = VecSnakeEnv(64, seed=0)
+    actions = np.random.randint(0, 4, size=(100, 64))
+
+    def run() -> int:
+        for row in actions:
+            env.step(row)
+        return actions.size
+    return _rate(run, duration)
+
+
+@benchmark("dqn.get_action.latency_us", "us", higher_is_better=False)
+def bench_dqn_get_action(duration: float) -> float:
+    env = SnakeEnv()
+    agent = _dqn_agent(env)
+    state = env.get_state()
+
+    def run() -> int:
+        for _ in range(200):
+            agent.get_action(state)
+        return 200
+    return 1e6 / _rate(run, duration)
+
+
+def _inference_latency(backend: str, duration: float) -> float:
+    env = SnakeEnv()
+    agent = _dqn_agent(env)
+    agent.epsilon_min = 0.0
+    agent.set_inference_backend(backend, num_threads=1)
+    state = env.get_state()
+
+    def run() -> int:
+        for _ in range(200):
+            agent.get_action(state, is_inferencing=True)
+        return 200
+    return 1e6 / _rate(run, duration)
+
+
+for _backend in INFERENCE_BACKENDS:
+    benchmark(f"dqn.inference.{_backend}.latency_us", "us", higher_is_better=False)(
+        lambda duration, b=_backend: _inference_latency(b, duration)
+    )
+
+
+@benchmark("dqn.update.latency_us", "us", higher_is_better=False)
+def bench_dqn_update(duration: float) -> float:
+    env = SnakeEnv()
+    agent = _dqn_agent(env)
+    state = env.get_state()
+    next_state, reward, done = env.step(0)
+    for _ in range(agent.learning_starts):
+        agent.update(state, 0, reward, next_state, done)
+
+    # Amortized over train_freq calls, one of which runs a gradient step
+    def run() -> int:
+        for _ in range(100):
+            agent.update(state, 0, reward, next_state, done)
+        return 100
+    return 1e6 / _rate(run, duration)
+
+
+@benchmark("qlearning.update.per_sec", "updates/s")
+def bench_qlearning_update(duration: float) -> float:
+    env = SnakeEnv()
+    agent = QLearningAgent(load_model=False)  # Measure a fresh table, independent of the saved model
+    agent.initialize(env)
+    transitions = []
+    state = env.get_state()
+    for _ in range(500):
+        action = random.randrange(4)
+        next_state, reward, done = env.step(action)
+        transitions.append((state, action, reward, next_state, done))
+        state = env.reset() if done else next_state
+
+    def run() -> int:
+        for transition in transitions:
+            agent.update(*transition)
+        return len(transitions)
+    return _rate(run, duration)
+
+
+@benchmark("qlearning.update_batch_64.per_sec", "updates/s")
+def bench_qlearning_update_batch(duration: float) -> float:
+    env = VecSnakeEnv(64, seed=0)
+    agent = QLearningAgent(load_model=False)
+    agent.initialize(env)
+    states = env.get_state()
+
+    def run() -> int:
+        nonlocal states
+        for _ in range(20):
+            actions = agent.get_actions(states)
+            next_states, rewards, dones = env.step(actions)
+            agent.update_batch(states, actions, rewards, next_states, dones)
+            states = next_states
+        return 20 * env.num_envs
+    return _rate(run, duration)
+
+
+@benchmark("training_loop.turbo.steps_per_sec", "steps/s")
+def bench_training_loop(duration: float) -> float:
+    from core.broadcaster import FrameBroadcaster
+    from core.run_registry import TrainingRun
+    from core.state_machine import State, StateMachine
+    from routes.training_routes import training_loop
+
+    async def measure() -> float:
+        env = PongEnv()
+        state_machine = StateMachine()
+        state_machine.max_episodes = 10 ** 9
+        run = TrainingRun(
+            "benchmark", "pong", state_machine, env, _dqn_agent(env), FrameBroadcaster("pong"),
+            "turbo", {"steps_per_tick": 500, "fps": 20.0}
+        )
+        task = asyncio.ensure_future(training_loop(run))
+        await asyncio.sleep(min(1.0, duration))  # Warm-up, fills the replay buffer
+        steps, start = state_machine.total_steps, time.perf_counter()
+        await asyncio.sleep(duration)
+        rate = (state_machine.total_steps - steps) / (time.perf_counter() - start)
+        state_machine.set_state(State.IDLE)
+        await task
+        return rate
+    return asyncio.run(measure())
+
+
+@benchmark("websocket.training.frames_per_sec", "frames/s")
+def bench_websocket_frames(duration: float) -> float:
+    from fastapi.testclient import TestClient  #type: ignore
+    from main import app
+
+    with TestClient(app) as client:
+        client.post("/runs/start", params={
+            "game": "pong", "mode": "turbo", "steps_per_tick": 1, "fps": 1000,
+            "max_episodes": 10 ** 9, "run_id": "benchmark",
+        })
+        try:
+            with client.websocket_connect("/ws/training?run_id=benchmark&fps=1000&protocol=binary") as ws:
+                ws.receive_bytes()
+                frames, start = 0, time.perf_counter()
+                while time.perf_counter() - start < duration:
+                    ws.receive_bytes()
+                    frames += 1
+                return frames / (time.perf_counter() - start)
+        finally:
+            client.post("/runs/benchmark/stop")
+
+
+def run_suite(names: Optional[list] = None, duration: float = 1.0, repeat: int = 3) -> dict:
+    """
+    Run the selected benchmarks.
+
+    Each benchmark is measured `repeat` times and the best measurement is kept,
+    which filters out most of the noise caused by other processes.
+
+    Args:
+        names (Optional[list]): Benchmarks to run (prefixes are accepted), all of them if None.
+        duration (float): Measurement time of each benchmark in seconds.
+        repeat (int): Number of measurements per benchmark.
+
+    Returns:
+        dict: The results, with environment metadata.
+    """
+    results = {}
+    for name, (fn, unit, higher_is_better) in BENCHMARKS.items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        values = []
+        for _ in range(max(1, repeat)):
+            _seed()
+            values.append(fn(duration))
+        value = max(values) if higher_is_better else min(values)
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:45s} {value:14.1f} {unit}")
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "torch": torch.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "torch_threads": torch.get_num_threads(),
+            "duration": duration,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.15) -> list:
+    """
+    Compare results to a baseline and report regressions.
+
+    Args:
+        results (dict): Output of `run_suite`.
+        baseline (dict): Baseline in the same format.
+        threshold (float): Relative slowdown above which a benchmark is flagged (0.15 is 15%).
+
+    Returns:
+        list: Names of the regressed benchmarks.
+    """
+    regressions = []
+    for name, current in results["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or reference["value"] <= 0:
+            print(f"{name:45s} {'(no baseline)':>14s}")
+            continue
+        change = current["value"] / reference["value"] - 1
+        # Express the change so that negative always means slower
+        change = change if current["higher_is_better"] else -change
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:45s} {reference['value']:14.1f} -> {current['value']:14.1f} "
+              f"{current['unit']:10s} {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
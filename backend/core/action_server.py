@@ -0,0 +1,73 @@
+import asyncio
+import numpy as np
+
+
+class BatchedActionServer:
+    """
+    Micro-batching front end for an agent's action selection.
+
+    Requests from all sessions that arrive within `window` seconds are stacked
+    and answered with a single batched forward pass through the agent, instead
+    of one forward pass per session and per frame.
+    """
+    def __init__(self, agent, window: float = 0.002, max_batch: int = 512) -> None:
+        """
+        Initialize the server. The batching task starts with the first request.
+
+        Args:
+            agent: Agent exposing `get_actions(states, is_inferencing)`.
+            window (float): Seconds to wait for more requests after the first one.
+            max_batch (int): Maximum number of states per forward pass.
+        """
+        self.agent = agent
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.batches = 0
+        self.requests = 0
+
+    async def get_action(self, state) -> int:
+        """
+        Request an action for a state; resolves once its batch has been evaluated.
+
+        Args:
+            state: The current state.
+
+        Returns:
+            int: Selected action.
+        """
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((state, future))
+        self.wakeup.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self.wakeup.wait()
+            if len(self.pending) < self.max_batch:
+                await asyncio.sleep(self.window)
+            self.wakeup.clear()
+            batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+            if self.pending:
+                self.wakeup.set()
+            if not batch:
+                continue
+
+            try:
+                states = np.stack([np.asarray(state, dtype=np.float32) for state, _ in batch])
+                actions = self.agent.get_actions(states, is_inferencing=True)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), action in zip(batch, actions):
+                if not future.done():
+                    future.set_result(int(action))
+            self.batches += 1
+            self.requests += len(batch)
@@ -0,0 +1,316 @@
+import copy
+import queue
+import time
+import numpy as np
+import torch  #type: ignore
+import torch.multiprocessing as mp  #type: ignore
+from typing import Callable, Optional
+
+from agents.dqn_agent import DQNAgent, build_q_network, DEFAULT_HIDDEN_SIZES
+
+
+class SharedCounters:
+    """
+    Progress counters shared between the actor, learner and server processes.
+    """
+    def __init__(self, ctx) -> None:
+        self.lock = ctx.Lock()
+        self.steps = ctx.Value("q", 0, lock=False)
+        self.updates = ctx.Value("q", 0, lock=False)
+        self.episodes = ctx.Value("q", 0, lock=False)
+        self.reward_sum = ctx.Value("d", 0.0, lock=False)
+        self.last_reward = ctx.Value("d", 0.0, lock=False)
+        self.loss = ctx.Value("d", float("nan"), lock=False)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "steps": self.steps.value,
+                "updates": self.updates.value,
+                "episodes": self.episodes.value,
+                "reward_sum": self.reward_sum.value,
+                "last_reward": self.last_reward.value,
+                "loss": self.loss.value,
+            }
+
+
+def copy_weights(source: torch.nn.Module, target: torch.nn.Module) -> None:
+    """
+    Copy parameters in place from one network to another with the same layout.
+    """
+    with torch.no_grad():
+        for src, dst in zip(source.parameters(), target.parameters()):
+            dst.copy_(src)
+
+
+def actor_process(
+    actor_id: int, env_factory: Callable, shared_model: torch.nn.Module, weights_version,
+    weights_lock, transitions: "mp.Queue", episodes: "mp.Queue", frame: torch.Tensor,
+    counters: SharedCounters, running, stop, epsilon: float, epsilon_decay: float, epsilon_min: float,
+    chunk_size: int, hidden_sizes: tuple = DEFAULT_HIDDEN_SIZES
+) -> None:
+    """
+    Play episodes with a local copy of the Q-network and ship transitions to the learner.
+
+    Transitions are buffered into chunks of `chunk_size` and sent as tensors,
+    which torch.multiprocessing moves through shared memory instead of pickling.
+    A (length, return, epsilon, duration, seed, actions) record of each episode
+    is sent to `episodes`, and dropped if the server does not keep up.
+    Actor 0 also publishes its latest state into `frame` for visualization.
+    """
+    torch.set_num_threads(1)
+    np.random.seed((int(time.time() * 1e6) + actor_id) % 2**32)
+    env = env_factory()
+    state_size = len(env.get_state())
+    num_actions = env.get_num_actions()
+    model = build_q_network(state_size, num_actions, hidden_sizes)
+    local_version = -1
+
+    states = np.zeros((chunk_size, state_size), dtype=np.float32)
+    actions = np.zeros(chunk_size, dtype=np.int64)
+    rewards = np.zeros(chunk_size, dtype=np.float32)
+    next_states = np.zeros((chunk_size, state_size), dtype=np.float32)
+    dones = np.zeros(chunk_size, dtype=np.float32)
+    filled = 0
+
+    state = env.reset()
+    episode_reward = 0.0
+    episode_actions = bytearray()
+    episode_start = time.perf_counter()
+    while not stop.is_set():
+        if not running.is_set():
+            running.wait(0.1)
+            continue
+
+        if weights_version.value != local_version:
+            with weights_lock:
+                copy_weights(shared_model, model)
+                local_version = weights_version.value
+
+        if np.random.rand() < epsilon:
+            action = np.random.randint(0, num_actions)
+        else:
+            with torch.no_grad():
+                q_values = model(torch.as_tensor(state, dtype=torch.float32).unsqueeze(0))
+                action = int(torch.argmax(q_values).item())
+
+        next_state, reward, done = env.step(action)
+        states[filled] = state
+        actions[filled] = action
+        rewards[filled] = reward
+        next_states[filled] = next_state
+        dones[filled] = done
+        filled += 1
+        episode_reward += reward
+        episode_actions.append(action)
+
+        if done:
+            with counters.lock:
+                counters.episodes.value += 1
+                counters.reward_sum.value += reward
+                counters.last_reward.value = episode_reward
+            try:
+                episodes.put_nowait((
+                    len(episode_actions), episode_reward, epsilon, time.perf_counter() - episode_start,
+                    env.episode_seed, bytes(episode_actions)
+                ))
+            except queue.Full:
+                pass
+            epsilon = max(epsilon * epsilon_decay, epsilon_min)
+            episode_reward = 0.0
+            episode_actions.clear()
+            episode_start = time.perf_counter()
+            state = env.reset()
+        else:
+            state = next_state
+
+        if actor_id == 0:
+            frame.copy_(torch.from_numpy(np.asarray(env.get_render_state(), dtype=np.float32)))
+
+        if filled == chunk_size:
+            chunk = tuple(torch.from_numpy(a.copy()) for a in (states, actions, rewards, next_states, dones))
+            while not stop.is_set():
+                try:
+                    transitions.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            with counters.lock:
+                counters.steps.value += filled
+            filled = 0
+
+    transitions.cancel_join_thread()
+    episodes.cancel_join_thread()
+
+
+def learner_process(
+    env_factory: Callable, game: str, shared_model: torch.nn.Module, weights_version,
+    weights_lock, transitions: "mp.Queue", counters: SharedCounters, running, stop,
+    sync_every: int, agent_kwargs: dict
+) -> None:
+    """
+    Own the optimizer: fill the replay buffer from actor chunks and train on it.
+
+    One gradient step is taken per `train_freq` transitions received, and the
+    updated weights are published to the actors every `sync_every` updates.
+    """
+    agent = DQNAgent(**agent_kwargs)
+    agent.initialize(env_factory(), game)
+    copy_weights(shared_model, agent.model)
+    pending_updates = 0.0
+    last_sync = 0
+
+    def publish() -> None:
+        with weights_lock:
+            copy_weights(agent.model, shared_model)
+            weights_version.value += 1
+
+    while not stop.is_set():
+        try:
+            chunk = transitions.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        states, actions, rewards, next_states, dones = (t.numpy() for t in chunk)
+        agent.memory.add_batch(states, actions, rewards, next_states, dones)
+        agent.num_steps += len(actions)
+
+        if not running.is_set() or len(agent.memory) < max(agent.batch_size, agent.learning_starts):
+            continue
+        pending_updates += len(actions) / agent.train_freq
+        while pending_updates >= 1:
+            agent._train_step()
+            pending_updates -= 1
+            with counters.lock:
+                counters.updates.value += 1
+                counters.loss.value = agent.last_loss
+        if agent.num_updates - last_sync >= sync_every:
+            publish()
+            last_sync = agent.num_updates
+
+    publish()
+
+
+class ActorLearnerTrainer:
+    """
+    Multi-process DQN training: N actor processes feeding a single learner process.
+
+    The weights exchanged with the actors live in `shared_model`, a CPU copy
+    of the initial network whose parameters are placed in shared memory.
+    `load_weights` copies them back, e.g. into the server's agent, so saving
+    it from the server saves the latest learned weights.
+    """
+    def __init__(
+        self, env_factory: Callable, game: str, shared_model: torch.nn.Module, num_actors: int,
+        sync_every: int = 50, chunk_size: int = 256, queue_size: int = 64,
+        agent_kwargs: Optional[dict] = None
+    ) -> None:
+        """
+        Initialize the trainer without starting any process.
+
+        Args:
+            env_factory (Callable): Picklable callable creating a fresh environment.
+            game (str): Game identifier, used for the learner's model filename.
+            shared_model (torch.nn.Module): Network the training starts from; it is copied, not moved.
+            num_actors (int): Number of actor processes.
+            sync_every (int): Learner updates between two weight broadcasts.
+            chunk_size (int): Transitions per chunk sent by an actor.
+            queue_size (int): Maximum number of chunks waiting for the learner.
+            agent_kwargs (Optional[dict]): Keyword arguments for the learner's DQNAgent.
+        """
+        self.env_factory = env_factory
+        self.game = game
+        self.num_actors = num_actors
+        self.sync_every = sync_every
+        self.chunk_size = chunk_size
+        self.agent_kwargs = agent_kwargs or {}
+
+        self.ctx = mp.get_context("spawn")
+        # A CPU copy: the caller's network keeps its device and is only updated through `load_weights`
+        self.shared_model = copy.deepcopy(shared_model).cpu().share_memory()
+        self.weights_version = self.ctx.Value("q", 0)
+        self.weights_lock = self.ctx.Lock()
+        self.transitions = self.ctx.Queue(maxsize=queue_size)
+        self.episodes = self.ctx.Queue(maxsize=10000)
+        self.counters = SharedCounters(self.ctx)
+        self.running = self.ctx.Event()
+        self.stop_event = self.ctx.Event()
+        self.frame = torch.zeros(len(env_factory().get_render_state()), dtype=torch.float32).share_memory_()
+        self.processes = []
+
+    def start(self) -> None:
+        """
+        Spawn the learner and actor processes.
+        """
+        template = DQNAgent(**self.agent_kwargs)
+        self.running.set()
+        self.processes.append(self.ctx.Process(
+            target=learner_process, daemon=True,
+            args=(self.env_factory, self.game, self.shared_model, self.weights_version,
+                  self.weights_lock, self.transitions, self.counters, self.running,
+                  self.stop_event, self.sync_every, self.agent_kwargs)
+        ))
+        for actor_id in range(self.num_actors):
+            self.processes.append(self.ctx.Process(
+                target=actor_process, daemon=True,
+                args=(actor_id, self.env_factory, self.shared_model, self.weights_version,
+                      self.weights_lock, self.transitions, self.episodes, self.frame, self.counters,
+                      self.running, self.stop_event, template.epsilon, template.epsilon_decay,
+                      template.epsilon_min, self.chunk_size, template.hidden_sizes)
+            ))
+        for process in self.processes:
+            process.start()
+
+    def load_weights(self, model: torch.nn.Module) -> None:
+        """
+        Copy the latest weights published by the learner into a network with the same layout.
+
+        Args:
+            model (torch.nn.Module): The network to update, on any device.
+        """
+        with self.weights_lock:
+            copy_weights(self.shared_model, model)
+
+    def drain_episodes(self) -> list:
+        """
+        Collect the episode records sent by the actors since the last call.
+
+        Returns:
+            list: (length, return, epsilon, duration, seed, actions) tuples.
+        """
+        records = []
+        while True:
+            try:
+                records.append(self.episodes.get_nowait())
+            except queue.Empty:
+                return records
+
+    def pause(self) -> None:
+        self.running.clear()
+
+    def resume(self) -> None:
+        self.running.set()
+
+    def is_alive(self) -> bool:
+        return any(process.is_alive() for process in self.processes)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Signal every process to stop and wait for them, terminating stragglers.
+
+        Args:
+            timeout (float): Seconds to wait for each process.
+        """
+        self.stop_event.set()
+        self.running.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            # Drain the queue so actors blocked on a full queue can exit
+            while process.is_alive() and time.monotonic() < deadline:
+                try:
+                    self.transitions.get_nowait()
+                except queue.Empty:
+                    process.join(0.05)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.processes = []
@@ -1,6 +1,80 @@
+import random
 from abc import ABC, abstractmethod
+from typing import Optional
+
+
+_MASK64 = (1 << 64) - 1
+
+
+class EpisodeRandom:
+    """
+    SplitMix64 generator used within episodes.
+
+    Seeding is a single assignment, unlike `random.Random` whose seeding
+    initializes 624 words of state, so environments can re-seed at every
+    reset for free. Its state is one integer, which keeps snapshots small.
+    """
+    __slots__ = ("state",)
+
+    def __init__(self, seed: int = 0) -> None:
+        self.state = seed & _MASK64
+
+    def seed(self, seed: int) -> None:
+        self.state = seed & _MASK64
+
+    def next(self) -> int:
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return z ^ (z >> 31)
+
+    def randrange(self, n: int) -> int:
+        # The modulo bias is below n / 2**64, negligible for board sizes
+        return self.next() % n
+
+    def choice(self, seq):
+        return seq[self.next() % len(seq)]
+
+    def getstate(self) -> int:
+        return self.state
+
+    def setstate(self, state: int) -> None:
+        self.state = state
+
 
 class GameEnvironment(ABC):
+    """
+    Base class of the game environments.
+
+    Each environment draws its randomness from its own generator, re-seeded at
+    every reset with a per-episode seed, so an episode is fully determined by
+    `episode_seed` and the actions taken (see core.trajectories).
+    """
+    # Whether an episode cut off by a step limit counts as won, for games like
+    # Pong where a perfect policy never ends the episode
+    win_on_timeout = False
+
+    def _init_rng(self, seed: Optional[int] = None) -> None:
+        """
+        Create the generator of episode seeds and the generator used within episodes.
+
+        Args:
+            seed (Optional[int]): Seed of the episode seed sequence, random if None.
+        """
+        self._seeds = random.Random(seed)
+        self.rng = EpisodeRandom()
+        self.episode_seed = None
+
+    def _seed_episode(self, seed: Optional[int] = None) -> None:
+        """
+        Re-seed the episode generator, with the next seed of the sequence if none is given.
+
+        Args:
+            seed (Optional[int]): Seed of the new episode.
+        """
+        self.episode_seed = self._seeds.getrandbits(32) if seed is None else seed
+        self.rng.seed(self.episode_seed)
+
     @abstractmethod
     def reset(self):
         pass
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+from core.frame_codec import Frame, FrameStream, send_payload
+from core.metrics import broadcast_seconds, frames_dropped_total, frames_sent_total
+
+
+class ClientChannel:
+    """
+    Outgoing frame queue of a single WebSocket client, drained by its own sender task.
+
+    The queue is bounded: with the "latest" policy only the newest frame is kept,
+    with "drop_oldest" up to `max_queue` frames are kept and the oldest is dropped
+    when a new one arrives. A slow client therefore only ever loses its own frames.
+    Frames are encoded when sent, with the client's protocol; deltas are computed
+    against the last frame this client actually received.
+    """
+    def __init__(
+        self, websocket, fps: Optional[float] = None, policy: str = "latest",
+        max_queue: int = 8, protocol: str = "json", labels: tuple = ()
+    ) -> None:
+        """
+        Initialize the channel.
+
+        Args:
+            websocket: The WebSocket connection.
+            fps (Optional[float]): Maximum frames per second sent to this client, unlimited if None.
+            policy (str): "latest" or "drop_oldest".
+            max_queue (int): Queue length for the "drop_oldest" policy.
+            protocol (str): "json", "binary" or "delta".
+            labels (tuple): Game and run labels of the streaming metrics.
+        """
+        self.websocket = websocket
+        self.stream = FrameStream(protocol)
+        self.queue = deque(maxlen=1 if policy == "latest" else max(1, max_queue))
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self.task = None
+        self.latency = broadcast_seconds.labels(*labels) if labels else None
+        self.sent_total = frames_sent_total.labels(*labels) if labels else None
+        self.dropped_total = frames_dropped_total.labels(*labels) if labels else None
+        self.set_fps(fps)
+
+    def set_fps(self, fps: Optional[float]) -> None:
+        """
+        Change the target frame rate of the client.
+
+        Args:
+            fps (Optional[float]): Frames per second, unlimited if None or not positive.
+        """
+        self.min_interval = 1.0 / fps if fps and fps > 0 else 0.0
+
+    def offer(self, frame: Frame) -> None:
+        """
+        Queue a frame without blocking.
+
+        Args:
+            frame (Frame): The frame to send.
+        """
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            if self.dropped_total is not None:
+                self.dropped_total.inc()
+        self.queue.append(frame)
+        self.ready.set()
+
+    async def run(self) -> None:
+        """
+        Send queued frames to the client, pacing them to the target frame rate.
+        """
+        try:
+            while not self.closed:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.queue:
+                    frame = self.queue.popleft()
+                    await send_payload(self.websocket, self.stream.encode(frame))
+                    self.sent += 1
+                    if self.latency is not None:
+                        self.latency.observe(time.perf_counter() - frame.created)
+                        self.sent_total.inc()
+                    if self.min_interval:
+                        await asyncio.sleep(self.min_interval)
+        except Exception as e:
+            print("Error sending frame to client:", e)
+        finally:
+            self.closed = True
+
+
+class FrameBroadcaster:
+    """
+    Fan-out of frames to many WebSocket clients.
+
+    Each published frame is handed to every client channel without awaiting any
+    network I/O, so the producer is never slowed down by the number or the speed
+    of the viewers. Frames cache their encodings, so each frame is serialized
+    once per protocol however many clients receive it.
+    """
+    def __init__(self, game: str, run: Optional[str] = None) -> None:
+        """
+        Initialize the broadcaster.
+
+        Args:
+            game (str): The game identifier, which selects the binary frame layout.
+            run (Optional[str]): The run identifier used in metric labels, the game if None.
+        """
+        self.game = game
+        self.run = run or game
+        self.clients = {}
+
+    def add(
+        self, websocket, fps: Optional[float] = None, policy: str = "latest",
+        max_queue: int = 8, protocol: str = "json"
+    ) -> ClientChannel:
+        """
+        Register a client and start its sender task.
+
+        Args:
+            websocket: The WebSocket connection.
+            fps (Optional[float]): Maximum frames per second for the client.
+            policy (str): "latest" or "drop_oldest".
+            max_queue (int): Queue length for the "drop_oldest" policy.
+            protocol (str): "json", "binary" or "delta".
+
+        Returns:
+            ClientChannel: The client's channel.
+        """
+        channel = ClientChannel(websocket, fps, policy, max_queue, protocol, (self.game, self.run))
+        channel.task = asyncio.ensure_future(channel.run())
+        self.clients[websocket] = channel
+        return channel
+
+    def remove(self, websocket) -> None:
+        """
+        Unregister a client and cancel its sender task.
+
+        Args:
+            websocket: The WebSocket connection.
+        """
+        channel = self.clients.pop(websocket, None)
+        if channel is not None:
+            channel.closed = True
+            channel.task.cancel()
+
+    def publish(self, data: dict) -> None:
+        """
+        Queue a frame for every connected client.
+
+        Args:
+            data (dict): The frame data.
+        """
+        if not self.clients:
+            return
+        frame = Frame(data, self.game)
+        for websocket, channel in list(self.clients.items()):
+            if channel.closed:
+                self.remove(websocket)
+            else:
+                channel.offer(frame)
+
+    def __len__(self) -> int:
+        return len(self.clients)
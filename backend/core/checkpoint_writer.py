@@ -0,0 +1,179 @@
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from core.metrics import checkpoint_seconds
+
+
+class CheckpointWriter:
+    """
+    Background writer for model checkpoints.
+
+    Serialization and disk I/O run on a dedicated thread,
+    so callers only pay for taking an in-memory snapshot. Every save produces a
+    numbered version next to the model file (e.g. `dqn_model_pong.v000003.pth`)
+    and atomically replaces the model file itself, so readers never observe a
+    partially written file. Only the `keep_last` most recent versions are kept.
+    """
+    def __init__(self, keep_last: int = 5) -> None:
+        """
+        Initialize the writer.
+
+        Args:
+            keep_last (int): Number of versions kept per model file; 0 keeps all of them.
+        """
+        self.keep_last = keep_last
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self.lock = threading.Lock()
+        self.listeners = []
+
+    def submit(self, path: str, serialize: Callable[[io.BufferedIOBase], None],
+               labels: Tuple[str, str] = ("", "")) -> Future:
+        """
+        Queue a checkpoint write.
+
+        Args:
+            path (str): Path of the model file.
+            serialize (Callable): Writes the snapshot to a binary file object; runs on the writer thread.
+            labels (Tuple[str, str]): Game and run the write duration is reported under.
+
+        Returns:
+            Future: Resolves to the version number written.
+        """
+        return self.executor.submit(self._write, path, serialize, labels)
+
+    def add_listener(self, listener: Callable[[str, int], None]) -> None:
+        """
+        Register a callback invoked on the writer thread after each checkpoint is written.
+
+        Args:
+            listener (Callable): Called with the model path and the version written.
+        """
+        self.listeners.append(listener)
+
+    def announce(self, path: str, version: int) -> Future:
+        """
+        Run the listeners for a checkpoint another process wrote, on the writer thread.
+
+        Args:
+            path (str): Path of the model file.
+            version (int): Version that was written.
+
+        Returns:
+            Future: Resolves once every listener has run.
+        """
+        return self.executor.submit(self._notify, path, version)
+
+    def flush(self) -> Future:
+        """
+        Get a future resolved once every write queued so far is on disk.
+
+        Returns:
+            Future: Resolves to None.
+        """
+        return self.executor.submit(lambda: None)
+
+    def versions(self, path: str) -> list:
+        """
+        List the versions available for a model file, oldest first.
+
+        Args:
+            path (str): Path of the model file.
+
+        Returns:
+            list: Version numbers.
+        """
+        directory, pattern = self._version_pattern(path)
+        if not os.path.isdir(directory):
+            return []
+        found = (pattern.fullmatch(name) for name in os.listdir(directory))
+        return sorted(int(match.group(1)) for match in found if match)
+
+    def version_path(self, path: str, version: int) -> Optional[str]:
+        """
+        Get the file holding a given version of a model file.
+
+        Args:
+            path (str): Path of the model file.
+            version (int): Version number.
+
+        Returns:
+            Optional[str]: Path of the versioned file, or None if it does not exist.
+        """
+        root, ext = os.path.splitext(path)
+        candidate = f"{root}.v{version:06d}{ext}"
+        return candidate if os.path.exists(candidate) else None
+
+    def _version_pattern(self, path: str):
+        directory = os.path.dirname(path) or "."
+        root, ext = os.path.splitext(os.path.basename(path))
+        return directory, re.compile(re.escape(root) + r"\.v(\d{6})" + re.escape(ext))
+
+    def _write(self, path: str, serialize: Callable[[io.BufferedIOBase], None], labels: Tuple[str, str]) -> int:
+        start = time.perf_counter()
+        buffer = io.BytesIO()
+        serialize(buffer)
+        data = buffer.getvalue()
+
+        with self.lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            versions = self.versions(path)
+            version = versions[-1] + 1 if versions else 1
+            root, ext = os.path.splitext(path)
+            versioned = f"{root}.v{version:06d}{ext}"
+
+            self._atomic_write(versioned, data)
+            self._atomic_link(versioned, path, data)
+
+            if self.keep_last > 0:
+                for old in versions[:max(0, len(versions) + 1 - self.keep_last)]:
+                    os.remove(self.version_path(path, old))
+
+        checkpoint_seconds.labels(*labels).observe(time.perf_counter() - start)
+        self._notify(path, version)
+        return version
+
+    def _notify(self, path: str, version: int) -> None:
+        for listener in self.listeners:
+            listener(path, version)
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes) -> None:
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def _atomic_link(cls, source: str, path: str, data: bytes) -> None:
+        # Hard-link the version onto the model file to avoid writing the bytes twice
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            os.link(source, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            cls._atomic_write(path, data)
+
+
+_default_writer = None
+
+
+def get_checkpoint_writer() -> CheckpointWriter:
+    """
+    Get the process-wide checkpoint writer shared by all agents.
+
+    Returns:
+        CheckpointWriter: The shared writer.
+    """
+    global _default_writer
+    if _default_writer is None:
+        _default_writer = CheckpointWriter()
+    return _default_writer
@@ -0,0 +1,418 @@
+import copy
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+import torch  #type: ignore
+import torch.multiprocessing as mp  #type: ignore
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+from agents.dqn_agent import DQNAgent
+from core.actor_learner import copy_weights
+from core.checkpoint_writer import get_checkpoint_writer
+from core.metrics import LATENCY_BUCKETS, StepMetrics
+from core.state_machine import StateMachine
+from core.training import training_step
+
+# Stages of a training step timed by StepMetrics; their histograms are published bucket by bucket
+STAGES = ("get_action", "env_step", "update")
+STAGE_FIELDS = {
+    stage: tuple(f"{stage}_bucket_{i}" for i in range(len(LATENCY_BUCKETS) + 1)) + (f"{stage}_sum",)
+    for stage in STAGES
+}
+
+# Counters published with every frame, in buffer order
+COUNTER_FIELDS = (
+    "steps", "updates", "episodes", "current_reward", "total_reward", "weights_version", "loss", "epsilon", "paused",
+) + tuple(field for stage in STAGES for field in STAGE_FIELDS[stage])
+
+# Scheduling priority the worker lowers itself by
+WORKER_NICENESS = 10
+
+
+class SeqlockBuffer:
+    """
+    Latest frame and counters of a worker in shared memory, guarded by a sequence lock.
+
+    The single writer makes the sequence number odd, writes the data in
+    place and makes it even again. Readers never block the writer: they run
+    on the data in place between two loads of the sequence number and retry
+    if a write was in progress or happened meanwhile, so they never act on a
+    torn frame and nothing is copied unless the reader copies it.
+    """
+    def __init__(self, frame_size: int, name: Optional[str] = None) -> None:
+        """
+        Create the buffer, or attach to an existing one.
+
+        Args:
+            frame_size (int): Number of float32 values of a frame.
+            name (Optional[str]): Name of the shared memory block to attach to, a new block if None.
+        """
+        counters_offset = 8
+        frame_offset = counters_offset + 8 * len(COUNTER_FIELDS)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=frame_offset + 4 * frame_size)
+            self.shm.buf[:frame_offset + 4 * frame_size] = bytes(frame_offset + 4 * frame_size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.frame_size = frame_size
+        self._seq = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self.counters = np.ndarray((len(COUNTER_FIELDS),), dtype=np.float64, buffer=self.shm.buf, offset=counters_offset)
+        self.frame = np.ndarray((frame_size,), dtype=np.float32, buffer=self.shm.buf, offset=frame_offset)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def version(self) -> int:
+        """
+        Number of writes completed so far.
+        """
+        return int(self._seq[0]) // 2
+
+    def write(self, counters: dict, frame) -> None:
+        """
+        Publish a frame and its counters.
+
+        Args:
+            counters (dict): Value of every field of COUNTER_FIELDS.
+            frame: The frame, `frame_size` values.
+        """
+        seq = int(self._seq[0])
+        self._seq[0] = seq + 1
+        self.counters[:] = [counters[field] for field in COUNTER_FIELDS]
+        self.frame[:] = frame
+        self._seq[0] = seq + 2
+
+    def read(self, reader: Callable, retries: int = 100):
+        """
+        Run `reader` on a consistent view of the latest frame.
+
+        Args:
+            reader (Callable): Called with the counters and frame arrays, which are
+                only valid during the call; may be called again if a write interferes.
+            retries (int): Attempts before giving up.
+
+        Returns:
+            tuple: (version, result of `reader`), or None if every attempt raced with a write.
+        """
+        for _ in range(retries):
+            seq = int(self._seq[0])
+            if seq & 1:
+                continue
+            result = reader(self.counters, self.frame)
+            if int(self._seq[0]) == seq:
+                return seq // 2, result
+        return None
+
+    def read_counters(self) -> Optional[dict]:
+        snapshot = self.read(lambda counters, _: counters.tolist())
+        return None if snapshot is None else dict(zip(COUNTER_FIELDS, snapshot[1]))
+
+    def close(self) -> None:
+        # The views must go before the mapping can be closed
+        self._seq = self.counters = self.frame = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+
+class EpisodeForwarder:
+    """
+    Episode log and trajectory recorder of a worker's training loop.
+
+    It takes the place of both in `training_step`, and sends each finished
+    episode to the server as one (length, return, epsilon, loss, duration,
+    seed, actions) record; the server writes it to the run's own episode log
+    and recording. Records are dropped if the server does not keep up.
+    """
+    def __init__(self, episodes: "mp.Queue") -> None:
+        self.episodes = episodes
+        self.seed = None
+        self.actions = bytearray()
+        self.stats = None
+
+    def append(self, length: int, reward: float, epsilon=None, loss=None, duration: float = 0.0) -> None:
+        self.stats = (length, reward, epsilon, loss, duration)
+
+    def start_episode(self, seed: int) -> None:
+        self.seed = seed
+        self.actions.clear()
+
+    def record(self, action: int) -> None:
+        self.actions.append(action)
+
+    def end_episode(self, reward: float) -> None:
+        try:
+            self.episodes.put_nowait(self.stats + (self.seed, bytes(self.actions)))
+        except queue.Full:
+            pass
+
+
+def compute_worker_process(
+    env_factory: Callable, game: str, mode: str, agent_kwargs: dict, filename: str, shared_model: torch.nn.Module,
+    weights_lock, buffer_name: str, frame_size: int, conn, episodes: "mp.Queue", max_episodes: int,
+    steps_per_tick: int, sync_every: int
+) -> None:
+    """
+    Run the training loop of a run: environment steps and agent updates, outside the server process.
+
+    Commands ("pause", "resume", "stop" and ("save", token)) are read from
+    `conn` between ticks; a save is answered with ("saved", token, version)
+    or ("save_failed", token, error). The latest frame and counters are
+    published to the seqlock buffer after every tick, and the weights are
+    copied to `shared_model` every `sync_every` updates and when the loop ends.
+    In "normal" mode a tick is one step every 100 ms, in "turbo" mode
+    `steps_per_tick` steps back to back.
+    """
+    torch.set_num_threads(1)
+    # Yield the CPU to the server process when they share a core
+    os.nice(WORKER_NICENESS)
+    env = env_factory()
+    agent = DQNAgent(load_model=False, **agent_kwargs)
+    agent.initialize(env, game)
+    agent.filename = filename
+    with weights_lock:
+        copy_weights(shared_model, agent.model)
+    state_machine = StateMachine()
+    state_machine.max_episodes = max_episodes
+    # Observed here and merged into the server's histograms through the buffer
+    metrics = StepMetrics(game, "worker")
+    forwarder = EpisodeForwarder(episodes)
+    state_machine.episode_log = forwarder
+    buffer = SeqlockBuffer(frame_size, buffer_name)
+    turbo = mode == "turbo"
+    steps = updates = weights_version = last_sync = 0
+    paused = False
+
+    def publish() -> None:
+        counters = {
+            "steps": steps,
+            "updates": updates,
+            "episodes": state_machine.num_episodes_completed,
+            "current_reward": state_machine.current_reward,
+            "total_reward": state_machine.total_reward,
+            "weights_version": weights_version,
+            "loss": np.nan if agent.last_loss is None else agent.last_loss,
+            "epsilon": agent.epsilon,
+            "paused": paused,
+        }
+        for stage in STAGES:
+            child = getattr(metrics, stage)
+            counters.update(zip(STAGE_FIELDS[stage], child.counts + [child.sum]))
+        buffer.write(counters, env.get_render_state())
+
+    def sync() -> None:
+        nonlocal weights_version
+        with weights_lock:
+            copy_weights(agent.model, shared_model)
+        weights_version += 1
+
+    env.reset()
+    forwarder.start_episode(env.episode_seed)
+    try:
+        while state_machine.current_episode < max_episodes:
+            # In normal mode the wait for a command paces the loop
+            if conn.poll(0.1 if paused or not turbo else 0):
+                command = conn.recv()
+                if command == "stop":
+                    break
+                if command in ("pause", "resume"):
+                    paused = command == "pause"
+                    publish()
+                elif command[0] == "save":
+                    try:
+                        conn.send(("saved", command[1], agent.save_model().result()))
+                    except Exception as e:
+                        conn.send(("save_failed", command[1], str(e)))
+                if not turbo:
+                    continue
+            if paused:
+                continue
+
+            for _ in range(steps_per_tick if turbo else 1):
+                _, _, _, step_updates = training_step(state_machine, env, agent, metrics, forwarder)
+                steps += 1
+                updates += step_updates
+                if state_machine.current_episode >= max_episodes:
+                    break
+            if agent.num_updates - last_sync >= sync_every:
+                sync()
+                last_sync = agent.num_updates
+            publish()
+    finally:
+        sync()
+        publish()
+        buffer.close()
+
+
+def merge_stage_timings(metrics: StepMetrics, counters: dict, last: dict) -> None:
+    """
+    Add the stage latencies a worker observed between two readings of its counters to the server's histograms.
+
+    Args:
+        metrics (StepMetrics): Metrics of the run in the server process.
+        counters (dict): Latest counters of the worker.
+        last (dict): Counters of the previous reading.
+    """
+    for stage in STAGES:
+        fields = STAGE_FIELDS[stage]
+        counts = [int(counters[field] - last[field]) for field in fields[:-1]]
+        if any(counts):
+            getattr(metrics, stage).merge(counts, counters[fields[-1]] - last[fields[-1]])
+
+
+class ComputeWorker:
+    """
+    Server-side handle of a training loop running in its own process.
+
+    The server process never steps the environment nor runs the network: it
+    sends commands over a pipe, reads the latest frame and counters from a
+    shared-memory seqlock buffer, and collects finished episodes from a queue.
+    The weights are published into `shared_model`, a CPU copy of the initial
+    network placed in shared memory; `load_weights` copies them back into the
+    server's agent.
+    """
+    def __init__(
+        self, env_factory: Callable, game: str, mode: str, model: torch.nn.Module, filename: str,
+        agent_kwargs: dict, max_episodes: int, steps_per_tick: int = 1000, sync_every: int = 50
+    ) -> None:
+        """
+        Initialize the worker without starting it.
+
+        Args:
+            env_factory (Callable): Picklable callable creating a fresh environment.
+            game (str): The game identifier.
+            mode (str): "normal" or "turbo".
+            model (torch.nn.Module): Network the training starts from; it is copied, not moved.
+            filename (str): Model file written by save commands.
+            agent_kwargs (dict): Keyword arguments of the worker's DQNAgent.
+            max_episodes (int): Episodes after which the worker exits.
+            steps_per_tick (int): Steps between two command checks and publications in turbo mode.
+            sync_every (int): Updates between two copies of the weights to `shared_model`.
+        """
+        ctx = mp.get_context("spawn")
+        self.buffer = SeqlockBuffer(len(env_factory().get_render_state()))
+        self.conn, child_conn = ctx.Pipe()
+        self.episodes = ctx.Queue(maxsize=10000)
+        # The caller's network keeps its device: an in-place `.cpu()` would move it under the agent
+        self.shared_model = copy.deepcopy(model).cpu().share_memory()
+        self.weights_lock = ctx.Lock()
+        self.process = ctx.Process(
+            target=compute_worker_process, daemon=True,
+            args=(env_factory, game, mode, agent_kwargs, filename, self.shared_model, self.weights_lock,
+                  self.buffer.name, self.buffer.frame_size, child_conn, self.episodes, max_episodes,
+                  max(1, steps_per_tick), sync_every)
+        )
+        self.filename = filename
+        self._tokens = itertools.count()
+        self._saves = {}
+        # Commands come from request handlers and from the thread stopping the worker
+        self._send_lock = threading.Lock()
+
+    def start(self) -> None:
+        self.process.start()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def load_weights(self, model: torch.nn.Module) -> None:
+        """
+        Copy the latest weights published by the worker into a network with the same layout.
+
+        Args:
+            model (torch.nn.Module): The network to update, on any device.
+        """
+        with self.weights_lock:
+            copy_weights(self.shared_model, model)
+
+    def pause(self) -> None:
+        self._send("pause")
+
+    def resume(self) -> None:
+        self._send("resume")
+
+    def save_model(self) -> Future:
+        """
+        Ask the worker to save its model, which holds the latest weights.
+
+        Returns:
+            Future: Resolves to the checkpoint version once written.
+        """
+        token = next(self._tokens)
+        future = Future()
+        self._saves[token] = future
+        if not self._send(("save", token)):
+            self._saves.pop(token)
+            future.set_exception(RuntimeError("The training worker is not running"))
+        return future
+
+    def poll(self) -> None:
+        """
+        Handle the replies of the worker; called by the supervising coroutine.
+        """
+        try:
+            while self.conn.poll():
+                kind, token, value = self.conn.recv()
+                if kind == "saved":
+                    # The worker's writer has no listeners: run the server's, e.g. the model registry reload
+                    get_checkpoint_writer().announce(self.filename, value)
+                future = self._saves.pop(token, None)
+                if future is None:
+                    continue
+                if kind == "saved":
+                    future.set_result(value)
+                else:
+                    future.set_exception(RuntimeError(value))
+        except (EOFError, OSError):
+            pass
+
+    def drain_episodes(self) -> list:
+        """
+        Collect the episodes finished since the last call.
+
+        Returns:
+            list: (length, return, epsilon, loss, duration, seed, actions) tuples.
+        """
+        records = []
+        while True:
+            try:
+                records.append(self.episodes.get_nowait())
+            except queue.Empty:
+                return records
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Ask the worker to stop, wait for it and release the shared memory.
+
+        Args:
+            timeout (float): Seconds to wait before terminating the process.
+        """
+        self._send("stop")
+        deadline = time.monotonic() + timeout
+        while self.process.is_alive() and time.monotonic() < deadline:
+            self.process.join(0.05)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.poll()
+        for future in self._saves.values():
+            future.set_exception(RuntimeError("The training worker stopped"))
+        self._saves = {}
+        self.episodes.cancel_join_thread()
+        self.buffer.close()
+        self.buffer.unlink()
+
+    def _send(self, command) -> bool:
+        try:
+            with self._send_lock:
+                self.conn.send(command)
+            return True
+        except (BrokenPipeError, OSError):
+            return False
@@ -0,0 +1,45 @@
+from typing import Callable
+
+
+class EnvPool:
+    """
+    Pool of environments handed out to sessions, so concurrent viewers never share a game.
+
+    Released environments are kept for reuse, which avoids rebuilding them for
+    every new connection.
+    """
+    def __init__(self, env_factory: Callable, max_idle: int = 64) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            env_factory (Callable): Callable creating a fresh environment.
+            max_idle (int): Maximum number of released environments kept for reuse.
+        """
+        self.env_factory = env_factory
+        self.max_idle = max_idle
+        self.idle = []
+        self.in_use = 0
+
+    def acquire(self):
+        """
+        Get an environment for exclusive use, already reset.
+
+        Returns:
+            The environment instance.
+        """
+        env = self.idle.pop() if self.idle else self.env_factory()
+        env.reset()
+        self.in_use += 1
+        return env
+
+    def release(self, env) -> None:
+        """
+        Give an environment back to the pool.
+
+        Args:
+            env: The environment instance returned by `acquire`.
+        """
+        self.in_use -= 1
+        if len(self.idle) < self.max_idle:
+            self.idle.append(env)
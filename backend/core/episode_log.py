@@ -0,0 +1,385 @@
+import bisect
+import json
+import math
+import os
+import shutil
+import time
+import numpy as np
+from collections import deque
+from typing import Iterator, Optional
+
+from core.paths import is_inside
+
+
+# One record per completed episode
+EPISODE_DTYPE = np.dtype([
+    ("episode", "<i8"),
+    ("length", "<i4"),
+    ("reward", "<f4"),
+    ("epsilon", "<f4"),
+    ("loss", "<f4"),        # NaN when no gradient step was taken yet
+    ("duration", "<f4"),    # Wall-clock seconds spent in the episode
+    ("wall_time", "<f8"),   # Unix time at the end of the episode
+])
+
+# Fields that can be queried as curves
+CURVE_FIELDS = ("length", "reward", "epsilon", "loss", "duration")
+
+# Fields with rolling-window statistics
+ROLLING_FIELDS = ("reward", "length", "loss")
+
+
+class RollingWindow:
+    """
+    Statistics over the last `size` values, maintained incrementally.
+
+    Mean and standard deviation come from running sums and min/max from
+    monotonic deques, so pushing a value is amortized O(1). Percentiles are
+    read from a sorted copy of the window, kept up to date with one bisection
+    per insertion and removal.
+    """
+    def __init__(self, size: int = 100) -> None:
+        """
+        Initialize an empty window.
+
+        Args:
+            size (int): Number of values kept.
+        """
+        self.size = max(1, size)
+        self.values = deque()
+        self.sorted = []
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.count = 0
+        self._min = deque()  # (index, value), values increasing
+        self._max = deque()  # (index, value), values decreasing
+
+    def push(self, value: float) -> None:
+        """
+        Add a value, evicting the oldest one once the window is full.
+
+        Args:
+            value (float): The new value; NaN values are ignored.
+        """
+        if math.isnan(value):
+            return
+        if len(self.values) == self.size:
+            old = self.values.popleft()
+            self.sum -= old
+            self.sum_sq -= old * old
+            del self.sorted[bisect.bisect_left(self.sorted, old)]
+        self.values.append(value)
+        self.sum += value
+        self.sum_sq += value * value
+        bisect.insort(self.sorted, value)
+
+        index = self.count
+        self.count += 1
+        oldest = self.count - len(self.values)
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / len(self.values) if self.values else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if not self.values:
+            return None
+        mean = self.sum / len(self.values)
+        return math.sqrt(max(0.0, self.sum_sq / len(self.values) - mean * mean))
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Linearly interpolated percentile of the window.
+
+        Args:
+            q (float): Percentile between 0 and 100.
+
+        Returns:
+            Optional[float]: The percentile, or None if the window is empty.
+        """
+        if not self.sorted:
+            return None
+        position = (len(self.sorted) - 1) * min(max(q, 0.0), 100.0) / 100.0
+        low = int(position)
+        high = min(low + 1, len(self.sorted) - 1)
+        return self.sorted[low] + (self.sorted[high] - self.sorted[low]) * (position - low)
+
+    def summary(self) -> dict:
+        return {
+            "count": len(self.values),
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+            "p10": self.percentile(10),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+        }
+
+
+class EpisodeLog:
+    """
+    Append-only columnar log of episode records, stored as fixed-size chunks on disk.
+
+    Each chunk is a preallocated `.npy` file of `chunk_size` records, written
+    through a memory map, so appending a record is a single row assignment and
+    the log never holds more than one chunk in memory. The number of valid
+    records is kept in `index.json`, rewritten atomically on flush. Queries
+    map the chunks read-only one at a time, so curves over millions of
+    episodes are computed in bounded memory.
+    """
+    def __init__(
+        self, directory: str, chunk_size: int = 65536, window: int = 100, flush_every: int = 100,
+        truncate: bool = False, root: Optional[str] = None
+    ) -> None:
+        """
+        Open a log, creating it if needed.
+
+        Args:
+            directory (str): Directory holding the chunks.
+            chunk_size (int): Records per chunk file.
+            window (int): Number of episodes covered by the rolling statistics.
+            flush_every (int): Records appended between two flushes of the index.
+            truncate (bool): Discard the existing records.
+            root (Optional[str]): Directory the log must be inside to be truncated,
+                the parent of `directory` if None.
+
+        Raises:
+            ValueError: If `truncate` is set and `directory` resolves outside `root`.
+        """
+        self.directory = directory
+        self.flush_every = max(1, flush_every)
+        if truncate:
+            if not is_inside(directory, os.path.dirname(directory) if root is None else root):
+                raise ValueError(f"Refusing to truncate '{directory}': it is outside of its root directory")
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
+        os.makedirs(directory, exist_ok=True)
+
+        index = self._read_index()
+        self.chunk_size = index.get("chunk_size", chunk_size)
+        self.count = index.get("count", 0)
+        self.window = window
+        self.rolling = {field: RollingWindow(window) for field in ROLLING_FIELDS}
+        self._chunk = None
+        self._chunk_id = -1
+        self._unflushed = 0
+
+        for record in self.tail(window):
+            self._push_rolling(record)
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, "index.json"))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(
+        self, length: int, reward: float, epsilon: Optional[float] = None, loss: Optional[float] = None,
+        duration: float = 0.0, wall_time: Optional[float] = None
+    ) -> int:
+        """
+        Append the record of a completed episode.
+
+        Args:
+            length (int): Number of steps in the episode.
+            reward (float): Return of the episode.
+            epsilon (Optional[float]): Exploration rate during the episode.
+            loss (Optional[float]): Latest training loss, if any.
+            duration (float): Wall-clock seconds spent in the episode.
+            wall_time (Optional[float]): Unix time at the end of the episode, now if None.
+
+        Returns:
+            int: Index of the episode in the log.
+        """
+        episode = self.count
+        chunk_id, row = divmod(episode, self.chunk_size)
+        if chunk_id != self._chunk_id:
+            self._open_chunk(chunk_id)
+        epsilon = np.nan if epsilon is None else float(epsilon)
+        loss = np.nan if loss is None else float(loss)
+        wall_time = time.time() if wall_time is None else wall_time
+        self._chunk[row] = (episode, length, reward, epsilon, loss, duration, wall_time)
+        self.count += 1
+        self.rolling["reward"].push(float(reward))
+        self.rolling["length"].push(float(length))
+        self.rolling["loss"].push(loss)
+
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+        return episode
+
+    def flush(self) -> None:
+        """
+        Write the current chunk and the record count to disk.
+        """
+        if self._chunk is not None:
+            self._chunk.flush()
+        path = os.path.join(self.directory, "index.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"count": self.count, "chunk_size": self.chunk_size, "dtype": EPISODE_DTYPE.descr}, f)
+        os.replace(tmp, path)
+        self._unflushed = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._chunk = None
+        self._chunk_id = -1
+
+    def summary(self) -> dict:
+        """
+        Rolling statistics over the last `window` episodes.
+
+        Returns:
+            dict: Episode count, window size and one summary per rolling field.
+        """
+        return {
+            "episodes": self.count,
+            "window": self.window,
+            **{field: rolling.summary() for field, rolling in self.rolling.items()},
+        }
+
+    def chunks(self, start: int = 0, end: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Iterate over the records of a range, one chunk slice at a time.
+
+        Args:
+            start (int): First episode.
+            end (Optional[int]): Episode after the last one, the end of the log if None.
+
+        Yields:
+            np.ndarray: Read-only record slices, in order.
+        """
+        end = self.count if end is None else min(end, self.count)
+        start = max(0, start)
+        while start < end:
+            chunk_id, row = divmod(start, self.chunk_size)
+            stop = min(end - chunk_id * self.chunk_size, self.chunk_size)
+            if chunk_id == self._chunk_id:
+                chunk = self._chunk
+            else:
+                chunk = np.load(self._chunk_path(chunk_id), mmap_mode="r")
+            yield chunk[row:stop]
+            start = chunk_id * self.chunk_size + stop
+
+    def tail(self, n: int) -> np.ndarray:
+        """
+        Copy the last `n` records.
+
+        Args:
+            n (int): Number of records.
+
+        Returns:
+            np.ndarray: The records, oldest first.
+        """
+        parts = list(self.chunks(self.count - n)) if n > 0 else []
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=EPISODE_DTYPE)
+
+    def downsample(self, field: str = "reward", start: int = 0, end: Optional[int] = None, points: int = 500) -> dict:
+        """
+        Summarize a field over a range of episodes into at most `points` buckets.
+
+        Buckets hold consecutive episodes and are reduced chunk by chunk, so
+        only one chunk of the log is mapped at a time. NaN values are ignored.
+
+        Args:
+            field (str): One of CURVE_FIELDS.
+            start (int): First episode.
+            end (Optional[int]): Episode after the last one, the end of the log if None.
+            points (int): Maximum number of buckets.
+
+        Returns:
+            dict: First episode of each bucket with the mean, min and max of the field.
+        """
+        if field not in CURVE_FIELDS:
+            raise ValueError(f"Unknown field '{field}', expected one of {CURVE_FIELDS}")
+        start = max(0, start)
+        end = self.count if end is None else min(end, self.count)
+        total = max(0, end - start)
+        bucket = max(1, math.ceil(total / max(1, points)))
+        num_buckets = math.ceil(total / bucket)
+        sums = np.zeros(num_buckets)
+        counts = np.zeros(num_buckets, dtype=np.int64)
+        mins = np.full(num_buckets, np.nan)
+        maxs = np.full(num_buckets, np.nan)
+
+        offset = start
+        for records in self.chunks(start, end):
+            values = records[field].astype(np.float64)
+            # Local positions where a bucket starts, plus the first row of the slice
+            first = offset + (-(offset - start)) % bucket
+            starts = np.arange(first, offset + len(values), bucket) - offset
+            if len(starts) == 0 or starts[0] != 0:
+                starts = np.concatenate(([0], starts))
+            ids = (offset + starts - start) // bucket
+
+            valid = ~np.isnan(values)
+            np.add.at(sums, ids, np.add.reduceat(np.where(valid, values, 0.0), starts))
+            np.add.at(counts, ids, np.add.reduceat(valid.astype(np.int64), starts))
+            np.fmin.at(mins, ids, np.fmin.reduceat(values, starts))
+            np.fmax.at(maxs, ids, np.fmax.reduceat(values, starts))
+            offset += len(values)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        return {
+            "field": field,
+            "bucket_size": bucket,
+            "episode": (start + np.arange(num_buckets) * bucket).tolist(),
+            "mean": _to_list(means),
+            "min": _to_list(mins),
+            "max": _to_list(maxs),
+        }
+
+    def _push_rolling(self, record) -> None:
+        for field, rolling in self.rolling.items():
+            rolling.push(float(record[field]))
+
+    def _open_chunk(self, chunk_id: int) -> None:
+        if self._chunk is not None:
+            self._chunk.flush()
+        path = self._chunk_path(chunk_id)
+        if os.path.exists(path):
+            self._chunk = np.load(path, mmap_mode="r+")
+        else:
+            self._chunk = np.lib.format.open_memmap(path, mode="w+", dtype=EPISODE_DTYPE, shape=(self.chunk_size,))
+        self._chunk_id = chunk_id
+
+    def _chunk_path(self, chunk_id: int) -> str:
+        return os.path.join(self.directory, f"chunk_{chunk_id:06d}.npy")
+
+    def _read_index(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, "index.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def _to_list(values: np.ndarray) -> list:
+    return [None if math.isnan(v) else v for v in values.tolist()]
@@ -0,0 +1,141 @@
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# Evaluations run one at a time, off the event loop; later requests wait in the queue
+evaluation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evaluation")
+
+
+class EnvBatch:
+    """
+    Scalar environments behind the interface of the vectorized ones.
+
+    Used for observation modes the NumPy environments do not implement:
+    `step` advances every environment and resets the finished ones.
+    """
+    def __init__(self, envs: list) -> None:
+        """
+        Initialize the batch.
+
+        Args:
+            envs (list): Environments of the same game and observation mode.
+        """
+        self.envs = envs
+        self.num_envs = len(envs)
+        self.win_on_timeout = envs[0].win_on_timeout
+
+    def reset(self) -> np.ndarray:
+        for env in self.envs:
+            env.reset()
+        return self.get_state()
+
+    def reset_envs(self, idx: np.ndarray) -> None:
+        for i in idx:
+            self.envs[i].reset()
+
+    def step(self, actions: np.ndarray):
+        """
+        Advance every environment by one time step.
+
+        Args:
+            actions (np.ndarray): One action per environment.
+
+        Returns:
+            tuple: (states, rewards, dones), finished environments already hold their reset state.
+        """
+        rewards = np.empty(self.num_envs, dtype=np.float32)
+        dones = np.empty(self.num_envs, dtype=bool)
+        for i, (env, action) in enumerate(zip(self.envs, actions.tolist())):
+            _, rewards[i], dones[i] = env.step(action)
+            if dones[i]:
+                env.reset()
+        return self.get_state(), rewards, dones
+
+    def get_state(self) -> np.ndarray:
+        return np.stack([env.get_state() for env in self.envs])
+
+
+def evaluate_policy(
+    env, policy: Callable[[np.ndarray], np.ndarray], episodes: int, max_steps: int = 1000, bins: int = 20
+) -> dict:
+    """
+    Play a fixed number of episodes with a policy across a batch of environments.
+
+    Every environment owes an equal share of the episodes and stops counting
+    once it has played them, so short episodes are not over-represented the
+    way they would be by keeping the first `episodes` to finish. Episodes that
+    reach `max_steps` are cut off and count as won if the game's
+    `win_on_timeout` says so; other episodes are won when their last reward is
+    positive (e.g. a snake filling the board).
+
+    Args:
+        env: Vectorized environment (`step` takes a batch of actions and resets finished games).
+        policy (Callable): Maps a batch of states to a batch of actions.
+        episodes (int): Number of episodes to play, at least one.
+        max_steps (int): Steps after which an episode is cut off.
+        bins (int): Number of bins of the return histogram.
+
+    Returns:
+        dict: Return distribution, mean episode length, win and cutoff rates, and throughput.
+    """
+    if episodes < 1:
+        raise ValueError("At least one episode is needed")
+    num_envs = env.num_envs
+    quota = np.full(num_envs, episodes // num_envs)
+    quota[:episodes % num_envs] += 1
+    running_returns = np.zeros(num_envs)
+    running_lengths = np.zeros(num_envs, dtype=np.int64)
+    returns = np.empty(episodes)
+    lengths = np.empty(episodes, dtype=np.int64)
+    wins = np.empty(episodes, dtype=bool)
+    cutoffs = np.empty(episodes, dtype=bool)
+    count = 0
+    steps = 0
+
+    start = time.perf_counter()
+    states = env.reset()
+    while count < episodes:
+        states, rewards, dones = env.step(policy(states))
+        running_returns += rewards
+        running_lengths += 1
+        steps += num_envs
+        cut = ~dones & (running_lengths >= max_steps)
+        finished = dones | cut
+        if not finished.any():
+            continue
+
+        ended = np.flatnonzero(finished & (quota > 0))
+        stop = count + len(ended)
+        returns[count:stop] = running_returns[ended]
+        lengths[count:stop] = running_lengths[ended]
+        cutoffs[count:stop] = cut[ended]
+        wins[count:stop] = np.where(cut[ended], env.win_on_timeout, rewards[ended] > 0)
+        quota[ended] -= 1
+        count = stop
+
+        running_returns[finished] = 0.0
+        running_lengths[finished] = 0
+        if cut.any():
+            env.reset_envs(np.flatnonzero(cut))
+            states = env.get_state()
+    seconds = time.perf_counter() - start
+
+    counts, edges = np.histogram(returns, bins=bins)
+    percentiles = np.percentile(returns, [5, 25, 50, 75, 95])
+    return {
+        "episodes": episodes,
+        "num_envs": num_envs,
+        "mean_return": float(returns.mean()),
+        "std_return": float(returns.std()),
+        "min_return": float(returns.min()),
+        "max_return": float(returns.max()),
+        "percentiles": dict(zip(("p5", "p25", "p50", "p75", "p95"), percentiles.tolist())),
+        "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+        "mean_length": float(lengths.mean()),
+        "win_rate": float(wins.mean()),
+        "cutoff_rate": float(cutoffs.mean()),
+        "seconds": seconds,
+        "episodes_per_sec": episodes / seconds,
+        "steps_per_sec": steps / seconds,
+    }
@@ -0,0 +1,187 @@
+import json
+import struct
+import time
+import weakref
+import numpy as np
+from typing import Optional
+
+
+# Binary message header: kind, flags, item count, sequence number (little-endian)
+HEADER = struct.Struct("<BBHI")
+
+KIND_FLOAT32 = 1      # float32[count] state, used for Pong
+KIND_UINT8 = 2        # uint8[count] state with -1 encoded as 255, used for Snake
+KIND_GRID_KEY = 3     # uint8[count] cell grid: 0 empty, 1 body, 2 head, 3 food
+KIND_GRID_DELTA = 4   # count x (uint16 cell, uint8 value) changes since the previous frame
+
+CELL_EMPTY, CELL_BODY, CELL_HEAD, CELL_FOOD = 0, 1, 2, 3
+DELTA_DTYPE = np.dtype([("cell", "<u2"), ("value", "u1")])
+
+PROTOCOLS = ("json", "binary", "delta")
+
+
+def snake_grid_size(state_size: int) -> Optional[int]:
+    """
+    Recover the grid size from the length of a Snake coordinate state.
+
+    Args:
+        state_size (int): Length of the state (2 * grid_size ** 2 + 2).
+
+    Returns:
+        Optional[int]: The grid size, or None if the length does not match the layout.
+    """
+    grid_size = int(round(((state_size - 2) / 2) ** 0.5))
+    return grid_size if grid_size > 0 and 2 * grid_size ** 2 + 2 == state_size else None
+
+
+def _to_list(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def send_payload(websocket, payload) -> None:
+    """
+    Send an encoded frame as a text or binary WebSocket message.
+
+    Args:
+        websocket: The WebSocket connection.
+        payload (str | bytes): The encoded frame.
+    """
+    if isinstance(payload, bytes):
+        await websocket.send_bytes(payload)
+    else:
+        await websocket.send_text(payload)
+
+
+class Frame:
+    """
+    A published frame and its encodings, each computed at most once.
+
+    Frames are shared by all clients, so a frame is serialized once per
+    protocol no matter how many viewers receive it.
+    """
+    def __init__(self, data: dict, game: str) -> None:
+        """
+        Initialize the frame.
+
+        Args:
+            data (dict): Frame data; the "state" and "seq" keys feed the binary encodings.
+            game (str): The game identifier, which selects the binary layout.
+        """
+        self.data = data
+        self.game = game
+        self.seq = int(data.get("seq", 0)) & 0xFFFFFFFF
+        self.created = time.perf_counter()
+        self._state = None
+        self._grid = None
+        self._cache = {}
+        self._deltas = {}
+
+    @property
+    def state(self) -> np.ndarray:
+        if self._state is None:
+            self._state = np.asarray(self.data.get("state", []), dtype=np.float32)
+        return self._state
+
+    @property
+    def grid(self) -> Optional[np.ndarray]:
+        """
+        The Snake cell grid of the frame, or None if the state is not a Snake coordinate state.
+        """
+        if self._grid is None and self.game == "snake":
+            grid_size = snake_grid_size(len(self.state))
+            if grid_size is None:
+                return None
+            coords = self.state[:-2].reshape(-1, 2).astype(np.int64)
+            segments = coords[coords[:, 0] >= 0]
+            grid = np.zeros(grid_size ** 2, dtype=np.uint8)
+            cells = segments[:, 1] * grid_size + segments[:, 0]
+            grid[cells] = CELL_BODY
+            fx, fy = self.state[-2:].astype(np.int64)
+            grid[fy * grid_size + fx] = CELL_FOOD
+            if len(cells):
+                grid[cells[0]] = CELL_HEAD
+            self._grid = grid
+        return self._grid
+
+    def encode(self, protocol: str, base: Optional["Frame"] = None):
+        """
+        Encode the frame for a protocol, reusing a previous encoding when possible.
+
+        Args:
+            protocol (str): "json", "binary" or "delta".
+            base (Optional[Frame]): Last frame received by the client, for the delta protocol.
+
+        Returns:
+            str | bytes: The encoded frame.
+        """
+        if protocol == "delta":
+            if self.grid is None:
+                protocol = "binary"
+            elif base is None or base.grid is None or len(base.grid) != len(self.grid):
+                protocol = "keyframe"
+        if protocol != "delta":
+            if protocol not in self._cache:
+                self._cache[protocol] = self._encode(protocol, base)
+            return self._cache[protocol]
+        # Deltas are keyed on the base frame itself: sequence numbers restart with every run.
+        # The weak reference tells a live base from a collected one whose id was reused.
+        cached = self._deltas.get(id(base))
+        if cached is None or cached[0]() is not base:
+            cached = self._deltas[id(base)] = (weakref.ref(base), self._encode(protocol, base))
+        return cached[1]
+
+    def _encode(self, protocol: str, base: Optional["Frame"]):
+        if protocol == "json":
+            return json.dumps(self.data, default=_to_list)
+        if protocol == "keyframe":
+            return HEADER.pack(KIND_GRID_KEY, 0, len(self.grid), self.seq) + self.grid.tobytes()
+        if protocol == "delta":
+            cells = np.flatnonzero(self.grid != base.grid)
+            changes = np.empty(len(cells), dtype=DELTA_DTYPE)
+            changes["cell"] = cells
+            changes["value"] = self.grid[cells]
+            return HEADER.pack(KIND_GRID_DELTA, 0, len(cells), self.seq) + changes.tobytes()
+        if self.game == "snake":
+            payload = self.state.astype(np.int16).astype(np.uint8)
+            return HEADER.pack(KIND_UINT8, 0, len(payload), self.seq) + payload.tobytes()
+        return HEADER.pack(KIND_FLOAT32, 0, len(self.state), self.seq) + self.state.tobytes()
+
+
+class FrameStream:
+    """
+    Per-client encoding state: the negotiated protocol and, for the delta
+    protocol, the last frame sent and the keyframe schedule.
+    """
+    def __init__(self, protocol: str = "json", keyframe_interval: int = 100) -> None:
+        """
+        Initialize the stream.
+
+        Args:
+            protocol (str): "json", "binary" or "delta".
+            keyframe_interval (int): Frames between two full keyframes in delta mode.
+        """
+        self.protocol = protocol if protocol in PROTOCOLS else "json"
+        self.keyframe_interval = keyframe_interval
+        self.base = None
+        self.since_keyframe = 0
+
+    def encode(self, frame: Frame):
+        """
+        Encode the next frame sent to the client.
+
+        Args:
+            frame (Frame): The frame to send.
+
+        Returns:
+            str | bytes: The encoded frame.
+        """
+        if self.protocol != "delta":
+            return frame.encode(self.protocol)
+        if self.since_keyframe >= self.keyframe_interval:
+            self.base = None
+        payload = frame.encode("delta", self.base)
+        self.since_keyframe = 0 if self.base is None else self.since_keyframe + 1
+        self.base = frame
+        return payload
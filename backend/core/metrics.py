@@ -0,0 +1,332 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+
+# Latency buckets in seconds, from 10 microseconds to 10 seconds
+LATENCY_BUCKETS = (
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """
+    Base class of a metric family: one child per combination of label values.
+
+    Children are created once under a lock and then updated without locking;
+    hot paths should keep a reference to their child instead of calling
+    `labels` on every observation.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        """
+        Initialize the metric family.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (Iterable[str]): Names of the labels.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        """
+        Get the child for a combination of label values, creating it if needed.
+
+        Args:
+            *values: Label values in the order of `labelnames`.
+            **kwargs: Label values by name.
+
+        Returns:
+            The child metric.
+        """
+        key = tuple(str(kwargs[name]) for name in self.labelnames) if kwargs else tuple(map(str, values))
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self._new_child())
+        return child
+
+    def remove(self, *values) -> None:
+        self.children.pop(tuple(map(str, values)), None)
+
+    @abstractmethod
+    def _new_child(self):
+        pass
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self.children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: tuple, child) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing counter.
+    """
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down.
+    """
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation: a bisection over the fixed bucket bounds and three increments.
+
+        Args:
+            value (float): The observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts: list, total: float) -> None:
+        """
+        Add observations aggregated elsewhere, e.g. by another process with the same buckets.
+
+        Args:
+            counts (list): Number of new observations per bucket, +Inf last.
+            total (float): Sum of the new observations.
+        """
+        for i, count in enumerate(counts):
+            self.counts[i] += count
+        self.sum += total
+        self.count += sum(counts)
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self.child = child
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observations over pre-defined buckets.
+
+    Counts are stored per bucket and only accumulated when rendered, so an
+    observation never touches more than one bucket.
+    """
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple = LATENCY_BUCKETS
+    ) -> None:
+        """
+        Initialize the histogram family.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (Iterable[str]): Names of the labels.
+            buckets (tuple): Sorted upper bounds of the buckets (+Inf is implicit).
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, key: tuple, child: _HistogramChild) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), list(child.counts)):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metric families rendered in the Prometheus text format.
+
+    Besides the families updated by the application, collectors are called at
+    scrape time to report values that are cheaper to read than to track
+    (client counts, queue depths, throughput).
+    """
+    def __init__(self) -> None:
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """
+        Register a function returning metric families built at scrape time.
+
+        Args:
+            collector (Callable): Returns an iterable of metrics.
+        """
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            try:
+                for metric in collector():
+                    lines.extend(metric.render())
+            except Exception as e:
+                print(f"❌ Metrics collector error: {e}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STEP_LABELS = ("game", "run")
+
+env_step_seconds = registry.histogram(
+    "env_step_seconds", "Latency of env.step.", STEP_LABELS)
+get_action_seconds = registry.histogram(
+    "agent_get_action_seconds", "Latency of agent.get_action.", STEP_LABELS)
+update_seconds = registry.histogram(
+    "agent_update_seconds", "Latency of agent.update, including gradient steps.", STEP_LABELS)
+broadcast_seconds = registry.histogram(
+    "broadcast_latency_seconds", "Time from publishing a frame to sending it to a client.", STEP_LABELS)
+steps_total = registry.counter(
+    "training_steps_total", "Environment steps taken by training.", STEP_LABELS)
+episodes_total = registry.counter(
+    "training_episodes_total", "Episodes completed by training.", STEP_LABELS)
+frames_sent_total = registry.counter(
+    "websocket_frames_sent_total", "Frames sent to WebSocket clients.", STEP_LABELS)
+frames_dropped_total = registry.counter(
+    "websocket_frames_dropped_total", "Frames dropped because a client was too slow.", STEP_LABELS)
+checkpoint_seconds = registry.histogram(
+    "checkpoint_write_seconds", "Duration of checkpoint serialization and writing.", STEP_LABELS)
+event_loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "Delay of the event loop in waking up a periodic timer.")
+event_loop_lag = event_loop_lag_seconds.labels()
+
+
+class StepMetrics:
+    """
+    Pre-bound metric children for the training hot path of one run.
+    """
+    def __init__(self, game: str, run: str) -> None:
+        """
+        Resolve the children of a run once, so each observation is a plain method call.
+
+        Args:
+            game (str): The game identifier.
+            run (str): The run identifier.
+        """
+        self.env_step = env_step_seconds.labels(game, run)
+        self.get_action = get_action_seconds.labels(game, run)
+        self.update = update_seconds.labels(game, run)
+        self.steps = steps_total.labels(game, run)
+        self.episodes = episodes_total.labels(game, run)
+
+
+async def monitor_event_loop(interval: float = 0.5) -> None:
+    """
+    Measure how late the event loop wakes up a periodic timer, forever.
+
+    Args:
+        interval (float): Seconds between two measurements.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - start - interval))
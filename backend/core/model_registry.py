@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Optional
+
+from core.checkpoint_writer import get_checkpoint_writer
+
+
+class ModelHandle:
+    """
+    A loaded model together with the checkpoint it was loaded from.
+    """
+    def __init__(self, path: str, version: Optional[int], signature: tuple, model: Any) -> None:
+        """
+        Initialize the handle.
+
+        Args:
+            path (str): Path of the checkpoint file.
+            version (Optional[int]): Checkpoint version, if known.
+            signature (tuple): Modification time and size of the file when it was loaded.
+            model (Any): The loaded model.
+        """
+        self.path = path
+        self.version = version
+        self.signature = signature
+        self.model = model
+        self.checked_at = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    Cache of loaded models keyed by checkpoint path and modification time.
+
+    Lookups are served from memory. The model file of a path is only stat'ed
+    again after `check_interval` seconds, and checkpoints produced by the
+    checkpoint writer are loaded on the writer thread as soon as they are
+    written, so new weights are swapped in without any disk I/O on the event
+    loop. Versioned checkpoint files are immutable and never re-checked.
+    """
+    def __init__(self, loader: Callable[[str], Any], check_interval: float = 1.0) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            loader (Callable): Builds a ready-to-use model from a checkpoint path.
+            check_interval (float): Seconds between two modification checks of a model file.
+        """
+        self.loader = loader
+        self.check_interval = check_interval
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, path: str, version: Optional[int] = None) -> Optional[ModelHandle]:
+        """
+        Get the model of a checkpoint, loading it only if it is not cached or has changed.
+
+        Args:
+            path (str): Path of the model file.
+            version (Optional[int]): Checkpoint version to pin, or None for the latest weights.
+
+        Returns:
+            Optional[ModelHandle]: The loaded model, or None if the checkpoint does not exist.
+        """
+        if version is not None:
+            key = (path, version)
+            handle = self.entries.get(key)
+            if handle is None:
+                versioned = get_checkpoint_writer().version_path(path, version)
+                if versioned is None:
+                    return None
+                handle = self._load(key, versioned, version)
+            return handle
+
+        key = (path, None)
+        handle = self.entries.get(key)
+        now = time.monotonic()
+        if handle is not None and now - handle.checked_at < self.check_interval:
+            return handle
+        signature = self._signature(path)
+        if signature is None:
+            return handle
+        if handle is not None and handle.signature == signature:
+            handle.checked_at = now
+            return handle
+        versions = get_checkpoint_writer().versions(path)
+        return self._load(key, path, versions[-1] if versions else None)
+
+    def set_loader(self, loader: Callable[[str], Any]) -> None:
+        """
+        Replace the loader and drop the cached models, which are loaded again on their next use.
+
+        Args:
+            loader (Callable): Builds a ready-to-use model from a checkpoint path.
+        """
+        with self.lock:
+            self.loader = loader
+            self.entries = {}
+
+    def notify(self, path: str, version: int) -> None:
+        """
+        Checkpoint writer listener: load a freshly written checkpoint of a cached path.
+
+        Args:
+            path (str): Path of the model file.
+            version (int): Version that was written.
+        """
+        if (path, None) in self.entries:
+            try:
+                self._load((path, None), path, version)
+            except Exception as e:
+                print(f"❌ Error reloading model: {e}")
+
+    def _load(self, key: tuple, path: str, version: Optional[int]) -> ModelHandle:
+        with self.lock:
+            signature = self._signature(path)
+            current = self.entries.get(key)
+            if current is not None and current.signature == signature:
+                return current
+            handle = ModelHandle(key[0], version, signature, self.loader(path))
+            self.entries[key] = handle
+            self.loads += 1
+        print(f"✅ Model loaded from '{path}'" + (f" (version {version})." if version else "."))
+        return handle
+
+    @staticmethod
+    def _signature(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+class RegistryPolicy:
+    """
+    Greedy inference policy backed by a model registry of inference backends.
+
+    Exposes the agent interface used by the batched action server, and
+    resolves the model on every batch, so sessions pick up new checkpoints
+    between two frames without being interrupted.
+    """
+    def __init__(
+        self, registry: ModelRegistry, path: str, num_actions: int, epsilon: float = 0.0,
+        version: Optional[int] = None, fallback: Any = None
+    ) -> None:
+        """
+        Initialize the policy.
+
+        Args:
+            registry (ModelRegistry): Registry holding the loaded models.
+            path (str): Path of the model file.
+            num_actions (int): Number of actions.
+            epsilon (float): Probability of taking a random action.
+            version (Optional[int]): Checkpoint version to pin, or None to follow the latest weights.
+            fallback (Any): Inference backend used while no checkpoint exists.
+        """
+        self.registry = registry
+        self.path = path
+        self.num_actions = num_actions
+        self.epsilon = epsilon
+        self.version = version
+        self.fallback = fallback
+
+    @property
+    def handle(self) -> Optional[ModelHandle]:
+        return self.registry.get(self.path, self.version)
+
+    def get_actions(self, states: np.ndarray, is_inferencing: bool = True) -> np.ndarray:
+        """
+        Select one action per state with a single batched forward pass.
+
+        Args:
+            states (np.ndarray): Array of shape (batch, state_size).
+            is_inferencing (bool): Kept for compatibility with the agent interface.
+
+        Returns:
+            np.ndarray: Selected actions.
+        """
+        handle = self.handle
+        backend = handle.model if handle is not None else self.fallback
+        actions = backend.actions(states)
+        explore = np.random.rand(len(actions)) < self.epsilon
+        actions[explore] = np.random.randint(0, self.num_actions, size=int(explore.sum()))
+        return actions
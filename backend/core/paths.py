@@ -0,0 +1,36 @@
+import os
+import re
+
+# Run, game and sweep identifiers become file and directory names
+ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def is_valid_id(value: str) -> bool:
+    """
+    Check whether an identifier is safe to use as a file or directory name.
+
+    Args:
+        value (str): The identifier.
+
+    Returns:
+        bool: True if it only holds letters, digits, '_' and '-' (1 to 64 characters).
+    """
+    return isinstance(value, str) and ID_PATTERN.fullmatch(value) is not None
+
+
+def is_inside(path: str, root: str) -> bool:
+    """
+    Check whether a path resolves to a location strictly inside a root directory.
+
+    Symbolic links and '..' components are resolved first, so a path cannot
+    escape the root through them.
+
+    Args:
+        path (str): The path to check.
+        root (str): The directory it must stay inside.
+
+    Returns:
+        bool: True if the path is inside the root and is not the root itself.
+    """
+    path, root = os.path.realpath(path), os.path.realpath(root)
+    return path != root and os.path.commonpath([path, root]) == root
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from core.state_machine import State
+
+
+class TrainingRun:
+    """
+    A training job with its own state machine, environment, agent and task.
+    """
+    def __init__(
+        self, run_id: str, game: str, state_machine, env, agent, broadcaster,
+        mode: str = "normal", options: Optional[dict] = None
+    ) -> None:
+        """
+        Initialize the run without starting it.
+
+        Args:
+            run_id (str): Unique identifier of the run.
+            game (str): The game identifier.
+            state_machine: The run's state machine.
+            env: The run's environment.
+            agent: The run's agent.
+            broadcaster: Broadcaster feeding the run's visualization clients.
+            mode (str): Training mode ("normal", "turbo" or "distributed").
+            options (Optional[dict]): Mode options (steps_per_tick, fps, num_actors, ...).
+        """
+        self.run_id = run_id
+        self.game = game
+        self.state_machine = state_machine
+        self.env = env
+        self.agent = agent
+        self.broadcaster = broadcaster
+        self.mode = mode
+        self.options = options or {}
+        # A distributed run occupies one core per actor plus one for the learner
+        self.cpus = self.options.get("num_actors", 1) + 1 if mode == "distributed" else 1
+        self.recorder = None
+        # Compute worker process of normal and turbo runs started with the "worker" option
+        self.worker = None
+        self.task = None
+        self.queued = False
+        self.cancelled = False
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return "cancelled"
+        if self.queued:
+            return "queued"
+        if self.task is None:
+            return "created"
+        if not self.task.done():
+            return self.state_machine.state.value
+        if not self.task.cancelled() and self.task.exception() is not None:
+            return "failed"
+        return "finished"
+
+    def uses_worker(self) -> bool:
+        """
+        Check whether the run trains in a compute worker process.
+
+        Returns:
+            bool: True for normal and turbo runs started with the "worker" option.
+        """
+        return self.mode in ("normal", "turbo") and self.options.get("worker", False)
+
+    def is_active(self) -> bool:
+        """
+        Check whether the run is queued or running.
+
+        Returns:
+            bool: True if the run is queued or its task is still running.
+        """
+        return self.queued or (self.task is not None and not self.task.done())
+
+    def to_dict(self) -> dict:
+        state_machine = self.state_machine
+        return {
+            "run_id": self.run_id,
+            "game": self.game,
+            "mode": self.mode,
+            "status": self.status,
+            "cpus": self.cpus,
+            "current_episode": state_machine.current_episode,
+            "max_episodes": state_machine.max_episodes,
+            "average_reward": (state_machine.total_reward / state_machine.num_episodes_completed)
+                              if state_machine.num_episodes_completed > 0 else 0,
+            "steps_per_sec": state_machine.steps_per_sec,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RunRegistry:
+    """
+    Registry of training runs keyed by run id, with a CPU-aware FIFO scheduler.
+
+    Runs are started while the cores they need fit in `max_cpus`; the others
+    wait in a queue and start as soon as a running run finishes. A run that
+    needs more cores than the machine has still starts when nothing else runs.
+    """
+    def __init__(self, max_cpus: Optional[int] = None) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            max_cpus (Optional[int]): Cores available to runs, defaults to the machine's core count.
+        """
+        self.max_cpus = max_cpus or os.cpu_count() or 1
+        self.runs = {}
+        self.queue = deque()
+        self.runners = {}
+        # Cores claimed by work running outside the registry, e.g. sweep trials
+        self.reserved_cpus = 0
+
+    def get(self, run_id: str) -> Optional[TrainingRun]:
+        return self.runs.get(run_id)
+
+    def list(self) -> list:
+        return list(self.runs.values())
+
+    @property
+    def cpus_in_use(self) -> int:
+        return self.reserved_cpus + sum(
+            run.cpus for run in self.runs.values() if run.task is not None and not run.task.done()
+        )
+
+    def reserve(self, cpus: int = 1) -> bool:
+        """
+        Claim cores for work the registry does not run itself, if they are free.
+
+        Queued runs keep their turn: nothing is reserved while one is waiting.
+
+        Args:
+            cpus (int): Number of cores to claim.
+
+        Returns:
+            bool: True if the cores were reserved and must be given back with `release`.
+        """
+        if self.queue or self.cpus_in_use + cpus > self.max_cpus:
+            return False
+        self.reserved_cpus += cpus
+        return True
+
+    def release(self, cpus: int = 1) -> None:
+        """
+        Give back cores claimed with `reserve`, starting the queued runs that now fit.
+
+        Args:
+            cpus (int): Number of cores to give back.
+        """
+        self.reserved_cpus = max(0, self.reserved_cpus - cpus)
+        self._schedule()
+
+    def submit(self, run: TrainingRun, runner: Callable[[TrainingRun], Awaitable]) -> bool:
+        """
+        Register a run and start it now or queue it until enough cores are free.
+
+        Args:
+            run (TrainingRun): The run to schedule.
+            runner (Callable): Coroutine function executing the run.
+
+        Returns:
+            bool: True if the run started immediately, False if it was queued.
+        """
+        existing = self.runs.get(run.run_id)
+        if existing is not None and existing.is_active():
+            raise ValueError(f"Run '{run.run_id}' is already active")
+        self.runs[run.run_id] = run
+        self.runners[run.run_id] = runner
+        run.queued = True
+        self.queue.append(run)
+        self._schedule()
+        return not run.queued
+
+    def cancel(self, run_id: str) -> bool:
+        """
+        Remove a queued run from the queue.
+
+        Args:
+            run_id (str): Identifier of the run.
+
+        Returns:
+            bool: True if the run was queued and has been cancelled.
+        """
+        run = self.runs.get(run_id)
+        if run is None or not run.queued:
+            return False
+        self.queue.remove(run)
+        run.queued = False
+        run.cancelled = True
+        return True
+
+    def _schedule(self) -> None:
+        while self.queue:
+            run = self.queue[0]
+            in_use = self.cpus_in_use
+            if in_use and in_use + run.cpus > self.max_cpus:
+                break
+            self.queue.popleft()
+            run.queued = False
+            run.started_at = time.time()
+            run.task = asyncio.ensure_future(self.runners.pop(run.run_id)(run))
+            run.task.add_done_callback(lambda task, run=run: self._on_done(run))
+
+    def _on_done(self, run: TrainingRun) -> None:
+        run.finished_at = time.time()
+        if run.state_machine.state != State.IDLE:
+            run.state_machine.set_state(State.IDLE)
+        self._schedule()
@@ -0,0 +1,70 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Reference point of the startup timings: the first import of this module
+_origin = time.perf_counter()
+_lock = threading.Lock()
+_phases = {}
+_warmup = {}
+_ready = None
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """
+    Record the duration of a startup phase.
+
+    Phases are recorded once: later timings of the same phase, e.g. an
+    import that is already cached, are ignored.
+
+    Args:
+        name (str): Name of the phase.
+        seconds (float): Duration of the phase.
+    """
+    with _lock:
+        _phases.setdefault(name, {"seconds": seconds, "at": time.perf_counter() - _origin})
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Time the enclosed block as a startup phase.
+
+    Args:
+        name (str): Name of the phase.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def mark_ready() -> None:
+    """
+    Record the time at which the server started accepting requests.
+    """
+    global _ready
+    _ready = time.perf_counter() - _origin
+
+
+def set_warmup_status(game: str, status: str) -> None:
+    with _lock:
+        _warmup[game] = status
+
+
+def startup_report() -> dict:
+    """
+    Describe where the startup time went.
+
+    Returns:
+        dict: Seconds until the server was ready, the duration of every phase
+            and when it ended relative to the first import, and the warm-up
+            status of each preloaded game.
+    """
+    with _lock:
+        return {
+            "ready_seconds": _ready,
+            "phases": {name: dict(phase) for name, phase in _phases.items()},
+            "warmup": dict(_warmup),
+        }
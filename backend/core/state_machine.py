@@ -1,4 +1,8 @@
+import time
 from enum import Enum
+from typing import Optional
+
+from core.episode_log import EpisodeLog
 
 class State(Enum):
     IDLE = "idle"
@@ -16,6 +20,10 @@ class StateMachine:
         self.num_episodes_completed = 0
         self.current_reward = 0
         self.speed = 0.5  # 50 ms → 20 FPS
+        self.episode_log = None
+        self.current_length = 0
+        self._episode_start = time.perf_counter()
+        self._reset_throughput()
 
     def set_state(self, new_state):
         if self.is_valid_transition(new_state):
@@ -38,3 +46,73 @@ class StateMachine:
         self.total_reward = 0
         self.num_episodes_completed = 0
         self.current_reward = 0
+        self.current_length = 0
+        self._episode_start = time.perf_counter()
+        self._reset_throughput()
+
+    def open_episode_log(self, directory: str, window: int = 100, root: Optional[str] = None) -> EpisodeLog:
+        """
+        Start a fresh episode log, replacing the records previously stored in `directory`.
+
+        Args:
+            directory (str): Directory of the log.
+            window (int): Number of episodes covered by the rolling statistics.
+            root (Optional[str]): Directory `directory` must be inside, its parent if None.
+
+        Returns:
+            EpisodeLog: The new log.
+        """
+        if self.episode_log is not None:
+            self.episode_log.close()
+        self.episode_log = EpisodeLog(directory, window=window, truncate=True, root=root)
+        return self.episode_log
+
+    def log_episode(
+        self, length: int, reward: float, epsilon: Optional[float] = None, loss: Optional[float] = None,
+        duration: Optional[float] = None
+    ) -> None:
+        """
+        Record a completed episode in the episode log, if one is open.
+
+        Args:
+            length (int): Number of steps in the episode.
+            reward (float): Return of the episode.
+            epsilon (Optional[float]): Exploration rate during the episode.
+            loss (Optional[float]): Latest training loss.
+            duration (Optional[float]): Seconds spent in the episode, measured since the previous one if None.
+        """
+        now = time.perf_counter()
+        if duration is None:
+            duration = now - self._episode_start
+        self._episode_start = now
+        self.current_length = 0
+        if self.episode_log is not None:
+            self.episode_log.append(length, reward, epsilon, loss, duration)
+
+    def _reset_throughput(self):
+        self.total_steps = 0
+        self.total_updates = 0
+        self.steps_per_sec = 0.0
+        self.updates_per_sec = 0.0
+        self.episodes_per_sec = 0.0
+        self._window_start = time.perf_counter()
+        self._window_steps = 0
+        self._window_updates = 0
+        self._window_episodes = self.num_episodes_completed
+
+    def record_throughput(self, steps, updates, window=1.0):
+        """Count env steps and agent updates, refreshing the per-second rates (steps, updates, episodes) once per window."""
+        self.total_steps += steps
+        self.total_updates += updates
+        self._window_steps += steps
+        self._window_updates += updates
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= window:
+            self.steps_per_sec = self._window_steps / elapsed
+            self.updates_per_sec = self._window_updates / elapsed
+            self.episodes_per_sec = max(0, self.num_episodes_completed - self._window_episodes) / elapsed
+            self._window_start = now
+            self._window_steps = 0
+            self._window_updates = 0
+            self._window_episodes = self.num_episodes_completed
@@ -0,0 +1,460 @@
+import asyncio
+import json
+import math
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+from typing import Callable, Optional
+
+from core.episode_log import EpisodeLog
+
+# DQNAgent keyword arguments a sweep can search over
+TUNABLE_PARAMS = (
+    "learning_rate", "gamma", "epsilon", "epsilon_decay", "epsilon_min", "buffer_capacity", "batch_size",
+    "train_freq", "learning_starts", "prioritized_replay", "per_alpha", "per_beta", "hidden_sizes",
+)
+
+# Trial statuses; "pending" trials (including those interrupted by a stop) run when the sweep is resumed
+TRIAL_STATUSES = ("pending", "running", "stopped", "completed", "failed")
+
+
+class SearchSpace:
+    """
+    Independent distributions of DQNAgent hyperparameters.
+
+    Each entry of the specification is either a fixed value, a list of
+    choices (e.g. `"hidden_sizes": [[64, 64], [128, 128]]`), or a range
+    `{"low": ..., "high": ..., "log": bool, "int": bool}` sampled uniformly,
+    on a log scale if `log` is set.
+    """
+    def __init__(self, spec: dict) -> None:
+        """
+        Validate the specification.
+
+        Args:
+            spec (dict): Distribution of each parameter, keyed by DQNAgent argument name.
+        """
+        unknown = [name for name in spec if name not in TUNABLE_PARAMS]
+        if unknown:
+            raise ValueError(f"Unknown parameters {', '.join(unknown)}, expected some of {', '.join(TUNABLE_PARAMS)}")
+        for name, dist in spec.items():
+            if isinstance(dist, list) and not dist:
+                raise ValueError(f"No choices for '{name}'")
+            if isinstance(dist, dict):
+                if "low" not in dist or "high" not in dist or dist["low"] > dist["high"]:
+                    raise ValueError(f"Range of '{name}' needs low <= high")
+                if dist.get("log") and dist["low"] <= 0:
+                    raise ValueError(f"Log range of '{name}' must be positive")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> dict:
+        """
+        Draw one configuration.
+
+        Args:
+            rng (random.Random): Generator of the sweep.
+
+        Returns:
+            dict: DQNAgent keyword arguments.
+        """
+        params = {}
+        for name, dist in self.spec.items():
+            if isinstance(dist, list):
+                params[name] = rng.choice(dist)
+            elif isinstance(dist, dict):
+                low, high = dist["low"], dist["high"]
+                if dist.get("log"):
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                params[name] = int(round(value)) if dist.get("int") else value
+            else:
+                params[name] = dist
+        return params
+
+
+class AshaScheduler:
+    """
+    Asynchronous successive halving (ASHA) early stopping.
+
+    Rungs sit at `min_episodes * reduction_factor**k` episodes. When a trial
+    reaches a rung, its metric is compared with every metric recorded at that
+    rung so far, and the trial only continues if it ranks in the top
+    `1 / reduction_factor`. Decisions never wait for other trials, so workers
+    are never left idle; early trials are judged leniently, later ones
+    against a growing field.
+    """
+    def __init__(
+        self, min_episodes: int, max_episodes: int, reduction_factor: int = 3, rungs: Optional[dict] = None
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            min_episodes (int): Episodes of the first rung.
+            max_episodes (int): Episodes of a trial that is never stopped.
+            reduction_factor (int): Fraction of trials kept at each rung is 1 / reduction_factor.
+            rungs (Optional[dict]): Metrics already recorded, by rung and trial, when resuming.
+        """
+        self.reduction_factor = max(2, reduction_factor)
+        self.milestones = []
+        milestone = max(1, min_episodes)
+        while milestone < max_episodes:
+            self.milestones.append(milestone)
+            milestone *= self.reduction_factor
+        self.rungs = {milestone: {} for milestone in self.milestones}
+        for milestone, recorded in (rungs or {}).items():
+            if int(milestone) in self.rungs:
+                self.rungs[int(milestone)] = {int(trial): metric for trial, metric in recorded.items()}
+
+    def report(self, trial_id: int, milestone: int, metric: float) -> bool:
+        """
+        Record the metric of a trial reaching a rung.
+
+        Args:
+            trial_id (int): The trial.
+            milestone (int): Episodes played by the trial, one of `milestones`.
+            metric (float): The trial's metric, higher is better.
+
+        Returns:
+            bool: True if the trial continues, False if it should be stopped.
+        """
+        recorded = self.rungs[milestone]
+        recorded[trial_id] = metric
+        ranked = sorted(recorded.values(), reverse=True)
+        cutoff = ranked[max(1, len(ranked) // self.reduction_factor) - 1]
+        return metric >= cutoff
+
+    def forget(self, trial_id: int) -> None:
+        """
+        Drop the metrics of a trial that will be run again from scratch.
+
+        Args:
+            trial_id (int): The trial.
+        """
+        for recorded in self.rungs.values():
+            recorded.pop(trial_id, None)
+
+
+def trial_process(
+    trial_id: int, env_factory: Callable, game: str, params: dict, max_episodes: int, max_steps: int,
+    seed: int, directory: str, reports: "mp.Queue", stop
+) -> None:
+    """
+    Train a fresh agent with the trial's hyperparameters and report every episode.
+
+    The agent starts from random weights rather than the game's saved model.
+    Episodes are cut off after `max_steps` steps. The weights are saved to the
+    trial directory when the trial runs to completion.
+    """
+    import numpy as np
+    import torch  #type: ignore
+    from agents.dqn_agent import DQNAgent
+
+    torch.set_num_threads(1)
+    torch.manual_seed(seed)
+    np.random.seed(seed % 2**32)
+    try:
+        env = env_factory(seed=seed)
+        agent = DQNAgent(load_model=False, **params)
+        agent.initialize(env, game)
+        agent.filename = os.path.join(directory, "model.pth")
+        for _ in range(max_episodes):
+            if stop.is_set():
+                break
+            state = env.reset()
+            done = False
+            length = 0
+            total_reward = 0.0
+            start = time.perf_counter()
+            while not done and length < max_steps:
+                action = agent.get_action(state)
+                next_state, reward, done = env.step(action)
+                agent.update(state, action, reward, next_state, done)
+                state = next_state
+                total_reward += reward
+                length += 1
+            reports.put(("episode", trial_id, (
+                length, total_reward, agent.epsilon, agent.last_loss, time.perf_counter() - start
+            )))
+            agent.decay_epsilon()
+        else:
+            agent.save_model().result()
+        reports.put(("done", trial_id, None))
+    except Exception as e:
+        reports.put(("done", trial_id, str(e)))
+
+
+def join_processes(processes: list, timeout: float) -> None:
+    """
+    Wait for processes to exit, terminating those still alive after `timeout` seconds.
+
+    Args:
+        processes (list): The processes.
+        timeout (float): Seconds to wait for all of them together.
+    """
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        process.join(max(0.0, deadline - time.monotonic()))
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+
+class Sweep:
+    """
+    A hyperparameter sweep: trials trained in parallel processes and pruned with ASHA.
+
+    Every configuration is sampled up front from the sweep seed. The sweep
+    state (configuration, trials and rung metrics) is rewritten atomically to
+    `state.json` whenever it changes, and the episodes of each trial go to
+    its own episode log, so a sweep interrupted by a stop or a server restart
+    resumes where it left off: finished trials are kept, and trials that were
+    running start over.
+    """
+    def __init__(self, directory: str, config: Optional[dict] = None) -> None:
+        """
+        Create a sweep, or open the one stored in `directory` if `config` is None.
+
+        Args:
+            directory (str): Directory of the sweep.
+            config (Optional[dict]): Game, observation, search space, num_trials, max_episodes,
+                min_episodes, reduction_factor, max_steps, window, max_workers and seed of a new sweep.
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, "state.json")
+        if config is None:
+            with open(self.path) as f:
+                state = json.load(f)
+            self.config = state["config"]
+            self.trials = state["trials"]
+            rungs = state["rungs"]
+        else:
+            self.config = config
+            rng = random.Random(config["seed"])
+            space = SearchSpace(config["space"])
+            self.trials = [
+                {"trial_id": i, "params": space.sample(rng), "seed": rng.getrandbits(32), "status": "pending",
+                 "episodes": 0, "metric": None, "rungs": {}, "error": None, "finished_at": None}
+                for i in range(config["num_trials"])
+            ]
+            rungs = None
+        self.scheduler = AshaScheduler(
+            self.config["min_episodes"], self.config["max_episodes"], self.config["reduction_factor"], rungs
+        )
+        for trial in self.trials:
+            if trial["status"] == "running":
+                self._reset_trial(trial)
+        self.logs = {}
+        self.active = {}
+        # Processes of finished trials, with the time after which they are terminated
+        self.exiting = []
+        self.stopping = False
+        self.task = None
+        os.makedirs(directory, exist_ok=True)
+        self.save()
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, "state.json"))
+
+    def is_active(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def save(self) -> None:
+        """
+        Write the sweep state to disk, atomically.
+        """
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "config": self.config,
+                "trials": self.trials,
+                "rungs": {str(m): {str(t): v for t, v in r.items()} for m, r in self.scheduler.rungs.items()},
+            }, f)
+        os.replace(tmp, self.path)
+
+    def trial_log(self, trial_id: int) -> Optional[EpisodeLog]:
+        """
+        Get the episode log of a trial, opening it from disk if the trial is not running.
+
+        Args:
+            trial_id (int): The trial.
+
+        Returns:
+            Optional[EpisodeLog]: The log, or None if the trial never started.
+        """
+        if trial_id in self.logs:
+            return self.logs[trial_id]
+        directory = self._trial_directory(trial_id)
+        return EpisodeLog(directory) if EpisodeLog.exists(directory) else None
+
+    def summary(self) -> dict:
+        """
+        Describe the sweep, with the trials ranked by their latest metric.
+
+        Returns:
+            dict: Configuration, progress counts, best trial and trials.
+        """
+        counts = {status: 0 for status in TRIAL_STATUSES}
+        for trial in self.trials:
+            counts[trial["status"]] += 1
+        ranked = sorted(
+            self.trials, key=lambda trial: (trial["metric"] is None, -(trial["metric"] or 0.0), trial["trial_id"])
+        )
+        return {
+            "sweep_id": os.path.basename(self.directory),
+            "active": self.is_active(),
+            "config": self.config,
+            "milestones": self.scheduler.milestones,
+            "counts": counts,
+            "best": ranked[0] if ranked and ranked[0]["metric"] is not None else None,
+            "trials": ranked,
+        }
+
+    def stop(self) -> None:
+        """
+        Ask the running trials to stop; they are run again when the sweep is resumed.
+        """
+        self.stopping = True
+        for _, stop in self.active.values():
+            stop.set()
+
+    async def run(self, env_factory: Callable, poll_interval: float = 0.05, cpus=None) -> None:
+        """
+        Run the pending trials, at most `max_workers` at a time, until all are finished or the sweep is stopped.
+
+        This coroutine only launches processes and folds their episode reports
+        into the trial logs and the scheduler, so it never blocks the event loop.
+
+        Args:
+            env_factory (Callable): Picklable callable creating an environment from a seed.
+            poll_interval (float): Seconds between two checks of the trial processes.
+            cpus: Run registry the trials take their cores from (one each), unlimited if None.
+        """
+        ctx = mp.get_context("spawn")
+        reports = ctx.Queue()
+        pending = [trial for trial in self.trials if trial["status"] == "pending"]
+        self.stopping = False
+        reserved = 0
+        try:
+            while (pending and not self.stopping) or self.active:
+                while (pending and not self.stopping and len(self.active) < self.config["max_workers"]
+                       and (cpus is None or cpus.reserve())):
+                    reserved += cpus is not None
+                    self._launch(ctx, pending.pop(0), env_factory, reports)
+                await asyncio.sleep(poll_interval)
+                changed = self._drain(reports)
+                for trial_id, (process, _) in list(self.active.items()):
+                    if process.is_alive():
+                        continue
+                    changed |= self._drain(reports)
+                    if trial_id in self.active:
+                        # Exited without a final report, e.g. killed by the system
+                        self._finish(self.trials[trial_id], "exited unexpectedly")
+                        changed = True
+                if changed:
+                    self.save()
+                self._reap()
+                # Finished trials hand their core back
+                if reserved > len(self.active):
+                    cpus.release(reserved - len(self.active))
+                    reserved = len(self.active)
+        finally:
+            for _, stop in self.active.values():
+                stop.set()
+            processes = [process for process, _ in self.active.values()] + [process for process, _ in self.exiting]
+            self.exiting = []
+            # Joining blocks, so it runs on a worker thread
+            await asyncio.get_running_loop().run_in_executor(None, join_processes, processes, 1.0)
+            for trial_id in list(self.active):
+                self._reset_trial(self.trials[trial_id])
+            self.active = {}
+            if reserved:
+                cpus.release(reserved)
+            self.save()
+
+    def _launch(self, ctx, trial: dict, env_factory: Callable, reports) -> None:
+        trial_id = trial["trial_id"]
+        directory = self._trial_directory(trial_id)
+        self.logs[trial_id] = EpisodeLog(directory, window=self.config["window"], truncate=True)
+        stop = ctx.Event()
+        process = ctx.Process(
+            target=trial_process, daemon=True,
+            args=(trial_id, env_factory, self.config["game"], trial["params"], self.config["max_episodes"],
+                  self.config["max_steps"], trial["seed"], directory, reports, stop)
+        )
+        process.start()
+        trial["status"] = "running"
+        self.active[trial_id] = (process, stop)
+
+    def _drain(self, reports) -> bool:
+        changed = False
+        while True:
+            try:
+                kind, trial_id, payload = reports.get_nowait()
+            except queue.Empty:
+                return changed
+            trial = self.trials[trial_id]
+            if trial["status"] != "running" and kind == "episode":
+                continue
+            changed = True
+            if kind == "done":
+                self._finish(trial, payload)
+                continue
+
+            length, reward, epsilon, loss, duration = payload
+            log = self.logs[trial_id]
+            log.append(length, reward, epsilon, loss, duration)
+            trial["episodes"] = len(log)
+            trial["metric"] = log.rolling["reward"].mean
+            if trial["episodes"] in self.scheduler.rungs:
+                trial["rungs"][str(trial["episodes"])] = trial["metric"]
+                if not self.scheduler.report(trial_id, trial["episodes"], trial["metric"]):
+                    trial["status"] = "stopped"
+                    self.active[trial_id][1].set()
+
+    def _finish(self, trial: dict, error: Optional[str]) -> None:
+        trial_id = trial["trial_id"]
+        process, _ = self.active.pop(trial_id)
+        # The trial reports before exiting: reaped on a later tick rather than joined here
+        self.exiting.append((process, time.monotonic() + 1.0))
+        log = self.logs.pop(trial_id)
+        log.close()
+        if trial["status"] == "stopped":
+            pass
+        elif error is not None:
+            trial["status"] = "failed"
+            trial["error"] = error
+            print(f"❌ Trial {trial_id} failed: {error}")
+        elif trial["episodes"] < self.config["max_episodes"]:
+            self._reset_trial(trial)  # Interrupted by a stop of the sweep
+            return
+        else:
+            trial["status"] = "completed"
+        trial["finished_at"] = time.time()
+
+    def _reap(self) -> None:
+        """
+        Forget the trial processes that have exited, terminating those still alive past their deadline.
+        """
+        now = time.monotonic()
+        exiting = []
+        for process, deadline in self.exiting:
+            if not process.is_alive():
+                continue
+            if now >= deadline:
+                process.terminate()
+                deadline = float("inf")
+            exiting.append((process, deadline))
+        self.exiting = exiting
+
+    def _reset_trial(self, trial: dict) -> None:
+        trial.update(status="pending", episodes=0, metric=None, rungs={}, error=None, finished_at=None)
+        self.scheduler.forget(trial["trial_id"])
+
+    def _trial_directory(self, trial_id: int) -> str:
+        return os.path.join(self.directory, f"trial_{trial_id:04d}")
@@ -0,0 +1,63 @@
+import time
+from typing import Optional
+
+from core.metrics import StepMetrics
+from core.trajectories import TrajectoryRecorder
+
+
+def training_step(
+    state_machine, env, agent, metrics: Optional[StepMetrics] = None, recorder: Optional[TrajectoryRecorder] = None
+):
+    """
+    Run a single environment step and agent update, and handle episode bookkeeping.
+
+    Args:
+        state_machine: The state machine of the game.
+        env: The game environment.
+        agent: The learning agent.
+        metrics (Optional[StepMetrics]): Metrics of the run, recording the latency of each stage.
+        recorder (Optional[TrajectoryRecorder]): Recorder of the run's episodes.
+
+    Returns:
+        tuple: (next_state, reward, done, updates) where `updates` is the number of gradient steps taken.
+    """
+    updates_before = getattr(agent, "num_updates", None)
+
+    state = env.get_state()
+    t0 = time.perf_counter()
+    action = agent.get_action(state)
+    t1 = time.perf_counter()
+    next_state, reward, done = env.step(action)
+    t2 = time.perf_counter()
+    agent.update(state, action, reward, next_state, done)
+    if recorder is not None:
+        recorder.record(action)
+    if metrics is not None:
+        metrics.get_action.observe(t1 - t0)
+        metrics.env_step.observe(t2 - t1)
+        metrics.update.observe(time.perf_counter() - t2)
+        metrics.steps.inc()
+        if done:
+            metrics.episodes.inc()
+    state_machine.current_reward += reward
+    state_machine.current_length += 1
+
+    if done:
+        state_machine.log_episode(
+            state_machine.current_length, state_machine.current_reward,
+            getattr(agent, "epsilon", None), getattr(agent, "last_loss", None)
+        )
+        if recorder is not None:
+            recorder.end_episode(state_machine.current_reward)
+        env.reset()
+        if recorder is not None:
+            recorder.start_episode(env.episode_seed)
+        state_machine.current_episode += 1
+        state_machine.total_reward += reward
+        state_machine.num_episodes_completed += 1
+        state_machine.current_reward = 0
+        if hasattr(agent, "decay_epsilon"):
+            agent.decay_epsilon()
+
+    updates = 1 if updates_before is None else agent.num_updates - updates_before
+    return next_state, reward, done, updates
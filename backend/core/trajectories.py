@@ -0,0 +1,269 @@
+import json
+import os
+import shutil
+import struct
+import numpy as np
+from typing import Optional
+
+from core.paths import is_inside
+
+
+# Episode header: seed, number of steps, return (little-endian), followed by one uint8 action per step
+EPISODE_HEADER = struct.Struct("<IIf")
+
+
+class TrajectoryRecorder:
+    """
+    Append-only recorder storing each episode as its seed and its action stream.
+
+    Environments re-seed their generator at every reset, so an episode is
+    reproduced exactly by resetting with its seed and replaying its actions:
+    a recorded step costs one byte instead of a serialized frame. Episodes are
+    written to `episodes.bin` when they end; an episode still running when the
+    recorder is closed is discarded.
+    """
+    def __init__(
+        self, directory: str, game: str, observation: Optional[str] = None, truncate: bool = True,
+        root: Optional[str] = None
+    ) -> None:
+        """
+        Open a recording, creating it if needed.
+
+        Args:
+            directory (str): Directory of the recording.
+            game (str): The game identifier, used to rebuild the environment on replay.
+            observation (Optional[str]): Observation mode of the recorded environment.
+            truncate (bool): Discard the episodes previously recorded in `directory`.
+            root (Optional[str]): Directory the recording must be inside, the parent of `directory` if None.
+
+        Raises:
+            ValueError: If `directory` resolves outside `root`.
+        """
+        if not is_inside(directory, os.path.dirname(directory) if root is None else root):
+            raise ValueError(f"Refusing to record to '{directory}': it is outside of its root directory")
+        if truncate and os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"game": game, "observation": observation}, f)
+        self.directory = directory
+        self.file = open(os.path.join(directory, "episodes.bin"), "ab")
+        self.seed = None
+        self.actions = bytearray()
+        self.episodes = 0
+
+    def start_episode(self, seed: int) -> None:
+        """
+        Start recording an episode.
+
+        Args:
+            seed (int): Seed the environment was reset with.
+        """
+        self.seed = seed
+        self.actions.clear()
+
+    def record(self, action: int) -> None:
+        self.actions.append(action)
+
+    def end_episode(self, reward: float) -> None:
+        """
+        Write the current episode.
+
+        Args:
+            reward (float): Return of the episode.
+        """
+        if self.seed is not None:
+            self.add_episode(self.seed, self.actions, reward)
+        self.seed = None
+
+    def add_episode(self, seed: int, actions: bytes, reward: float) -> None:
+        """
+        Write a complete episode, e.g. one played by another process.
+
+        Args:
+            seed (int): Seed the environment was reset with.
+            actions (bytes): One byte per action.
+            reward (float): Return of the episode.
+        """
+        self.file.write(EPISODE_HEADER.pack(seed, len(actions), reward))
+        self.file.write(actions)
+        self.file.flush()
+        self.episodes += 1
+
+    def close(self) -> None:
+        self.seed = None
+        self.file.close()
+
+
+class TrajectoryStore:
+    """
+    Read access to a recording, indexed by episode.
+
+    The index (offset, seed, length and return of every episode) is built by
+    walking the episode headers, and extended incrementally as the recorder
+    appends episodes; actions are only read when an episode is replayed.
+    """
+    def __init__(self, directory: str) -> None:
+        """
+        Open a recording.
+
+        Args:
+            directory (str): Directory of the recording.
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, "episodes.bin")
+        self._reset()
+        self.refresh()
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, "meta.json"))
+
+    def _reset(self) -> None:
+        with open(os.path.join(self.directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.game = meta["game"]
+        self.observation = meta.get("observation")
+        self.offsets = []
+        self.seeds = []
+        self.lengths = []
+        self.rewards = []
+        self._end = 0
+
+    def refresh(self) -> None:
+        """
+        Index the episodes appended since the last call, starting over if the run was recorded again.
+        """
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size < self._end:
+            self._reset()
+        if size == self._end:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._end)
+            while self._end + EPISODE_HEADER.size <= size:
+                seed, length, reward = EPISODE_HEADER.unpack(f.read(EPISODE_HEADER.size))
+                if self._end + EPISODE_HEADER.size + length > size:
+                    break  # Partially written episode
+                self.offsets.append(self._end + EPISODE_HEADER.size)
+                self.seeds.append(seed)
+                self.lengths.append(length)
+                self.rewards.append(reward)
+                self._end += EPISODE_HEADER.size + length
+                f.seek(self._end)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def episodes(self, offset: int = 0, limit: int = 100) -> list:
+        """
+        Describe a page of episodes.
+
+        Args:
+            offset (int): Index of the first episode.
+            limit (int): Maximum number of episodes.
+
+        Returns:
+            list: One dict per episode with its index, seed, length and return.
+        """
+        end = min(len(self), max(0, offset) + max(0, limit))
+        return [
+            {"episode": i, "seed": self.seeds[i], "length": self.lengths[i], "reward": self.rewards[i]}
+            for i in range(max(0, offset), end)
+        ]
+
+    def load(self, episode: int) -> tuple:
+        """
+        Read the seed and actions of an episode.
+
+        Args:
+            episode (int): Index of the episode.
+
+        Returns:
+            tuple: (seed, actions) where actions is a uint8 array.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[episode])
+            actions = np.frombuffer(f.read(self.lengths[episode]), dtype=np.uint8)
+        return self.seeds[episode], actions
+
+
+class EpisodeReplay:
+    """
+    Re-simulation of a recorded episode, with seeking.
+
+    Snapshots of the environment are taken every `snapshot_every` steps as the
+    episode is played forward, so seeking to any step restores the closest
+    earlier snapshot and simulates at most `snapshot_every - 1` steps.
+    """
+    def __init__(self, env, seed: int, actions: np.ndarray, snapshot_every: int = 64) -> None:
+        """
+        Initialize the replay at the first step of the episode.
+
+        Args:
+            env: Environment of the recorded game, used exclusively by the replay; it must
+                implement `snapshot` and `restore` (PongEnv, SnakeEnv).
+            seed (int): Seed of the episode.
+            actions (np.ndarray): Recorded actions.
+            snapshot_every (int): Steps between two snapshots.
+        """
+        self.env = env
+        self.actions = actions.tolist()
+        self.snapshot_every = max(1, snapshot_every)
+        self.env.reset(seed)
+        self.step_index = 0
+        self.reward = 0.0
+        self.done = False
+        self.snapshots = {0: (env.snapshot(), 0.0, False)}
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    @property
+    def finished(self) -> bool:
+        return self.step_index >= len(self.actions)
+
+    def step(self) -> bool:
+        """
+        Play the next recorded action.
+
+        Returns:
+            bool: False if the episode is already over.
+        """
+        if self.finished:
+            return False
+        _, reward, self.done = self.env.step(self.actions[self.step_index])
+        self.step_index += 1
+        self.reward += reward
+        if self.step_index % self.snapshot_every == 0 and self.step_index not in self.snapshots:
+            self.snapshots[self.step_index] = (self.env.snapshot(), self.reward, self.done)
+        return True
+
+    def seek(self, step: int) -> None:
+        """
+        Move to a step of the episode.
+
+        Args:
+            step (int): Number of actions played, clamped to the episode length.
+        """
+        step = min(max(0, step), len(self.actions))
+        if not self.step_index <= step < self.step_index + self.snapshot_every:
+            base = step - step % self.snapshot_every
+            while base not in self.snapshots:
+                base -= self.snapshot_every
+            if base > self.step_index or step < self.step_index:
+                snapshot, self.reward, self.done = self.snapshots[base]
+                self.env.restore(snapshot)
+                self.step_index = base
+        while self.step_index < step:
+            self.step()
+
+    def frame(self) -> dict:
+        return {
+            "state": self.env.get_render_state(),
+            "seq": self.step_index,
+            "step": self.step_index,
+            "length": len(self.actions),
+            "reward": self.reward,
+            "done": self.done,
+        }
@@ -1,31 +1,141 @@
+import asyncio
+import threading
 from core.state_machine import StateMachine
-from agents.q_learning_agent import QLearningAgent
-from agents.dqn_agent import DQNAgent
+from core.broadcaster import FrameBroadcaster
+from core.env_pool import EnvPool
+from core.action_server import BatchedActionServer
+from core.run_registry import RunRegistry
+from core.model_registry import ModelRegistry, RegistryPolicy
+from core.checkpoint_writer import get_checkpoint_writer
+from core.startup import timed, set_warmup_status
+from core.evaluation import EnvBatch
+from functools import partial
 from environnements.snake_env import SnakeEnv
 from environnements.pong_env import PongEnv
+from environnements.vec_snake_env import VecSnakeEnv
+from environnements.vec_pong_env import VecPongEnv
+
+# Games with an environment; any other name falls back to snake in create_env
+GAMES = ("pong", "snake")
 
 state_machines = {}
 envs = {}
 agents = {}
+broadcasters = {}
+env_pools = {}
+action_servers = {}
+model_registries = {}
+run_registry = RunRegistry()
+# Serializes agent construction between request handlers and the warm-up thread
+agent_lock = threading.Lock()
 
 def get_state_machine(game: str = "snake"):
     if game not in state_machines:
         state_machines[game] = StateMachine()
     return state_machines[game]
 
+def create_env(game: str = "snake", observation: str = None, seed: int = None):
+    options = {"observation": observation} if observation else {}
+    if game.lower() == "pong":
+        return PongEnv(seed=seed, **options)
+    return SnakeEnv(seed=seed, **options)
+
+def create_vec_env(game: str = "snake", num_envs: int = 64, observation: str = None, seed: int = None):
+    """
+    Create a batch of environments stepped together, NumPy-vectorized for the default observation modes.
+    """
+    if game.lower() == "pong" and observation in (None, "absolute"):
+        return VecPongEnv(num_envs, seed=seed)
+    if game.lower() != "pong" and observation in (None, "coords"):
+        return VecSnakeEnv(num_envs, seed=seed)
+    return EnvBatch([
+        create_env(game, observation, None if seed is None else seed + i) for i in range(num_envs)
+    ])
+
 def get_env(game: str = "snake"):
     if game not in envs:
-        if game.lower() == "pong":
-            envs[game] = PongEnv()
-        else:
-            envs[game] = SnakeEnv()
+        envs[game] = create_env(game)
     return envs[game]
 
 def get_agent(game: str = "snake"):
+    """
+    Get the agent of a game, building it on first use.
+
+    Agents depend on torch, which is only imported here, so the server starts
+    without it and the first game to need an agent pays for the import.
+    """
     if game not in agents:
-        from agents.dqn_agent import DQNAgent
-        agent = DQNAgent()
-        agent.initialize(get_env(game), game)
-        agents[game] = agent
+        with agent_lock:
+            if game not in agents:
+                with timed("import_agents"):
+                    from agents.dqn_agent import DQNAgent
+                with timed(f"agent.{game}"):
+                    agent = DQNAgent()
+                    agent.initialize(get_env(game), game)
+                agents[game] = agent
     return agents[game]
 
+async def warm_up(games: list):
+    """
+    Build the agents of the given games in a worker thread, one game at a time.
+
+    Args:
+        games (list): The game identifiers.
+    """
+    loop = asyncio.get_running_loop()
+    for game in games:
+        set_warmup_status(game, "pending")
+    for game in games:
+        try:
+            await loop.run_in_executor(None, get_agent, game)
+            set_warmup_status(game, "ready")
+        except Exception as e:
+            set_warmup_status(game, "failed")
+            print(f"❌ Warm-up of '{game}' failed: {e}")
+
+def get_broadcaster(game: str = "snake"):
+    if game not in broadcasters:
+        broadcasters[game] = FrameBroadcaster(game)
+    return broadcasters[game]
+
+def get_env_pool(game: str = "snake"):
+    if game not in env_pools:
+        env_pools[game] = EnvPool(partial(create_env, game))
+    return env_pools[game]
+
+def get_model_registry(game: str = "snake"):
+    if game not in model_registries:
+        from agents.dqn_agent import load_inference_backend
+        agent = get_agent(game)
+        registry = ModelRegistry(partial(
+            load_inference_backend, agent.inference_backend, agent.inference_threads, agent.state_size, agent.num_actions
+        ))
+        get_checkpoint_writer().add_listener(registry.notify)
+        model_registries[game] = registry
+    return model_registries[game]
+
+def get_action_server(game: str = "snake", version=None):
+    key = (game, version)
+    if key not in action_servers:
+        agent = get_agent(game)
+        policy = RegistryPolicy(
+            get_model_registry(game), agent.filename, agent.num_actions,
+            epsilon=agent.epsilon_min, version=version, fallback=agent.get_inference_backend()
+        )
+        action_servers[key] = BatchedActionServer(policy)
+    return action_servers[key]
+
+def set_inference_backend(game: str, backend: str, num_threads=None):
+    from agents.dqn_agent import load_inference_backend
+    agent = get_agent(game)
+    agent.set_inference_backend(backend, num_threads)
+    if game in model_registries:
+        model_registries[game].set_loader(partial(
+            load_inference_backend, backend, num_threads, agent.state_size, agent.num_actions
+        ))
+    for (server_game, _), server in action_servers.items():
+        if server_game == game:
+            server.agent.fallback = agent.get_inference_backend()
+
+def get_run_registry():
+    return run_registry
@@ -1,13 +1,26 @@
 import numpy as np
-import random
+from typing import Optional
 from core.base_env import GameEnvironment
 
 
+# Observation modes: absolute positions and velocities, or ball relative to the paddle
+OBSERVATION_MODES = ("absolute", "relative")
+
+
 class PongEnv(GameEnvironment):
     """
     Environment for the Pong game.
+
+    Observation modes:
+        - "absolute": paddle, opponent and ball positions and ball velocity (6).
+        - "relative": ball offset from the paddle center, ball x position and ball velocity (4).
     """
-    def __init__(self, width: int = 400, height: int = 400, paddle_height: int = 60) -> None:
+    win_on_timeout = True
+
+    def __init__(
+        self, width: int = 400, height: int = 400, paddle_height: int = 60, observation: str = "absolute",
+        seed: Optional[int] = None
+    ) -> None:
         """
         Initialize the Pong environment.
 
@@ -15,31 +28,67 @@ class PongEnv(GameEnvironment):
             width (int): Width of the game area.
             height (int): Height of the game area.
             paddle_height (int): Height of the paddle.
+            observation (str): Observation mode, one of OBSERVATION_MODES.
+            seed (Optional[int]): Seed of the sequence of episode seeds, random if None.
         """
+        if observation not in OBSERVATION_MODES:
+            raise ValueError(f"Unknown observation mode '{observation}'")
         self.width = width
         self.height = height
         self.paddle_height = paddle_height
         self.num_actions = 3  
-        self.state_size = 6
+        self.observation_mode = observation
+        self.state_size = 6 if observation == "absolute" else 4
+        self._obs = np.zeros(self.state_size, dtype=np.float32)
+        self._init_rng(seed)
         self.reset()
 
-    def reset(self) -> np.ndarray:
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
         """
         Reset the environment to its initial state.
 
+        Args:
+            seed (Optional[int]): Seed of the new episode, the next one of the sequence if None.
+
         Returns:
             np.ndarray: The normalized state of the environment.
         """
+        self._seed_episode(seed)
         self.paddle_y = self.height // 2
         self.opponent_y = self.height // 2
         self.ball_x = self.width // 2
         self.ball_y = self.height // 2
-        self.ball_vx = random.choice([-4, 4])
-        self.ball_vy = random.choice([-3, 3])
+        self.ball_vx = self.rng.choice([-4, 4])
+        self.ball_vy = self.rng.choice([-3, 3])
         self.done = False
         self.score = 0
         return self.get_state()
 
+    def snapshot(self) -> tuple:
+        """
+        Capture the state of the game, including its random generator.
+
+        Together with `restore` this is the snapshot protocol EpisodeReplay
+        relies on to seek: restoring a snapshot and stepping on gives the
+        same frames as the original play.
+
+        Returns:
+            tuple: The snapshot.
+        """
+        return (self.paddle_y, self.opponent_y, self.ball_x, self.ball_y, self.ball_vx, self.ball_vy,
+                self.done, self.score, self.rng.getstate())
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        Restore the game from a snapshot.
+
+        Args:
+            snapshot (tuple): A snapshot returned by `snapshot`.
+        """
+        (self.paddle_y, self.opponent_y, self.ball_x, self.ball_y, self.ball_vx, self.ball_vy,
+         self.done, self.score, rng_state) = snapshot
+        self.rng.setstate(rng_state)
+
     def step(self, action: int):
         """
         Execute one time step in the environment.
@@ -97,13 +146,47 @@ class PongEnv(GameEnvironment):
 
         return self.get_state(), reward, self.done
 
+    @property
+    def observation(self) -> np.ndarray:
+        """
+        Live view of the preallocated observation buffer, refreshed from the current state.
+
+        Returns:
+            np.ndarray: The state array, without copying.
+        """
+        obs = self._obs
+        if self.observation_mode == "relative":
+            obs[0] = (self.ball_y - self.paddle_y - self.paddle_height / 2) / self.height
+            obs[1] = self.ball_x / self.width
+            obs[2] = self.ball_vx / 4
+            obs[3] = self.ball_vy / 3
+        else:
+            obs[0] = self.paddle_y / self.height
+            obs[1] = self.opponent_y / self.height
+            obs[2] = self.ball_x / self.width
+            obs[3] = self.ball_y / self.height
+            obs[4] = self.ball_vx / 4
+            obs[5] = self.ball_vy / 3
+        return obs
+
     def get_state(self) -> np.ndarray:
         """
-        Get the normalized state of the environment.
+        Get the normalized state of the environment in the selected observation mode.
 
         Returns:
             np.ndarray: Array representing normalized positions and velocities.
         """
+        return self.observation.copy()
+
+    def get_render_state(self) -> np.ndarray:
+        """
+        Get the "absolute" state drawn by visualization clients, whatever the observation mode.
+
+        Returns:
+            np.ndarray: The state array.
+        """
+        if self.observation_mode == "absolute":
+            return self.get_state()
         return np.array([
             self.paddle_y / self.height,
             self.opponent_y / self.height,
@@ -111,7 +194,7 @@ class PongEnv(GameEnvironment):
             self.ball_y / self.height,
             self.ball_vx / 4,
             self.ball_vy / 3
-        ])
+        ], dtype=np.float32)
 
     def get_num_actions(self) -> int:
         """
@@ -1,49 +1,219 @@
 import numpy as np
-import random
+from collections import deque
+from typing import Optional
 from core.base_env import GameEnvironment
 
 
+# Observation modes: raw body coordinates, egocentric features, local window, multi-channel grid
+OBSERVATION_MODES = ("coords", "features", "window", "grid")
+
+# Head displacement per action (0: up, 1: down, 2: left, 3: right)
+ACTION_MOVES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+# Absolute direction on the right and on the left of each heading
+TURN_RIGHT = (3, 2, 0, 1)
+TURN_LEFT = (2, 3, 1, 0)
+
+
 class SnakeEnv(GameEnvironment):
     """
     Environment for the Snake game.
+
+    The body is a deque of cell indices backed by an occupancy grid and a
+    free-cell index set, so moves, collision checks and food placement run in
+    constant time regardless of the snake length. The observation is kept in a
+    preallocated buffer that is updated in place on every step.
+
+    Observation modes:
+        - "coords": body coordinates padded with -1 and the food coordinates (2 * grid_size ** 2 + 2).
+        - "features": danger ahead/right/left, heading one-hot and food direction (11).
+        - "window": obstacles in a window_size x window_size window around the head,
+          followed by the food offset normalized by the grid size (window_size ** 2 + 2).
+        - "grid": body, head and food channels over the whole grid (3 * grid_size ** 2).
     """
-    def __init__(self, grid_size: int = 10, cell_size: int = 35) -> None:
+    def __init__(
+        self, grid_size: int = 10, cell_size: int = 35, observation: str = "coords", window_size: int = 5,
+        seed: Optional[int] = None
+    ) -> None:
         """
         Initialize the Snake environment.
 
         Args:
             grid_size (int): The size of the grid.
             cell_size (int): The size of each cell.
+            observation (str): Observation mode, one of OBSERVATION_MODES.
+            window_size (int): Side of the local window in "window" mode (odd).
+            seed (Optional[int]): Seed of the sequence of episode seeds, random if None.
         """
+        if observation not in OBSERVATION_MODES:
+            raise ValueError(f"Unknown observation mode '{observation}'")
         self.grid_size = grid_size
         self.cell_size = cell_size
+        self.num_cells = grid_size ** 2
         self.num_actions = 4
-        self.state_size = 2 * (self.grid_size ** 2) + 2
+        self.observation_mode = observation
+        self.coords_size = 2 * self.num_cells + 2
+        self.state_size = {
+            "coords": self.coords_size,
+            "features": 11,
+            "window": window_size ** 2 + 2,
+            "grid": 3 * self.num_cells,
+        }[observation]
+
+        # Offsets of the window cells around the head, row by row
+        radius = window_size // 2
+        dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        self._window_dx, self._window_dy = dx.ravel(), dy.ravel()
+        self._obs = np.zeros(self.state_size, dtype=np.float32)
+
+        # The observation is a sliding view over a buffer twice its size: each move
+        # shifts the view left by one segment so the new head lands in front of the
+        # body without moving it. The view is copied back to the right end once it
+        # reaches the start of the buffer, which costs O(1) amortized per step.
+        self._window = np.full(2 * self.coords_size, -1, dtype=np.float32)
+        self._home = len(self._window) - self.coords_size
+        self._offset = self._home
+        self._init_rng(seed)
         self.reset()
 
-    def reset(self) -> np.ndarray:
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
         """
         Reset the environment to its initial state.
 
+        Args:
+            seed (Optional[int]): Seed of the new episode, the next one of the sequence if None.
+
         Returns:
             np.ndarray: The current state of the environment.
         """
-        self.snake = [[random.randint(0, self.grid_size - 1), random.randint(0, self.grid_size - 1)]]
-        self.food = self._generate_food()
+        self._seed_episode(seed)
+        self._occupied = bytearray(self.num_cells)
+        self._occupied_view = np.frombuffer(self._occupied, dtype=np.uint8)
+        self._free = list(range(self.num_cells))
+        self._free_pos = list(range(self.num_cells))
+        self._window.fill(-1)
+        self._offset = self._home
+
+        head = self.rng.randrange(self.num_cells)
+        self.body = deque([head])
+        self._take(head)
+        self._write_segment(0, head)
+        self.heading = 0
         self.done = False
+        self._generate_food()
+        self._write_segment(self.num_cells, self.food_cell)
+        if self.observation_mode == "grid":
+            self._obs.fill(0)
+            self._obs[[head, self.num_cells + head, 2 * self.num_cells + self.food_cell]] = 1
+        self._update_observation()
         return self.get_state()
 
-    def _generate_food(self) -> list:
+    def snapshot(self) -> tuple:
         """
-        Generate a new food position that is not occupied by the snake.
+        Capture the state of the game, including the order of the free-cell set food is drawn from.
+
+        Together with `restore` this is the snapshot protocol EpisodeReplay
+        relies on to seek: the random generator is part of the snapshot, so
+        restoring it and stepping on gives the same frames as the original play.
 
         Returns:
-            list: The [x, y] coordinates for the food.
+            tuple: The snapshot.
+        """
+        return tuple(self.body), self.food_cell, self.heading, self.done, tuple(self._free), self.rng.getstate()
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        Rebuild the environment from a snapshot.
+
+        Args:
+            snapshot (tuple): A snapshot returned by `snapshot`.
+        """
+        body, food_cell, heading, done, free, rng_state = snapshot
+        self._occupied = bytearray(self.num_cells)
+        self._occupied_view = np.frombuffer(self._occupied, dtype=np.uint8)
+        self._free = list(free)
+        self._free_pos = [-1] * self.num_cells
+        for pos, cell in enumerate(self._free):
+            self._free_pos[cell] = pos
+        self._window.fill(-1)
+        self._offset = self._home
+
+        self.body = deque(body)
+        for slot, cell in enumerate(self.body):
+            self._occupied[cell] = 1
+            self._write_segment(slot, cell)
+        self.food_cell = food_cell
+        self._write_segment(self.num_cells, food_cell)
+        self.heading = heading
+        self.done = done
+        if self.observation_mode == "grid":
+            n = self.num_cells
+            self._obs.fill(0)
+            self._obs[list(self.body)] = 1
+            self._obs[[n + self.body[0], 2 * n + food_cell]] = 1
+        self._update_observation()
+        self.rng.setstate(rng_state)
+
+    def _take(self, cell: int) -> None:
+        """
+        Mark a cell as occupied by the snake and remove it from the free set.
+
+        Args:
+            cell (int): The cell index.
+        """
+        self._occupied[cell] = 1
+        pos = self._free_pos[cell]
+        last = self._free.pop()
+        if last != cell:
+            self._free[pos] = last
+            self._free_pos[last] = pos
+        self._free_pos[cell] = -1
+
+    def _release(self, cell: int) -> None:
+        """
+        Mark a cell as empty and add it back to the free set.
+
+        Args:
+            cell (int): The cell index.
+        """
+        self._occupied[cell] = 0
+        self._free_pos[cell] = len(self._free)
+        self._free.append(cell)
+
+    def _generate_food(self) -> bool:
+        """
+        Place food on a cell drawn uniformly from the free set.
+
+        Returns:
+            bool: False if the snake fills the whole board and no food can be placed.
+        """
+        if not self._free:
+            return False
+        self.food_cell = self._free[self.rng.randrange(len(self._free))]
+        return True
+
+    def _write_segment(self, slot: int, cell: int) -> None:
+        """
+        Write the coordinates of a cell into a slot of the observation view.
+
+        Args:
+            slot (int): Segment slot in the view (`num_cells` is the food slot).
+            cell (int): The cell index, or -1 to clear the slot.
         """
-        while True:
-            food = [random.randint(0, self.grid_size - 1), random.randint(0, self.grid_size - 1)]
-            if food not in self.snake:
-                return food
+        i = self._offset + 2 * slot
+        if cell < 0:
+            self._window[i] = self._window[i + 1] = -1
+        else:
+            self._window[i] = cell % self.grid_size
+            self._window[i + 1] = cell // self.grid_size
+
+    def _shift_view(self) -> None:
+        """
+        Move the observation view one segment to the left.
+        """
+        if self._offset == 0:
+            self._window[self._home:] = self._window[:self.coords_size]
+            self._offset = self._home
+        self._offset -= 2
 
     def step(self, action: int):
         """
@@ -61,60 +231,166 @@ class SnakeEnv(GameEnvironment):
         if self.done:
             return self.get_state(), -10, True
 
-        head = self.snake[0]
-        new_head = head.copy()
+        g = self.grid_size
+        head = self.body[0]
+        x, y = head % g, head // g
+        fx, fy = self.food_cell % g, self.food_cell // g
 
         # Calculate distance before movement
-        prev_distance = np.linalg.norm(np.array(head) - np.array(self.food))
+        prev_distance = (x - fx) ** 2 + (y - fy) ** 2
 
         if action == 0:  # Up
-            new_head[1] -= 1
+            y -= 1
         elif action == 1:  # Down
-            new_head[1] += 1
+            y += 1
         elif action == 2:  # Left
-            new_head[0] -= 1
+            x -= 1
         elif action == 3:  # Right
-            new_head[0] += 1
+            x += 1
 
         # Check for collisions with boundaries or self
-        if (new_head[0] < 0 or new_head[1] < 0 or
-            new_head[0] >= self.grid_size or new_head[1] >= self.grid_size or
-            new_head in self.snake):
+        if x < 0 or y < 0 or x >= g or y >= g or self._occupied[y * g + x]:
             self.done = True
             return self.get_state(), -10, True
 
-        self.snake.insert(0, new_head)
+        new_head = y * g + x
+        prev_head, prev_food, tail = head, self.food_cell, -1
+        self.heading = action
+        self.body.appendleft(new_head)
+        self._take(new_head)
+        self._shift_view()
+        self._write_segment(0, new_head)
 
         # Calculate distance after movement
-        new_distance = np.linalg.norm(np.array(new_head) - np.array(self.food))
+        new_distance = (x - fx) ** 2 + (y - fy) ** 2
         distance_reward = 0.1 if new_distance < prev_distance else -0.1
 
         # Check if food is eaten
-        if new_head == self.food:
+        if new_head == self.food_cell:
             reward = 20
-            self.food = self._generate_food()
+            if not self._generate_food():
+                self.done = True
         else:
-            self.snake.pop()
+            tail = self.body.pop()
+            self._release(tail)
+            self._write_segment(len(self.body), -1)
             reward = -0.1
+        self._write_segment(self.num_cells, self.food_cell)
+        if self.observation_mode == "grid":
+            self._update_grid(prev_head, new_head, tail, prev_food)
+        self._update_observation()
 
         reward += distance_reward
         return self.get_state(), reward, self.done
 
+    def _update_grid(self, prev_head: int, new_head: int, tail: int, prev_food: int) -> None:
+        """
+        Apply the changes of one move to the "grid" observation.
+
+        Args:
+            prev_head (int): Cell of the head before the move.
+            new_head (int): Cell of the head after the move.
+            tail (int): Cell released by the tail, or -1 if the snake grew.
+            prev_food (int): Cell of the food before the move.
+        """
+        n = self.num_cells
+        obs = self._obs
+        obs[n + prev_head] = 0
+        obs[new_head] = obs[n + new_head] = 1
+        if tail >= 0:
+            obs[tail] = 0
+        obs[2 * n + prev_food] = 0
+        obs[2 * n + self.food_cell] = 1
+
+    def _is_blocked(self, x: int, y: int) -> bool:
+        g = self.grid_size
+        return x < 0 or y < 0 or x >= g or y >= g or self._occupied[y * g + x] == 1
+
+    def _update_observation(self) -> None:
+        """
+        Write the "features" or "window" observation of the current state into the buffer.
+        """
+        mode = self.observation_mode
+        if mode not in ("features", "window"):
+            return
+        g = self.grid_size
+        x, y = self.body[0] % g, self.body[0] // g
+        fx, fy = self.food_cell % g, self.food_cell // g
+        obs = self._obs
+
+        if mode == "features":
+            heading = self.heading
+            for i, direction in enumerate((heading, TURN_RIGHT[heading], TURN_LEFT[heading])):
+                dx, dy = ACTION_MOVES[direction]
+                obs[i] = self._is_blocked(x + dx, y + dy)
+            obs[3:7] = 0
+            obs[3 + heading] = 1
+            obs[7], obs[8], obs[9], obs[10] = fy < y, fy > y, fx < x, fx > x
+            return
+
+        wx, wy = x + self._window_dx, y + self._window_dy
+        inside = (wx >= 0) & (wy >= 0) & (wx < g) & (wy < g)
+        cells = np.where(inside, wy * g + wx, 0)
+        k = len(cells)
+        np.copyto(obs[:k], np.where(inside, self._occupied_view[cells], 1))
+        obs[k] = (fx - x) / g
+        obs[k + 1] = (fy - y) / g
+
+    @property
+    def observation(self) -> np.ndarray:
+        """
+        Live view of the preallocated observation buffer.
+
+        The view is updated in place and its contents change on the next step;
+        copy it if it must outlive the step.
+
+        Returns:
+            np.ndarray: The state array, without copying.
+        """
+        if self.observation_mode != "coords":
+            return self._obs
+        return self._window[self._offset:self._offset + self.coords_size]
+
+    @property
+    def snake(self) -> list:
+        """
+        The snake segments as [x, y] coordinates, from head to tail.
+
+        Returns:
+            list: The snake segments.
+        """
+        return [[cell % self.grid_size, cell // self.grid_size] for cell in self.body]
+
+    @property
+    def food(self) -> list:
+        """
+        The food position.
+
+        Returns:
+            list: The [x, y] coordinates of the food.
+        """
+        return [self.food_cell % self.grid_size, self.food_cell // self.grid_size]
+
     def get_state(self) -> np.ndarray:
         """
-        Get the current state of the environment.
+        Get the current state of the environment in the selected observation mode.
 
-        The state consists of the snake's segments (padded with -1) followed by the food coordinates.
+        In "coords" mode the state consists of the snake's segments (padded with -1)
+        followed by the food coordinates.
+
+        Returns:
+            np.ndarray: The state array.
+        """
+        return self.observation.copy()
+
+    def get_render_state(self) -> np.ndarray:
+        """
+        Get the state in the "coords" layout drawn by visualization clients, whatever the observation mode.
 
         Returns:
             np.ndarray: The state array.
         """
-        state = [coord for segment in self.snake for coord in segment]
-        max_snake_length = self.grid_size ** 2
-        while len(state) < 2 * max_snake_length:
-            state.append(-1)
-        state += self.food
-        return np.array(state)
+        return self._window[self._offset:self._offset + self.coords_size].copy()
 
     def get_num_actions(self) -> int:
         """
@@ -0,0 +1,165 @@
+import numpy as np
+from typing import Optional
+from core.base_env import GameEnvironment
+
+
+class VecPongEnv(GameEnvironment):
+    """
+    Batch of independent Pong games stepped together with NumPy.
+
+    Mirrors the rules and rewards of `PongEnv`, but holds the state of
+    `num_envs` games as arrays so a single `step` call advances all of them.
+    Finished games are reset automatically.
+    """
+    win_on_timeout = True
+
+    def __init__(
+        self, num_envs: int, width: int = 400, height: int = 400,
+        paddle_height: int = 60, seed: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the vectorized Pong environment.
+
+        Args:
+            num_envs (int): Number of games to simulate in parallel.
+            width (int): Width of the game area.
+            height (int): Height of the game area.
+            paddle_height (int): Height of the paddle.
+            seed (Optional[int]): Seed for the internal random generator.
+        """
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.paddle_height = paddle_height
+        self.num_actions = 3
+        self.state_size = 6
+        self.rng = np.random.default_rng(seed)
+
+        self.paddle_y = np.zeros(num_envs, dtype=np.int32)
+        self.opponent_y = np.zeros(num_envs, dtype=np.int32)
+        self.ball_x = np.zeros(num_envs, dtype=np.int32)
+        self.ball_y = np.zeros(num_envs, dtype=np.int32)
+        self.ball_vx = np.zeros(num_envs, dtype=np.int32)
+        self.ball_vy = np.zeros(num_envs, dtype=np.int32)
+        self.score = np.zeros(num_envs, dtype=np.int32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        """
+        Reset every game to its initial state.
+
+        Returns:
+            np.ndarray: Normalized states of shape (num_envs, state_size).
+        """
+        self.reset_envs(np.arange(self.num_envs))
+        return self.get_state()
+
+    def reset_envs(self, idx: np.ndarray) -> None:
+        """
+        Reset the games selected by `idx`.
+
+        Args:
+            idx (np.ndarray): Indices of the games to reset.
+        """
+        n = len(idx)
+        if n == 0:
+            return
+        self.paddle_y[idx] = self.height // 2
+        self.opponent_y[idx] = self.height // 2
+        self.ball_x[idx] = self.width // 2
+        self.ball_y[idx] = self.height // 2
+        self.ball_vx[idx] = self.rng.choice([-4, 4], size=n)
+        self.ball_vy[idx] = self.rng.choice([-3, 3], size=n)
+        self.score[idx] = 0
+
+    def step(self, actions: np.ndarray):
+        """
+        Advance every game by one time step.
+
+        Args:
+            actions (np.ndarray): One action per game (0: no movement, 1: move up, 2: move down).
+
+        Returns:
+            tuple: A tuple (states, rewards, dones) where:
+                - states (np.ndarray): New states; finished games already hold their reset state.
+                - rewards (np.ndarray): Rewards received, same semantics as `PongEnv`.
+                - dones (np.ndarray): Whether each game ended on this step.
+        """
+        actions = np.asarray(actions)
+
+        # Update player's paddle position
+        self.paddle_y = np.where(actions == 1, np.maximum(0, self.paddle_y - 6), self.paddle_y)
+        self.paddle_y = np.where(
+            actions == 2,
+            np.minimum(self.height - self.paddle_height, self.paddle_y + 6),
+            self.paddle_y
+        ).astype(np.int32)
+
+        # Update ball position
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        # Bounce off top and bottom walls
+        wall = (self.ball_y <= 0) | (self.ball_y >= self.height)
+        self.ball_vy[wall] *= -1
+
+        # Bounce off player's paddle
+        hit = ((self.ball_x <= 20) &
+               (self.paddle_y <= self.ball_y) &
+               (self.ball_y <= self.paddle_y + self.paddle_height))
+        self.ball_vx[hit] *= -1
+        self.score[hit] += 1
+        rewards = np.where(hit, 10.0, -0.1).astype(np.float32)
+
+        # Bounce off opponent's paddle
+        opponent_hit = ((self.ball_x >= self.width - 20) &
+                        (self.opponent_y <= self.ball_y) &
+                        (self.ball_y <= self.opponent_y + self.paddle_height))
+        self.ball_vx[opponent_hit] *= -1
+
+        # End episode if ball leaves screen
+        dones = (self.ball_x < 0) | (self.ball_x > self.width)
+        rewards[dones] = -10.0
+
+        # Basic opponent paddle movement
+        center = self.opponent_y + self.paddle_height // 2
+        self.opponent_y += np.where(center < self.ball_y, 4, np.where(center > self.ball_y, -4, 0)).astype(np.int32)
+
+        self.dones = dones.copy()
+        self.reset_envs(np.flatnonzero(dones))
+        return self.get_state(), rewards, dones
+
+    def get_state(self) -> np.ndarray:
+        """
+        Get the normalized states of all games.
+
+        Returns:
+            np.ndarray: Array of shape (num_envs, state_size), same layout as `PongEnv.get_state`.
+        """
+        states = np.empty((self.num_envs, self.state_size), dtype=np.float32)
+        states[:, 0] = self.paddle_y / self.height
+        states[:, 1] = self.opponent_y / self.height
+        states[:, 2] = self.ball_x / self.width
+        states[:, 3] = self.ball_y / self.height
+        states[:, 4] = self.ball_vx / 4
+        states[:, 5] = self.ball_vy / 3
+        return states
+
+    def get_num_actions(self) -> int:
+        """
+        Get the number of available actions.
+
+        Returns:
+            int: Number of actions.
+        """
+        return self.num_actions
+
+    def is_done(self) -> np.ndarray:
+        """
+        Check which games ended on the last step.
+
+        Returns:
+            np.ndarray: Boolean array of shape (num_envs,).
+        """
+        return self.dones
@@ -0,0 +1,183 @@
+import numpy as np
+from typing import Optional
+from core.base_env import GameEnvironment
+
+
+# Head displacement per action (0: up, 1: down, 2: left, 3: right)
+ACTION_DX = np.array([0, 0, -1, 1], dtype=np.int32)
+ACTION_DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+
+
+class VecSnakeEnv(GameEnvironment):
+    """
+    Batch of independent Snake games stepped together with NumPy.
+
+    Each snake body is stored as a ring buffer of cell indices together with
+    a boolean occupancy grid, so all games advance with one `step` call.
+    Rules and rewards mirror `SnakeEnv`; finished games are reset automatically.
+    """
+    def __init__(self, num_envs: int, grid_size: int = 10, seed: Optional[int] = None) -> None:
+        """
+        Initialize the vectorized Snake environment.
+
+        Args:
+            num_envs (int): Number of games to simulate in parallel.
+            grid_size (int): The size of the grid.
+            seed (Optional[int]): Seed for the internal random generator.
+        """
+        self.num_envs = num_envs
+        self.grid_size = grid_size
+        self.num_cells = grid_size ** 2
+        self.num_actions = 4
+        self.state_size = 2 * self.num_cells + 2
+        self.rng = np.random.default_rng(seed)
+
+        self._rows = np.arange(num_envs)
+        self.body = np.zeros((num_envs, self.num_cells), dtype=np.int32)
+        self.head_idx = np.zeros(num_envs, dtype=np.int32)
+        self.length = np.zeros(num_envs, dtype=np.int32)
+        self.occupied = np.zeros((num_envs, self.num_cells), dtype=bool)
+        self.food = np.zeros(num_envs, dtype=np.int32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        """
+        Reset every game to its initial state.
+
+        Returns:
+            np.ndarray: States of shape (num_envs, state_size).
+        """
+        self.reset_envs(self._rows)
+        return self.get_state()
+
+    def reset_envs(self, idx: np.ndarray) -> None:
+        """
+        Reset the games selected by `idx` with a one-cell snake and new food.
+
+        Args:
+            idx (np.ndarray): Indices of the games to reset.
+        """
+        if len(idx) == 0:
+            return
+        heads = self.rng.integers(0, self.num_cells, size=len(idx), dtype=np.int32)
+        self.occupied[idx] = False
+        self.head_idx[idx] = 0
+        self.length[idx] = 1
+        self.body[idx, 0] = heads
+        self.occupied[idx, heads] = True
+        self._place_food(idx)
+
+    def _place_food(self, idx: np.ndarray) -> np.ndarray:
+        """
+        Place food uniformly on a free cell for the games selected by `idx`.
+
+        Args:
+            idx (np.ndarray): Indices of the games that need new food.
+
+        Returns:
+            np.ndarray: Boolean mask over `idx`, True where the board has no free cell left.
+        """
+        keys = self.rng.random((len(idx), self.num_cells))
+        keys[self.occupied[idx]] = -1.0
+        cells = np.argmax(keys, axis=1)
+        self.food[idx] = cells
+        return keys[np.arange(len(idx)), cells] < 0
+
+    def step(self, actions: np.ndarray):
+        """
+        Advance every game by one time step.
+
+        Args:
+            actions (np.ndarray): One action per game (0: up, 1: down, 2: left, 3: right).
+
+        Returns:
+            tuple: A tuple (states, rewards, dones) where:
+                - states (np.ndarray): New states; finished games already hold their reset state.
+                - rewards (np.ndarray): Rewards received, same semantics as `SnakeEnv`.
+                - dones (np.ndarray): Whether each game ended on this step.
+        """
+        actions = np.asarray(actions)
+        g = self.grid_size
+        rows = self._rows
+
+        heads = self.body[rows, self.head_idx]
+        hx, hy = heads % g, heads // g
+        fx, fy = self.food % g, self.food // g
+        nx, ny = hx + ACTION_DX[actions], hy + ACTION_DY[actions]
+
+        # Check for collisions with boundaries or self
+        out = (nx < 0) | (ny < 0) | (nx >= g) | (ny >= g)
+        new_cells = np.where(out, 0, ny * g + nx)
+        dones = out | self.occupied[rows, new_cells]
+        alive = np.flatnonzero(~dones)
+
+        # Distance shaping compares squared distances, equivalent to the scalar norm check
+        prev_d2 = (hx - fx) ** 2 + (hy - fy) ** 2
+        new_d2 = (nx - fx) ** 2 + (ny - fy) ** 2
+        distance_reward = np.where(new_d2 < prev_d2, 0.1, -0.1)
+
+        ate = ~dones & (new_cells == self.food)
+        rewards = (np.where(ate, 20.0, -0.1) + distance_reward).astype(np.float32)
+        rewards[dones] = -10.0
+
+        # Move the head of every live snake
+        self.head_idx[alive] = (self.head_idx[alive] - 1) % self.num_cells
+        self.body[alive, self.head_idx[alive]] = new_cells[alive]
+        self.occupied[alive, new_cells[alive]] = True
+
+        # Drop the tail of snakes that did not eat
+        moved = np.flatnonzero(~dones & ~ate)
+        tail_idx = (self.head_idx[moved] + self.length[moved]) % self.num_cells
+        self.occupied[moved, self.body[moved, tail_idx]] = False
+
+        eaten = np.flatnonzero(ate)
+        self.length[eaten] += 1
+        if len(eaten):
+            # A snake that filled the whole board has nowhere left to go
+            dones[eaten[self._place_food(eaten)]] = True
+
+        self.dones = dones.copy()
+        self.reset_envs(np.flatnonzero(dones))
+        return self.get_state(), rewards, dones
+
+    def get_state(self) -> np.ndarray:
+        """
+        Get the states of all games.
+
+        Each row uses the `SnakeEnv.get_state` layout: snake segments from
+        head to tail (padded with -1) followed by the food coordinates.
+
+        Returns:
+            np.ndarray: Array of shape (num_envs, state_size).
+        """
+        n_cells = self.num_cells
+        offsets = np.arange(n_cells)
+        order = (self.head_idx[:, None] + offsets) % n_cells
+        cells = np.take_along_axis(self.body, order, axis=1)
+        valid = offsets < self.length[:, None]
+
+        states = np.empty((self.num_envs, self.state_size), dtype=np.float32)
+        states[:, 0:2 * n_cells:2] = np.where(valid, cells % self.grid_size, -1)
+        states[:, 1:2 * n_cells:2] = np.where(valid, cells // self.grid_size, -1)
+        states[:, -2] = self.food % self.grid_size
+        states[:, -1] = self.food // self.grid_size
+        return states
+
+    def get_num_actions(self) -> int:
+        """
+        Get the number of available actions.
+
+        Returns:
+            int: Number of actions.
+        """
+        return self.num_actions
+
+    def is_done(self) -> np.ndarray:
+        """
+        Check which games ended on the last step.
+
+        Returns:
+            np.ndarray: Boolean array of shape (num_envs,).
+        """
+        return self.dones
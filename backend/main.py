@@ -1,8 +1,23 @@
-from fastapi import FastAPI #type: ignore
-from fastapi.middleware.cors import CORSMiddleware #type: ignore
-from routes.training_routes import router as training_router
-from routes.inference_routes import router as inference_router
-from routes.status_routes import router as status_router
+import asyncio
+import os
+from core.startup import timed, mark_ready
+
+with timed("import_app"):
+    from fastapi import FastAPI #type: ignore
+    from fastapi.middleware.cors import CORSMiddleware #type: ignore
+    from routes.training_routes import router as training_router
+    from routes.inference_routes import router as inference_router
+    from routes.status_routes import router as status_router
+    from routes.run_routes import router as run_router
+    from routes.metrics_routes import router as metrics_router
+    from routes.replay_routes import router as replay_router
+    from routes.evaluation_routes import router as evaluation_router
+    from routes.sweep_routes import router as sweep_router
+    from core.metrics import monitor_event_loop
+    from dependencies import warm_up
+
+# Comma-separated games whose agents are built in the background after startup, e.g. "pong,snake"
+WARMUP_GAMES = [game.strip() for game in os.environ.get("WARMUP_GAMES", "").split(",") if game.strip()]
 
 # === Initialize App ===
 app = FastAPI()
@@ -20,3 +35,26 @@ app.add_middleware(
 app.include_router(training_router)
 app.include_router(inference_router)
 app.include_router(status_router)
+app.include_router(run_router)
+app.include_router(metrics_router)
+app.include_router(replay_router)
+app.include_router(evaluation_router)
+app.include_router(sweep_router)
+
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    app.state.loop_monitor = asyncio.ensure_future(monitor_event_loop())
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    app.state.warm_up = asyncio.ensure_future(warm_up(WARMUP_GAMES)) if WARMUP_GAMES else None
+    mark_ready()
+
+
+@app.on_event("shutdown")
+async def stop_event_loop_monitor():
+    app.state.loop_monitor.cancel()
+    if app.state.warm_up is not None:
+        app.state.warm_up.cancel()
@@ -0,0 +1,91 @@
+import asyncio
+import os
+from functools import partial
+from typing import Optional
+from fastapi import APIRouter  #type: ignore
+
+from core.checkpoint_writer import get_checkpoint_writer
+from core.evaluation import evaluate_policy, evaluation_executor
+from core.paths import is_valid_id
+from dependencies import GAMES, get_agent, get_run_registry, create_env, create_vec_env
+from routes.run_routes import run_model_path
+
+router = APIRouter()
+
+# Evaluation policies run on the NumPy backend with a single thread, to leave the cores to training
+EVALUATION_BACKEND = "numpy"
+EVALUATION_THREADS = 1
+
+
+@router.post("/evaluate")
+async def evaluate(
+    game: str = "pong", episodes: int = 1000, run_id: Optional[str] = None, model_version: Optional[int] = None,
+    num_envs: int = 256, max_steps: int = 1000, seed: Optional[int] = None
+) -> dict:
+    """
+    Play greedy episodes of a policy across a batch of environments and summarize them.
+
+    The policy is the current weights of the game's agent, or of a run's agent
+    when `run_id` is given, or a pinned checkpoint version of that model. The
+    weights are copied into a single-threaded NumPy network and the episodes
+    are played on the evaluation thread, so neither the event loop nor the
+    training of the evaluated agent is blocked.
+
+    Args:
+        game (str): The game identifier (default "pong").
+        episodes (int): Number of episodes to play.
+        run_id (Optional[str]): Run whose model is evaluated, the game's default model if None.
+        model_version (Optional[int]): Checkpoint version to evaluate, the current weights if None.
+        num_envs (int): Number of environments played in parallel.
+        max_steps (int): Steps after which an episode is cut off.
+        seed (Optional[int]): Seed of the environments, random if None.
+
+    Returns:
+        dict: The evaluated model with the return distribution, mean episode length and win rate.
+    """
+    from agents.dqn_agent import load_inference_backend
+    from agents.inference_backends import create_backend
+
+    if game not in GAMES:
+        return {"status": f"Unknown game '{game}', expected one of {', '.join(GAMES)}"}
+    if run_id is not None and not is_valid_id(run_id):
+        return {"status": f"Invalid run id '{run_id}'"}
+    if episodes < 1 or max_steps < 1:
+        return {"status": "episodes and max_steps must be positive"}
+    loop = asyncio.get_running_loop()
+    run = get_run_registry().get(run_id) if run_id is not None else None
+    if run is not None:
+        game, agent, path = run.game, run.agent, run.agent.filename
+        observation = getattr(run.env, "observation_mode", None)
+    elif run_id is None or run_id == game:
+        # The first use of a game's agent imports torch and loads its checkpoint
+        agent = await loop.run_in_executor(None, get_agent, game)
+        path, observation = agent.filename, None
+    else:
+        # Finished run no longer in memory: only its checkpoint is left
+        agent, path, observation = None, run_model_path(game, run_id), None
+
+    probe = create_env(game, observation)
+    state_size, num_actions = probe.state_size, probe.get_num_actions()
+    if model_version is not None or agent is None:
+        checkpoint = path if model_version is None else get_checkpoint_writer().version_path(path, model_version)
+        if checkpoint is None or not os.path.exists(checkpoint):
+            return {"status": f"No checkpoint '{path}'" + (f" version {model_version}" if model_version else "")}
+        backend = await loop.run_in_executor(evaluation_executor, partial(
+            load_inference_backend, EVALUATION_BACKEND, EVALUATION_THREADS, state_size, num_actions, checkpoint
+        ))
+    else:
+        # Copying the weights takes microseconds, and on the loop they cannot change mid-copy
+        backend = create_backend(EVALUATION_BACKEND, agent.model, state_size, EVALUATION_THREADS)
+
+    env = create_vec_env(game, min(max(1, num_envs), episodes, 4096), observation, seed)
+    results = await loop.run_in_executor(
+        evaluation_executor, partial(evaluate_policy, env, backend.actions, episodes, max_steps)
+    )
+    return {
+        "game": game,
+        "run_id": run_id,
+        "model": path,
+        "model_version": model_version,
+        **results,
+    }
@@ -1,45 +1,75 @@
 import asyncio
+from functools import partial
+from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect #type: ignore
 from core.state_machine import State
-from dependencies import get_state_machine, get_env, get_agent
+from core.frame_codec import Frame, FrameStream, send_payload
+from dependencies import (
+    get_state_machine, get_agent, get_env_pool, get_action_server, get_model_registry, set_inference_backend
+)
 
 router = APIRouter()
 
+# Number of open inference sessions per game
+inference_sessions = {}
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for inference.
-    Accepts a 'game' query parameter to determine the game.
+    Accepts a 'game' query parameter to determine the game and an optional
+    'protocol' ("json", "binary" or "delta", see core.frame_codec) for the frame encoding.
+    An optional 'model_version' pins the session to a checkpoint version;
+    otherwise the session follows the latest checkpoint, which is swapped in
+    by the game's model registry as soon as it is written.
+
+    Each session plays its own environment taken from the game's pool, and its
+    action requests are batched with those of every other session by the
+    game's action server.
     """
     await websocket.accept()
     game = websocket.query_params.get("game", "pong")
+    stream = FrameStream(websocket.query_params.get("protocol", "json"))
     state_machine = get_state_machine(game)
-    env = get_env(game)
     agent = get_agent(game)
-    
+    version = websocket.query_params.get("model_version")
+    version = int(version) if version is not None and version.isdigit() else None
+
     if state_machine.state == State.TRAINING:
         await websocket.close(code=1000)
         return
 
-    state_machine.set_state(State.INFERENCING)
-    env.reset()
+    # Loaded models are cached, so this only reads the disk for a new checkpoint
+    registry = get_model_registry(game)
+    if version is not None and registry.get(agent.filename, version) is None:
+        await websocket.close(code=1008)
+        return
+
+    if state_machine.state == State.IDLE:
+        state_machine.set_state(State.INFERENCING)
+    inference_sessions[game] = inference_sessions.get(game, 0) + 1
+    pool = get_env_pool(game)
+    env = pool.acquire()
+    action_server = get_action_server(game, version)
     state_machine.total_reward = 0
     seq = 0
 
     try:
-        agent._load_model()
         while True:
             if state_machine.state == State.PAUSED:
                 await asyncio.sleep(0.1)
                 continue
 
             state = env.get_state()
-            action = agent.get_action(state)
+            action = await action_server.get_action(state)
             next_state, reward, done = env.step(action)
             state_machine.total_reward += reward
 
-            agent.update(state, action, reward, next_state)
-            await websocket.send_json({"state": next_state.tolist(), "seq": seq})
+            handle = action_server.agent.handle
+            frame = {"state": env.get_render_state(), "seq": seq, "model_version": handle.version if handle else None}
+            await send_payload(websocket, stream.encode(Frame(frame, game)))
+            seq += 1
             await asyncio.sleep(0.02)
 
             if done:
@@ -47,11 +77,14 @@ async def websocket_endpoint(websocket: WebSocket):
                 state_machine.total_reward = 0
 
     except WebSocketDisconnect:
-        state_machine.set_state(State.IDLE)
+        pass
     except Exception as e:
         print(f"❌ Error: {e}")
     finally:
-        state_machine.set_state(State.IDLE)
+        pool.release(env)
+        inference_sessions[game] -= 1
+        if inference_sessions[game] == 0 and state_machine.state != State.IDLE:
+            state_machine.set_state(State.IDLE)
 
 @router.post("/inference/pause")
 async def pause_inference(game: str = "pong"):
@@ -67,3 +100,58 @@ async def pause_inference(game: str = "pong"):
         return {"status": "Inference resumed"}
     else:
         return {"status": "Inference is not running"}
+
+
+@router.get("/inference/backends")
+async def compare_inference_backends(game: str = "pong", threads: Optional[int] = None, duration: float = 0.2):
+    """
+    Measure the latency of every inference backend on the game's model.
+
+    The measurement runs in a worker thread, so the event loop keeps serving
+    sessions while it runs.
+
+    Args:
+        game (str): The game identifier (default "pong").
+        threads (Optional[int]): Threads used by the backends, the process setting if None.
+        duration (float): Seconds measured per backend and call type.
+
+    Returns:
+        dict: The selected backend, the measurements and the fastest backend on this host.
+    """
+    from agents.inference_backends import compare_backends, fastest_backend
+    agent = get_agent(game)
+    results = await asyncio.get_running_loop().run_in_executor(
+        None, partial(compare_backends, agent.model, agent.state_size, threads, min(max(duration, 0.01), 2.0))
+    )
+    return {
+        "backend": agent.inference_backend,
+        "threads": agent.inference_threads,
+        "results": results,
+        "fastest": fastest_backend(results),
+    }
+
+
+@router.post("/inference/backend")
+async def select_inference_backend(game: str = "pong", backend: str = "auto", threads: Optional[int] = None):
+    """
+    Select the inference backend of a game, or the fastest one on this host with "auto".
+
+    Args:
+        game (str): The game identifier (default "pong").
+        backend (str): One of the inference backends, or "auto".
+        threads (Optional[int]): Threads used by the backend, the process setting if None.
+
+    Returns:
+        dict: Status message and the selected backend.
+    """
+    from agents.inference_backends import INFERENCE_BACKENDS, compare_backends, fastest_backend
+    if backend == "auto":
+        agent = get_agent(game)
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, partial(compare_backends, agent.model, agent.state_size, threads)
+        )
+        backend = fastest_backend(results)
+    if backend not in INFERENCE_BACKENDS:
+        return {"status": f"Unknown inference backend '{backend}', expected one of {', '.join(INFERENCE_BACKENDS)} or auto"}
+    set_inference_backend(game, backend, threads)
+    return {"status": "Inference backend selected", "backend": backend, "threads": threads}
@@ -0,0 +1,62 @@
+from fastapi import APIRouter  #type: ignore
+from fastapi.responses import PlainTextResponse  #type: ignore
+
+from dependencies import state_machines, broadcasters, get_run_registry
+from core.metrics import Gauge, STEP_LABELS, registry
+from routes.inference_routes import inference_sessions
+
+router = APIRouter()
+
+
+def _runs() -> dict:
+    """
+    Collect the state machine and broadcaster of every known run.
+
+    Returns:
+        dict: (game, run) -> (state_machine, broadcaster or None).
+    """
+    runs = {}
+    for game, state_machine in state_machines.items():
+        runs[(game, game)] = (state_machine, broadcasters.get(game))
+    for run in get_run_registry().list():
+        runs[(run.game, run.run_id)] = (run.state_machine, run.broadcaster)
+    return runs
+
+
+def collect_runtime_metrics() -> list:
+    """
+    Build the gauges that are read from the application state at scrape time.
+
+    Returns:
+        list: The metric families.
+    """
+    steps_per_sec = Gauge("training_steps_per_second", "Environment steps per second over the last window.", STEP_LABELS)
+    updates_per_sec = Gauge("training_updates_per_second", "Agent updates per second over the last window.", STEP_LABELS)
+    episodes_per_sec = Gauge("training_episodes_per_second", "Episodes per second over the last window.", STEP_LABELS)
+    clients = Gauge("websocket_clients", "Connected WebSocket viewers.", STEP_LABELS)
+    queue_depth = Gauge("websocket_queue_depth", "Frames waiting in the fullest client queue of a run.", STEP_LABELS)
+    sessions = Gauge("inference_sessions", "Open inference sessions.", ("game",))
+
+    for (game, run), (state_machine, broadcaster) in _runs().items():
+        steps_per_sec.labels(game, run).set(state_machine.steps_per_sec)
+        updates_per_sec.labels(game, run).set(state_machine.updates_per_sec)
+        episodes_per_sec.labels(game, run).set(state_machine.episodes_per_sec)
+        if broadcaster is None:
+            continue
+        clients.labels(game, run).set(len(broadcaster))
+        depths = [len(channel.queue) for channel in list(broadcaster.clients.values())]
+        queue_depth.labels(game, run).set(max(depths, default=0))
+    for game, count in inference_sessions.items():
+        sessions.labels(game).set(count)
+    return [steps_per_sec, updates_per_sec, episodes_per_sec, clients, queue_depth, sessions]
+
+
+registry.add_collector(collect_runtime_metrics)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Expose the application metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
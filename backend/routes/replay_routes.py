@@ -0,0 +1,140 @@
+import asyncio
+import os
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect #type: ignore
+
+from core.frame_codec import Frame, FrameStream, send_payload
+from core.paths import is_inside, is_valid_id
+from core.trajectories import EpisodeReplay, TrajectoryStore
+from dependencies import create_env
+from routes.training_routes import RECORDINGS_DIR
+
+router = APIRouter()
+
+# Opened recordings by run id, refreshed on access
+trajectory_stores = {}
+
+
+def get_trajectory_store(run_id: str) -> Optional[TrajectoryStore]:
+    """
+    Get the recording of a run, indexing the episodes appended since the last access.
+
+    Args:
+        run_id (str): Identifier of the run.
+
+    Returns:
+        Optional[TrajectoryStore]: The recording, or None if the run was not recorded or the id is invalid.
+    """
+    if not is_valid_id(run_id):
+        return None
+    directory = os.path.join(RECORDINGS_DIR, run_id)
+    if not is_inside(directory, RECORDINGS_DIR) or not TrajectoryStore.exists(directory):
+        trajectory_stores.pop(run_id, None)
+        return None
+    store = trajectory_stores.get(run_id)
+    if store is None:
+        store = trajectory_stores[run_id] = TrajectoryStore(directory)
+    else:
+        store.refresh()
+    return store
+
+
+@router.get("/replay/{run_id}/episodes")
+async def list_recorded_episodes(run_id: str, offset: int = 0, limit: int = 100) -> dict:
+    """
+    List the recorded episodes of a run.
+
+    Args:
+        run_id (str): Identifier of the run.
+        offset (int): Index of the first episode.
+        limit (int): Maximum number of episodes.
+
+    Returns:
+        dict: The game, the number of episodes and a page of episodes.
+    """
+    if not is_valid_id(run_id):
+        return {"status": f"Invalid run id '{run_id}'"}
+    store = get_trajectory_store(run_id)
+    if store is None:
+        return {"status": f"No recording for run '{run_id}'"}
+    return {"run_id": run_id, "game": store.game, "count": len(store), "episodes": store.episodes(offset, limit)}
+
+
+@router.websocket("/ws/replay")
+async def replay_ws(websocket: WebSocket) -> None:
+    """
+    WebSocket endpoint streaming a recorded episode.
+
+    Frames are rebuilt by re-simulating the environment from the episode seed
+    and recorded actions; the model is never used. The endpoint accepts a
+    'run_id', an 'episode' index (the last episode by default), a 'start' step,
+    an 'fps' playback rate and a 'protocol' ("json", "binary" or "delta").
+    Playback is controlled with {"type": "seek", "value": step},
+    {"type": "pause"}, {"type": "resume"} and {"type": "config", "value": {"fps": ...}}
+    messages. When the episode ends the last frame stays on screen until a seek.
+
+    Args:
+        websocket (WebSocket): The WebSocket connection.
+    """
+    params = websocket.query_params
+    store = get_trajectory_store(params.get("run_id", ""))
+    try:
+        episode = int(params.get("episode", -1))
+        start = int(params.get("start", 0))
+        fps = float(params.get("fps", 30))
+    except ValueError:
+        store = None
+    if store is None or not -len(store) <= episode < len(store):
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+
+    seed, actions = store.load(episode % len(store))
+    replay = EpisodeReplay(create_env(store.game, store.observation), seed, actions)
+    replay.seek(start)
+    stream = FrameStream(params.get("protocol", "json"))
+    control = {"interval": 1.0 / fps if fps > 0 else 0.0, "paused": False, "dirty": True}
+    wakeup = asyncio.Event()
+
+    async def receive_controls() -> None:
+        try:
+            while True:
+                message = await websocket.receive_json()
+                try:
+                    kind = message.get("type")
+                    if kind == "seek":
+                        replay.seek(int(message.get("value", 0)))
+                        control["dirty"] = True
+                    elif kind in ("pause", "resume"):
+                        control["paused"] = kind == "pause"
+                    elif kind == "config" and "fps" in message.get("value", {}):
+                        fps = float(message["value"]["fps"])
+                        control["interval"] = 1.0 / fps if fps > 0 else 0.0
+                except (AttributeError, TypeError, ValueError):
+                    continue  # Ignore malformed control messages
+                wakeup.set()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            wakeup.set()
+
+    receiver = asyncio.ensure_future(receive_controls())
+    try:
+        while not receiver.done():
+            if control["dirty"]:
+                control["dirty"] = False
+                await send_payload(websocket, stream.encode(Frame(replay.frame(), store.game)))
+            if control["paused"] or replay.finished:
+                if not control["dirty"]:
+                    wakeup.clear()
+                    await wakeup.wait()
+                continue
+            replay.step()
+            control["dirty"] = True
+            await asyncio.sleep(control["interval"])
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"❌ Replay error: {e}")
+    finally:
+        receiver.cancel()
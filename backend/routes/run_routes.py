@@ -0,0 +1,197 @@
+import asyncio
+import os
+import uuid
+from functools import partial
+from typing import Optional
+from fastapi import APIRouter  #type: ignore
+
+from core.broadcaster import FrameBroadcaster
+from core.paths import is_valid_id
+from core.run_registry import TrainingRun
+from core.state_machine import State, StateMachine
+from dependencies import GAMES, get_run_registry, create_env
+from routes.training_routes import TRAINING_MODES, run_training
+
+router = APIRouter()
+
+
+def run_model_path(game: str, run_id: str) -> str:
+    """
+    Path of the checkpoint file of a run; runs start from the game's model but checkpoint to their own file.
+    """
+    return os.path.join("models", f"dqn_model_{game}_{run_id}.pth")
+
+
+def build_run_agent(env, game: str, run_id: str, **kwargs):
+    """
+    Build the agent of a run, starting from the game's saved model.
+
+    Imports torch and reads the checkpoint, so it is meant to run in a worker thread.
+
+    Args:
+        env: The environment of the run.
+        game (str): The game identifier.
+        run_id (str): Identifier of the run, used for its model file and metric labels.
+        **kwargs: Hyperparameters passed to DQNAgent.
+
+    Returns:
+        DQNAgent: The initialized agent, saving to the run's model file.
+    """
+    from agents.dqn_agent import DQNAgent
+    agent = DQNAgent(**kwargs)
+    agent.initialize(env, game)
+    agent.filename = run_model_path(game, run_id)
+    agent.metric_labels = (game, run_id)
+    return agent
+
+
+@router.get("/runs")
+async def list_runs() -> dict:
+    """
+    List all training runs and the scheduler's core usage.
+
+    Returns:
+        dict: The runs and scheduler state.
+    """
+    registry = get_run_registry()
+    return {
+        "max_cpus": registry.max_cpus,
+        "cpus_in_use": registry.cpus_in_use,
+        "reserved_cpus": registry.reserved_cpus,
+        "queued": [run.run_id for run in registry.queue],
+        "runs": [run.to_dict() for run in registry.list()],
+    }
+
+
+@router.post("/runs/start")
+async def start_run(
+    game: str = "pong", mode: str = "turbo", steps_per_tick: int = 1000, fps: float = 20.0,
+    max_episodes: int = 100, num_actors: int = 4, learning_rate: float = 0.001,
+    gamma: float = 0.99, epsilon_decay: float = 0.995, checkpoint_every: int = 0,
+    observation: Optional[str] = None, record: bool = True, run_id: Optional[str] = None, worker: bool = True
+) -> dict:
+    """
+    Create a training run with its own state machine, environment and agent, and schedule it.
+
+    Args:
+        game (str): The game identifier (default "pong").
+        mode (str): "normal", "turbo" or "distributed".
+        steps_per_tick (int): Steps run between event loop yields in turbo mode.
+        fps (float): Snapshot rate for visualization clients.
+        max_episodes (int): Number of episodes to train for.
+        num_actors (int): Number of actor processes in distributed mode.
+        learning_rate (float): Learning rate of the run's agent.
+        gamma (float): Discount factor of the run's agent.
+        epsilon_decay (float): Exploration decay of the run's agent.
+        checkpoint_every (int): Save a checkpoint every N episodes (0 disables it).
+        observation (Optional[str]): Observation mode of the run's environment, the game's default if omitted.
+        record (bool): Record the episodes (seed and actions) for replay.
+        run_id (Optional[str]): Identifier for the run (letters, digits, '_' and '-', not a game name),
+            generated if omitted.
+        worker (bool): Run normal and turbo training in a compute worker process instead of on the event loop.
+
+    Returns:
+        dict: Status message and the run.
+    """
+    if mode not in TRAINING_MODES:
+        return {"status": f"Unknown training mode '{mode}'"}
+
+    if game not in GAMES:
+        return {"status": f"Unknown game '{game}', expected one of {', '.join(GAMES)}"}
+    run_id = run_id or uuid.uuid4().hex[:8]
+    if not is_valid_id(run_id):
+        return {"status": f"Invalid run id '{run_id}'"}
+    if run_id in GAMES:
+        # The id of a game is reserved for its default run
+        return {"status": f"Run id '{run_id}' is reserved for the default run of that game"}
+
+    registry = get_run_registry()
+    existing = registry.get(run_id)
+    if existing is not None and existing.is_active():
+        return {"status": f"Run '{run_id}' is already active"}
+
+    try:
+        env = create_env(game, observation)
+    except ValueError as e:
+        return {"status": str(e)}
+    # Importing torch and reading the checkpoint would stall the event loop
+    agent = await asyncio.get_running_loop().run_in_executor(None, partial(
+        build_run_agent, env, game, run_id,
+        learning_rate=learning_rate, gamma=gamma, epsilon_decay=epsilon_decay
+    ))
+    existing = registry.get(run_id)
+    if existing is not None and existing.is_active():
+        return {"status": f"Run '{run_id}' is already active"}
+    state_machine = StateMachine()
+    state_machine.max_episodes = max_episodes
+    run = TrainingRun(
+        run_id, game, state_machine, env, agent, FrameBroadcaster(game, run_id), mode,
+        {"steps_per_tick": steps_per_tick, "fps": fps, "num_actors": max(1, num_actors),
+         "checkpoint_every": checkpoint_every, "record": record, "worker": worker}
+    )
+    started = registry.submit(run, run_training)
+    return {"status": "Run started" if started else "Run queued", "run": run.to_dict()}
+
+
+@router.get("/runs/{run_id}")
+async def get_run(run_id: str) -> dict:
+    """
+    Get the status of a training run.
+
+    Args:
+        run_id (str): Identifier of the run.
+
+    Returns:
+        dict: The run, or a status message if it does not exist.
+    """
+    run = get_run_registry().get(run_id)
+    if run is None:
+        return {"status": f"Unknown run '{run_id}'"}
+    return run.to_dict()
+
+
+@router.post("/runs/{run_id}/pause")
+async def pause_run(run_id: str) -> dict:
+    """
+    Pause or resume a training run depending on its current state.
+
+    Args:
+        run_id (str): Identifier of the run.
+
+    Returns:
+        dict: Status message.
+    """
+    run = get_run_registry().get(run_id)
+    if run is None:
+        return {"status": f"Unknown run '{run_id}'"}
+    state_machine = run.state_machine
+    if state_machine.state == State.TRAINING:
+        state_machine.set_state(State.PAUSED)
+        return {"status": "Run paused"}
+    elif state_machine.state == State.PAUSED:
+        state_machine.set_state(State.TRAINING)
+        return {"status": "Run resumed"}
+    return {"status": "Run is not running"}
+
+
+@router.post("/runs/{run_id}/stop")
+async def stop_run(run_id: str) -> dict:
+    """
+    Stop a running training run, or remove it from the queue.
+
+    Args:
+        run_id (str): Identifier of the run.
+
+    Returns:
+        dict: Status message.
+    """
+    registry = get_run_registry()
+    run = registry.get(run_id)
+    if run is None:
+        return {"status": f"Unknown run '{run_id}'"}
+    if registry.cancel(run_id):
+        return {"status": "Run cancelled"}
+    if run.state_machine.state in (State.TRAINING, State.PAUSED):
+        run.state_machine.set_state(State.IDLE)
+        return {"status": "Run stopped"}
+    return {"status": "Run is not running"}
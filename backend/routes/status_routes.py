@@ -1,4 +1,5 @@
 from fastapi import APIRouter  #type: ignore
+from core.startup import startup_report
 from dependencies import get_state_machine
 
 router = APIRouter()
@@ -15,5 +16,11 @@ async def get_training_status(game: str = "pong"):
         "current_episode": state_machine.current_episode,
         "average_reward": average_reward,
         "current_reward": state_machine.current_reward,
+        "total_steps": state_machine.total_steps,
+        "steps_per_sec": state_machine.steps_per_sec,
+        "updates_per_sec": state_machine.updates_per_sec,
+        "episodes_per_sec": state_machine.episodes_per_sec,
+        "rolling": state_machine.episode_log.summary() if state_machine.episode_log else None,
+        "startup": startup_report(),
         "status": state_machine.state.value
     }
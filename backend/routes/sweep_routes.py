@@ -0,0 +1,277 @@
+import asyncio
+import math
+import os
+import uuid
+from functools import partial
+from typing import Optional
+from fastapi import APIRouter, Body, WebSocket, WebSocketDisconnect #type: ignore
+
+from core.episode_log import CURVE_FIELDS
+from core.paths import is_valid_id
+from core.sweep import Sweep
+from dependencies import GAMES, create_env, get_run_registry
+
+router = APIRouter()
+
+SWEEPS_DIR = "sweeps"
+
+# Opened sweeps by sweep id
+sweeps = {}
+
+
+def get_sweep(sweep_id: str) -> Optional[Sweep]:
+    """
+    Get a sweep, opening it from disk if it is not in memory.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+
+    Returns:
+        Optional[Sweep]: The sweep, or None if it does not exist or the id is invalid.
+    """
+    if not is_valid_id(sweep_id):
+        return None
+    if sweep_id not in sweeps:
+        directory = os.path.join(SWEEPS_DIR, sweep_id)
+        if not Sweep.exists(directory):
+            return None
+        sweeps[sweep_id] = Sweep(directory)
+    return sweeps[sweep_id]
+
+
+def start_sweep_task(sweep: Sweep) -> None:
+    config = sweep.config
+    sweep.task = asyncio.ensure_future(sweep.run(
+        partial(create_env, config["game"], config["observation"]), cpus=get_run_registry()
+    ))
+    sweep.task.add_done_callback(lambda task: None if task.cancelled() or task.exception() is None else print(
+        f"❌ Sweep error: {task.exception()}"
+    ))
+
+
+@router.post("/sweeps/start")
+async def start_sweep(
+    space: dict = Body(...), game: str = "pong", observation: Optional[str] = None, num_trials: int = 16,
+    max_episodes: int = 243, min_episodes: int = 9, reduction_factor: int = 3, max_steps: int = 1000,
+    window: int = 20, max_workers: Optional[int] = None, seed: int = 0, sweep_id: Optional[str] = None
+) -> dict:
+    """
+    Start a hyperparameter sweep of DQNAgent over a search space.
+
+    The request body is the search space, e.g.
+    {"learning_rate": {"low": 1e-4, "high": 1e-2, "log": true}, "hidden_sizes": [[64, 64], [128, 128]]}.
+    Each trial trains a fresh agent in its own process; trials whose mean
+    return over the last `window` episodes falls behind at a rung are stopped.
+
+    Args:
+        space (dict): Distribution of each hyperparameter (see core.sweep.SearchSpace).
+        game (str): The game identifier (default "pong").
+        observation (Optional[str]): Observation mode of the environments, the game's default if None.
+        num_trials (int): Number of configurations sampled.
+        max_episodes (int): Episodes of a trial that is never stopped.
+        min_episodes (int): Episodes before the first early-stopping decision.
+        reduction_factor (int): Only the top 1 / reduction_factor of the trials pass each rung.
+        max_steps (int): Steps after which an episode is cut off.
+        window (int): Episodes averaged into the metric of a trial.
+        max_workers (Optional[int]): Trials trained at most at once, the run registry's core count if None;
+            each trial takes a free core from the registry, so sweeps and training runs share its budget.
+        seed (int): Seed of the sampled configurations and of the trials.
+        sweep_id (Optional[str]): Identifier of the sweep, generated if None.
+
+    Returns:
+        dict: Status message and the sweep summary.
+    """
+    if game not in GAMES:
+        return {"status": f"Unknown game '{game}', expected one of {', '.join(GAMES)}"}
+    sweep_id = sweep_id or uuid.uuid4().hex[:8]
+    if not is_valid_id(sweep_id):
+        return {"status": f"Invalid sweep id '{sweep_id}'"}
+    directory = os.path.join(SWEEPS_DIR, sweep_id)
+    if sweep_id in sweeps or Sweep.exists(directory):
+        return {"status": f"Sweep '{sweep_id}' already exists, resume it instead"}
+    try:
+        create_env(game, observation)
+        sweep = Sweep(directory, {
+            "game": game,
+            "observation": observation,
+            "space": space,
+            "num_trials": max(1, num_trials),
+            "max_episodes": max(1, max_episodes),
+            "min_episodes": max(1, min_episodes),
+            "reduction_factor": reduction_factor,
+            "max_steps": max(1, max_steps),
+            "window": max(1, window),
+            "max_workers": max(1, max_workers or get_run_registry().max_cpus),
+            "seed": seed,
+        })
+    except ValueError as e:
+        return {"status": str(e)}
+    sweeps[sweep_id] = sweep
+    start_sweep_task(sweep)
+    return {"status": "Sweep started", "sweep": sweep.summary()}
+
+
+@router.post("/sweeps/{sweep_id}/resume")
+async def resume_sweep(sweep_id: str) -> dict:
+    """
+    Resume an interrupted sweep: its pending trials are run, finished trials are kept.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+
+    Returns:
+        dict: Status message and the sweep summary.
+    """
+    sweep = get_sweep(sweep_id)
+    if sweep is None:
+        return {"status": f"No sweep '{sweep_id}'"}
+    if sweep.is_active():
+        return {"status": f"Sweep '{sweep_id}' is already running"}
+    start_sweep_task(sweep)
+    return {"status": "Sweep resumed", "sweep": sweep.summary()}
+
+
+@router.post("/sweeps/{sweep_id}/stop")
+async def stop_sweep(sweep_id: str) -> dict:
+    """
+    Stop a sweep; the trials it interrupts are run again on resume.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+
+    Returns:
+        dict: Status message.
+    """
+    sweep = sweeps.get(sweep_id)
+    if sweep is None or not sweep.is_active():
+        return {"status": f"Sweep '{sweep_id}' is not running"}
+    sweep.stop()
+    return {"status": "Sweep stopping"}
+
+
+@router.get("/sweeps")
+async def list_sweeps() -> dict:
+    """
+    List the sweeps stored on disk.
+
+    Returns:
+        dict: Identifier, game, progress and best metric of every sweep.
+    """
+    sweep_ids = sorted(os.listdir(SWEEPS_DIR)) if os.path.isdir(SWEEPS_DIR) else []
+    result = []
+    for sweep_id in sweep_ids:
+        sweep = get_sweep(sweep_id)
+        if sweep is not None:
+            summary = sweep.summary()
+            best = summary["best"]
+            result.append({
+                "sweep_id": sweep_id,
+                "game": sweep.config["game"],
+                "active": summary["active"],
+                "counts": summary["counts"],
+                "best_metric": best["metric"] if best else None,
+            })
+    return {"sweeps": result}
+
+
+@router.get("/sweeps/{sweep_id}")
+async def get_sweep_summary(sweep_id: str) -> dict:
+    """
+    Get the configuration, rung milestones and ranked trials of a sweep.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+
+    Returns:
+        dict: The sweep summary.
+    """
+    sweep = get_sweep(sweep_id)
+    if sweep is None:
+        return {"status": f"No sweep '{sweep_id}'"}
+    return sweep.summary()
+
+
+@router.get("/sweeps/{sweep_id}/trials/{trial_id}/episodes")
+async def get_trial_episodes(sweep_id: str, trial_id: int, field: str = "reward", points: int = 500) -> dict:
+    """
+    Get a downsampled curve of an episode field of a trial.
+
+    Args:
+        sweep_id (str): Identifier of the sweep.
+        trial_id (int): The trial.
+        field (str): Episode field to plot, one of CURVE_FIELDS.
+        points (int): Maximum number of points of the curve.
+
+    Returns:
+        dict: The curve and the rolling statistics of the trial.
+    """
+    sweep = get_sweep(sweep_id)
+    if sweep is None or not 0 <= trial_id < len(sweep.trials):
+        return {"status": f"No trial {trial_id} in sweep '{sweep_id}'"}
+    if field not in CURVE_FIELDS:
+        return {"status": f"Unknown field '{field}', expected one of {', '.join(CURVE_FIELDS)}"}
+    log = sweep.trial_log(trial_id)
+    if log is None:
+        return {"status": f"Trial {trial_id} has not started"}
+    return {
+        "trial": sweep.trials[trial_id],
+        "curve": log.downsample(field, points=max(1, points)),
+        "rolling": log.summary(),
+    }
+
+
+@router.websocket("/ws/sweep")
+async def sweep_ws(websocket: WebSocket) -> None:
+    """
+    WebSocket endpoint streaming the progress of a sweep.
+
+    The endpoint accepts a 'sweep_id' and an 'interval' in seconds (default 0.5).
+    Every interval it sends the trial table and the episodes each running
+    trial played since the previous message, as {"trials": [...],
+    "episodes": {trial_id: [[episode, length, reward, epsilon, loss], ...]}}.
+    Episodes are read back from the trial logs, so a slow client gets larger
+    messages but never misses an episode.
+
+    Args:
+        websocket (WebSocket): The WebSocket connection.
+    """
+    try:
+        interval = max(0.05, float(websocket.query_params.get("interval", 0.5)))
+    except ValueError:
+        interval = math.nan
+    if not math.isfinite(interval):
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    sweep = get_sweep(websocket.query_params.get("sweep_id", ""))
+    if sweep is None:
+        await websocket.close(code=1008)
+        return
+    cursors = {}  # Trial id -> (log, episodes already sent)
+    try:
+        while True:
+            episodes = {}
+            for trial_id in set(sweep.logs) | set(cursors):
+                log = sweep.logs.get(trial_id)
+                previous, start = cursors.pop(trial_id, (None, 0))
+                if log is None:
+                    # Finished since the last message: send its remaining episodes from disk
+                    log = sweep.trial_log(trial_id) if previous is not None else None
+                    if log is None:
+                        continue
+                elif log is not previous:
+                    start = 0  # Started, or restarted from scratch
+                records = [record for chunk in log.chunks(start) for record in chunk.tolist()]
+                if trial_id in sweep.logs:
+                    cursors[trial_id] = (log, start + len(records))
+                if records:
+                    episodes[trial_id] = [
+                        [episode, length, reward, epsilon, None if loss != loss else loss]
+                        for episode, length, reward, epsilon, loss, _, _ in records
+                    ]
+            await websocket.send_json({"active": sweep.is_active(), "trials": sweep.trials, "episodes": episodes})
+            await asyncio.sleep(interval)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"❌ Sweep WS error: {e}")
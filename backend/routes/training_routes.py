@@ -1,81 +1,154 @@
 import asyncio
+import os
+import time
+from functools import partial
+from typing import Optional
+import numpy as np
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect #type: ignore
 
-from dependencies import get_state_machine, get_env, get_agent
+from dependencies import GAMES, get_state_machine, get_env, get_agent, get_broadcaster, get_run_registry, create_env
 from core.state_machine import State
+from core.run_registry import TrainingRun
+from core.checkpoint_writer import get_checkpoint_writer
+from core.metrics import StepMetrics
+from core.episode_log import CURVE_FIELDS, EpisodeLog
+from core.trajectories import TrajectoryRecorder
+from core.training import training_step
+from core.paths import is_valid_id
 
 router = APIRouter()
 
-# Global task for training process
-training_task = None
+TRAINING_MODES = ("normal", "turbo", "distributed")
 
-# Set of connected WebSocket clients for training visualization
-training_ws_clients = set()
+# Episode logs and recordings are stored in one sub-directory per run
+TELEMETRY_DIR = "telemetry"
+RECORDINGS_DIR = "recordings"
 
 
-async def broadcast_training_state(game: str, data: dict) -> None:
+def build_training_update(state_machine, next_state, sequence: int) -> dict:
     """
-    Broadcast training updates to all connected WebSocket clients.
+    Build the payload sent to training visualization clients.
 
     Args:
-        game (str): The game identifier.
-        data (dict): The training update data.
+        state_machine: The state machine of the game.
+        next_state: Latest environment state.
+        sequence (int): Sequence number of the update.
+
+    Returns:
+        dict: The training update data.
     """
-    for ws in list(training_ws_clients):
-        try:
-            await ws.send_json(data)
-        except Exception as e:
-            print("Error broadcasting training state:", e)
-            training_ws_clients.remove(ws)
+    return {
+        "current_episode": state_machine.current_episode,
+        "current_reward": state_machine.current_reward,
+        "average_reward": (state_machine.total_reward / state_machine.num_episodes_completed)
+                          if state_machine.num_episodes_completed > 0 else 0,
+        "steps_per_sec": state_machine.steps_per_sec,
+        "state": np.array(next_state, dtype=np.float32),
+        "seq": sequence
+    }
+
+
+def agent_kwargs(agent) -> dict:
+    """
+    Hyperparameters to rebuild a DQNAgent in a training process.
 
+    Args:
+        agent: The run's agent.
 
-async def training_loop(game: str) -> None:
+    Returns:
+        dict: Keyword arguments of DQNAgent.
+    """
+    return {
+        "learning_rate": agent.learning_rate,
+        "gamma": agent.gamma,
+        "epsilon": agent.epsilon,
+        "epsilon_decay": agent.epsilon_decay,
+        "epsilon_min": agent.epsilon_min,
+        "buffer_capacity": agent.buffer_capacity,
+        "batch_size": agent.batch_size,
+        "train_freq": agent.train_freq,
+        "learning_starts": agent.learning_starts,
+        "prioritized_replay": agent.prioritized_replay,
+        "hidden_sizes": agent.hidden_sizes,
+    }
+
+
+def auto_checkpoint(run: TrainingRun, next_checkpoint: int) -> int:
+    """
+    Save the run's model in the background once every `checkpoint_every` episodes.
+
+    Args:
+        run (TrainingRun): The run; its options hold `checkpoint_every` (0 disables it).
+        next_checkpoint (int): Episode count at which the next checkpoint is due.
+
+    Returns:
+        int: Episode count at which the following checkpoint is due.
+    """
+    every = run.options.get("checkpoint_every", 0)
+    completed = run.state_machine.num_episodes_completed
+    if every <= 0 or completed < next_checkpoint:
+        return next_checkpoint
+    (run.worker or run.agent).save_model()
+    return (completed // every + 1) * every
+
+
+async def training_loop(run: TrainingRun) -> None:
     """
     Main training loop. Executes training steps until the training is stopped or completed.
 
+    In "normal" mode one step is run and broadcast every 100 ms. In "turbo" mode
+    `steps_per_tick` steps are run back to back between event loop yields, and
+    viewers only receive a snapshot of the latest state at `fps` frames per second.
+
     Args:
-        game (str): The game identifier.
+        run (TrainingRun): The run to execute; its options hold `steps_per_tick` and `fps`.
     """
-    state_machine = get_state_machine(game)
-    env = get_env(game)
-    agent = get_agent(game)
+    state_machine, env, agent = run.state_machine, run.env, run.agent
+    mode = run.mode
+    steps_per_tick = max(1, run.options.get("steps_per_tick", 1000))
+    fps = run.options.get("fps", 20.0)
     state_machine.set_state(State.TRAINING)
 
     sequence = 0  # Sequence counter for updates
-
-    while state_machine.state == State.TRAINING and state_machine.current_episode < state_machine.max_episodes:
+    frame_interval = 1.0 / fps if fps > 0 else float("inf")
+    last_frame = 0.0
+    next_checkpoint = run.options.get("checkpoint_every", 0)
+    metrics = StepMetrics(run.game, run.run_id)
+    recorder = run.recorder
+    if recorder is not None:
+        # Start from a fresh episode so the first recorded one is complete
+        env.reset()
+        recorder.start_episode(env.episode_seed)
+
+    while (state_machine.state in (State.TRAINING, State.PAUSED)
+           and state_machine.current_episode < state_machine.max_episodes):
         if state_machine.state == State.PAUSED:
             await asyncio.sleep(0.1)
             continue
 
-        # Get current state and perform training step
-        state = env.get_state()
-        action = agent.get_action(state)
-        next_state, reward, done = env.step(action)
-        agent.update(state, action, reward, next_state)
-
-        state_machine.current_reward += reward
-        sequence += 1
-
-        # Prepare training update data
-        training_update = {
-            "current_episode": state_machine.current_episode,
-            "current_reward": state_machine.current_reward,
-            "average_reward": (state_machine.total_reward / state_machine.num_episodes_completed)
-                              if state_machine.num_episodes_completed > 0 else 0,
-            "state": next_state.tolist() if hasattr(next_state, 'tolist') else next_state,
-            "seq": sequence
-        }
-        await broadcast_training_state(game, training_update)
-
-        if done:
-            env.reset()
-            state_machine.current_episode += 1
-            state_machine.total_reward += reward
-            state_machine.num_episodes_completed += 1
-            state_machine.current_reward = 0
-
-        await asyncio.sleep(0.1)
+        if mode == "turbo":
+            steps = updates = 0
+            while steps < steps_per_tick and state_machine.current_episode < state_machine.max_episodes:
+                next_state, _, _, step_updates = training_step(state_machine, env, agent, metrics, recorder)
+                steps += 1
+                updates += step_updates
+            state_machine.record_throughput(steps, updates)
+            next_checkpoint = auto_checkpoint(run, next_checkpoint)
+            sequence += steps
+
+            now = time.perf_counter()
+            if now - last_frame >= frame_interval:
+                last_frame = now
+                run.broadcaster.publish(build_training_update(state_machine, env.get_render_state(), sequence))
+            # Yield so HTTP requests and WebSockets keep being served
+            await asyncio.sleep(0)
+        else:
+            next_state, _, _, updates = training_step(state_machine, env, agent, metrics, recorder)
+            state_machine.record_throughput(1, updates)
+            next_checkpoint = auto_checkpoint(run, next_checkpoint)
+            sequence += 1
+            run.broadcaster.publish(build_training_update(state_machine, env.get_render_state(), sequence))
+            await asyncio.sleep(0.1)
 
     if state_machine.state != State.IDLE:
         state_machine.set_state(State.IDLE)
@@ -83,29 +156,266 @@ async def training_loop(game: str) -> None:
     print("Training completed or stopped")
 
 
+async def distributed_training_loop(run: TrainingRun) -> None:
+    """
+    Supervise multi-process actor/learner training.
+
+    Environment stepping and learning run in separate processes; this coroutine
+    only mirrors pause/stop requests from the state machine to the workers,
+    copies their progress counters into the state machine and broadcasts the
+    latest frame of the first actor to visualization clients.
+
+    Args:
+        run (TrainingRun): The run to execute; its options hold `num_actors` and `fps`.
+    """
+    from core.actor_learner import ActorLearnerTrainer
+
+    state_machine, agent, game = run.state_machine, run.agent, run.game
+    num_actors = max(1, run.options.get("num_actors", 4))
+    fps = run.options.get("fps", 20.0)
+    trainer = ActorLearnerTrainer(
+        partial(create_env, game, run.env.observation_mode), game, agent.model, num_actors,
+        agent_kwargs=agent_kwargs(agent)
+    )
+    state_machine.set_state(State.TRAINING)
+    trainer.start()
+
+    frame_interval = 1.0 / fps if fps > 0 else 0.5
+    last = trainer.counters.snapshot()
+    sequence = 0
+    next_checkpoint = run.options.get("checkpoint_every", 0)
+    metrics = StepMetrics(game, run.run_id)
+    try:
+        while (state_machine.state in (State.TRAINING, State.PAUSED)
+               and state_machine.current_episode < state_machine.max_episodes
+               and trainer.is_alive()):
+            if state_machine.state == State.PAUSED:
+                trainer.pause()
+            else:
+                trainer.resume()
+            await asyncio.sleep(frame_interval)
+
+            counters = trainer.counters.snapshot()
+            state_machine.record_throughput(counters["steps"] - last["steps"], counters["updates"] - last["updates"])
+            if counters["updates"] != last["updates"]:
+                with agent.weights_lock:
+                    trainer.load_weights(agent.model)
+                agent.weights_version += 1
+            metrics.steps.inc(counters["steps"] - last["steps"])
+            metrics.episodes.inc(counters["episodes"] - last["episodes"])
+            state_machine.current_episode = counters["episodes"]
+            state_machine.num_episodes_completed = counters["episodes"]
+            state_machine.total_reward = counters["reward_sum"]
+            state_machine.current_reward = counters["last_reward"]
+            for length, reward, epsilon, duration, seed, actions in trainer.drain_episodes():
+                state_machine.log_episode(length, reward, epsilon, counters["loss"], duration)
+                if run.recorder is not None:
+                    run.recorder.add_episode(seed, actions, reward)
+            last = counters
+            next_checkpoint = auto_checkpoint(run, next_checkpoint)
+
+            sequence += 1
+            run.broadcaster.publish(build_training_update(state_machine, trainer.frame.numpy(), sequence))
+    finally:
+        await asyncio.get_running_loop().run_in_executor(None, trainer.stop)
+        with agent.weights_lock:
+            trainer.load_weights(agent.model)
+        agent.weights_version += 1
+
+    if state_machine.state != State.IDLE:
+        state_machine.set_state(State.IDLE)
+
+    print("Distributed training completed or stopped")
+
+
+async def worker_training_loop(run: TrainingRun) -> None:
+    """
+    Supervise normal or turbo training running in a compute worker process.
+
+    The worker steps the environment and trains the agent; this coroutine only
+    forwards pause/resume to it over a pipe and, `fps` times per second, reads
+    its counters and latest frame from the shared-memory buffer, merges the
+    stage latencies the worker observed into the run's histograms, writes the
+    finished episodes to the run's log and recording and broadcasts the frame.
+    Each wake-up takes microseconds, so the event loop stays responsive
+    however fast the worker trains.
+
+    Args:
+        run (TrainingRun): The run to execute; its options hold `steps_per_tick` and `fps`.
+    """
+    from core.compute_worker import COUNTER_FIELDS, ComputeWorker, merge_stage_timings
+
+    state_machine, agent, game = run.state_machine, run.agent, run.game
+    fps = run.options.get("fps", 20.0)
+    # In normal mode every step is broadcast, as in the in-process loop
+    frame_interval = 0.1 if run.mode == "normal" else 1.0 / fps if fps > 0 else 0.5
+    worker = ComputeWorker(
+        partial(create_env, game, getattr(run.env, "observation_mode", None)), game, run.mode, agent.model,
+        agent.filename, agent_kwargs(agent), state_machine.max_episodes - state_machine.current_episode,
+        steps_per_tick=run.options.get("steps_per_tick", 1000)
+    )
+    run.worker = worker
+    state_machine.set_state(State.TRAINING)
+    # The worker becomes the only writer of the model file: let queued server-side saves finish first
+    await asyncio.wrap_future(get_checkpoint_writer().flush())
+    worker.start()
+
+    last = dict.fromkeys(COUNTER_FIELDS, 0.0)
+    paused = False
+    first_episode = state_machine.current_episode
+    version = 0
+    next_checkpoint = run.options.get("checkpoint_every", 0)
+    metrics = StepMetrics(game, run.run_id)
+
+    def snapshot(counters, frame):
+        # Counters are copied as floats; the frame only when a new one was published
+        return counters.tolist(), frame.copy() if buffer.version != version else None
+
+    buffer = worker.buffer
+    try:
+        while (state_machine.state in (State.TRAINING, State.PAUSED)
+               and state_machine.current_episode < state_machine.max_episodes
+               and worker.is_alive()):
+            if (state_machine.state == State.PAUSED) != paused:
+                paused = not paused
+                worker.pause() if paused else worker.resume()
+            await asyncio.sleep(frame_interval)
+            worker.poll()
+
+            result = buffer.read(snapshot)
+            if result is None:
+                continue
+            published, (values, frame) = result
+            counters = dict(zip(COUNTER_FIELDS, values))
+            state_machine.record_throughput(counters["steps"] - last["steps"], counters["updates"] - last["updates"])
+            if counters["weights_version"] != last["weights_version"]:
+                with agent.weights_lock:
+                    worker.load_weights(agent.model)
+                agent.weights_version += 1
+            metrics.steps.inc(counters["steps"] - last["steps"])
+            metrics.episodes.inc(counters["episodes"] - last["episodes"])
+            merge_stage_timings(metrics, counters, last)
+            agent.epsilon = counters["epsilon"]
+            agent.last_loss = None if np.isnan(counters["loss"]) else counters["loss"]
+            state_machine.current_episode = first_episode + int(counters["episodes"])
+            state_machine.num_episodes_completed = state_machine.current_episode
+            state_machine.total_reward = counters["total_reward"]
+            state_machine.current_reward = counters["current_reward"]
+            drain_worker_episodes(run)
+            last = counters
+            next_checkpoint = auto_checkpoint(run, next_checkpoint)
+
+            if frame is not None:
+                version = published
+                run.broadcaster.publish(build_training_update(state_machine, frame, int(counters["steps"])))
+    finally:
+        await asyncio.get_running_loop().run_in_executor(None, worker.stop)
+        # The worker published its final weights on exit
+        with agent.weights_lock:
+            worker.load_weights(agent.model)
+        agent.weights_version += 1
+        drain_worker_episodes(run)
+        run.worker = None
+
+    if state_machine.state != State.IDLE:
+        state_machine.set_state(State.IDLE)
+
+    print("Worker training completed or stopped")
+
+
+def drain_worker_episodes(run: TrainingRun) -> None:
+    """
+    Write the episodes finished by a run's compute worker to its episode log and recording.
+
+    Args:
+        run (TrainingRun): A run with a compute worker.
+    """
+    for length, reward, epsilon, loss, duration, seed, actions in run.worker.drain_episodes():
+        run.state_machine.log_episode(length, reward, epsilon, loss, duration)
+        if run.recorder is not None:
+            run.recorder.add_episode(seed, actions, reward)
+
+
+async def run_training(run: TrainingRun) -> None:
+    """
+    Execute a training run with the loop matching its mode.
+
+    Args:
+        run (TrainingRun): The run to execute.
+    """
+    episode_log = run.state_machine.open_episode_log(os.path.join(TELEMETRY_DIR, run.run_id), root=TELEMETRY_DIR)
+    if run.options.get("record", True):
+        run.recorder = TrajectoryRecorder(
+            os.path.join(RECORDINGS_DIR, run.run_id), run.game, getattr(run.env, "observation_mode", None),
+            root=RECORDINGS_DIR
+        )
+    try:
+        if run.mode == "distributed":
+            await distributed_training_loop(run)
+        elif run.uses_worker():
+            await worker_training_loop(run)
+        else:
+            await training_loop(run)
+    finally:
+        episode_log.flush()
+        if run.recorder is not None:
+            run.recorder.close()
+
+
 @router.post("/training/start")
-async def start_training(game: str = "pong") -> dict:
+async def start_training(
+    game: str = "pong", mode: str = "normal", steps_per_tick: int = 1000, fps: float = 20.0,
+    max_episodes: Optional[int] = None, num_actors: int = 4, checkpoint_every: int = 0, record: bool = True,
+    worker: bool = True
+) -> dict:
     """
     Start training if not already running.
 
+    This schedules the default run of the game, whose id is the game name and
+    which uses the game's shared state machine, environment and agent. It is
+    queued if the run registry has no free cores.
+
     Args:
         game (str): The game identifier (default "pong").
+        mode (str): "normal" for paced visual training, "turbo" for headless training,
+            "distributed" for multi-process actor/learner training.
+        steps_per_tick (int): Steps run between event loop yields in turbo mode.
+        fps (float): Snapshot rate for visualization clients in turbo mode.
+        max_episodes (Optional[int]): Number of episodes to train for, if set.
+        num_actors (int): Number of actor processes in distributed mode.
+        checkpoint_every (int): Save a checkpoint every N episodes (0 disables it).
+        record (bool): Record the episodes (seed and actions) for replay.
+        worker (bool): Run normal and turbo training in a compute worker process instead of on the event loop.
 
     Returns:
         dict: Status message.
     """
-    global training_task
+    if game not in GAMES:
+        return {"status": f"Unknown game '{game}', expected one of {', '.join(GAMES)}"}
     state_machine = get_state_machine(game)
+    registry = get_run_registry()
 
     if state_machine.state == State.INFERENCING:
         return {"status": "Cannot start training while inference is running"}
 
-    if state_machine.state != State.TRAINING:
-        state_machine.reset()
-        if training_task is None or training_task.done():
-            training_task = asyncio.ensure_future(training_loop(game))
+    if mode not in TRAINING_MODES:
+        return {"status": f"Unknown training mode '{mode}'"}
+
+    existing = registry.get(game)
+    if existing is not None and existing.is_active():
+        return {"status": "Training is already running"}
+
+    state_machine.reset()
+    if max_episodes is not None:
+        state_machine.max_episodes = max_episodes
+    run = TrainingRun(
+        game, game, state_machine, get_env(game), get_agent(game), get_broadcaster(game), mode,
+        {"steps_per_tick": steps_per_tick, "fps": fps, "num_actors": max(1, num_actors),
+         "checkpoint_every": checkpoint_every, "record": record, "worker": worker}
+    )
+    if registry.submit(run, run_training):
         return {"status": "Training started"}
-    return {"status": "Training is already running"}
+    return {"status": "Training queued"}
 
 
 @router.post("/training/pause")
@@ -140,8 +450,10 @@ async def stop_training(game: str = "pong") -> dict:
     Returns:
         dict: Status message.
     """
+    if get_run_registry().cancel(game):
+        return {"status": "Training stopped"}
     state_machine = get_state_machine(game)
-    if state_machine.state == State.TRAINING:
+    if state_machine.state in (State.TRAINING, State.PAUSED):
         state_machine.set_state(State.IDLE)
         return {"status": "Training stopped"}
     return {"status": "Training is not running"}
@@ -152,15 +464,84 @@ async def save_model(game: str = "pong") -> dict:
     """
     Save the current model.
 
+    The write runs on the checkpoint writer thread, or in the compute worker
+    during worker training, so the event loop keeps serving other requests and
+    WebSockets while the file is written.
+
     Args:
         game (str): The game identifier (default "pong").
 
     Returns:
-        dict: Status message.
+        dict: Status message and the version written.
+    """
+    run = get_run_registry().get(game)
+    if run is not None and run.is_active() and run.uses_worker():
+        # The worker holds the latest weights and is the only writer of the model file while it runs
+        if run.worker is None:
+            return {"status": "The training worker is not running yet, try again"}
+        try:
+            version = await asyncio.wrap_future(run.worker.save_model())
+        except RuntimeError as e:
+            return {"status": f"Model not saved: {e}"}
+        return {"status": "Model saved", "version": version}
+    version = await asyncio.wrap_future(get_agent(game).save_model())
+    return {"status": "Model saved", "version": version}
+
+
+@router.get("/training/checkpoints")
+async def list_checkpoints(game: str = "pong") -> dict:
+    """
+    List the checkpoint versions kept for a game's model.
+
+    Args:
+        game (str): The game identifier (default "pong").
+
+    Returns:
+        dict: The model file and its available versions.
     """
     agent = get_agent(game)
-    agent.save_model()
-    return {"status": "Model saved"}
+    return {"filename": agent.filename, "versions": get_checkpoint_writer().versions(agent.filename)}
+
+
+@router.get("/training/episodes")
+async def get_episodes(
+    game: str = "pong", run_id: Optional[str] = None, field: str = "reward", points: int = 500,
+    start: int = 0, end: Optional[int] = None
+) -> dict:
+    """
+    Get a downsampled curve of an episode field and the rolling statistics of a run.
+
+    The log of a finished run that is no longer in memory is read back from disk.
+
+    Args:
+        game (str): The game identifier, selecting its default run (default "pong").
+        run_id (Optional[str]): Run to query instead of the game's default run.
+        field (str): Episode field to plot, one of CURVE_FIELDS.
+        points (int): Maximum number of points of the curve.
+        start (int): First episode.
+        end (Optional[int]): Episode after the last one, the end of the log if None.
+
+    Returns:
+        dict: The curve (bucket start episodes with mean, min and max) and the rolling statistics.
+    """
+    run_id = run_id or game
+    if not is_valid_id(run_id):
+        return {"status": f"Invalid run id '{run_id}'"}
+    run = get_run_registry().get(run_id)
+    state_machine = run.state_machine if run is not None else get_state_machine(game)
+    episode_log = state_machine.episode_log
+    if episode_log is None or os.path.basename(episode_log.directory) != run_id:
+        directory = os.path.join(TELEMETRY_DIR, run_id)
+        if not EpisodeLog.exists(directory):
+            return {"status": f"No episodes recorded for run '{run_id}'"}
+        episode_log = EpisodeLog(directory)
+    if field not in CURVE_FIELDS:
+        return {"status": f"Unknown field '{field}', expected one of {', '.join(CURVE_FIELDS)}"}
+    return {
+        "run_id": run_id,
+        "curve": episode_log.downsample(field, start, end, max(1, points)),
+        "rolling": episode_log.summary(),
+    }
 
 
 @router.websocket("/ws/training")
@@ -168,21 +549,33 @@ async def training_visualization_ws(websocket: WebSocket) -> None:
     """
     WebSocket endpoint for training visualization.
 
-    The endpoint accepts a 'game' query parameter to identify the game.
+    The endpoint accepts a 'game' query parameter to identify the game (or a 'run_id'
+    to follow a specific run from the run registry), an optional
+    'fps' target frame rate, a 'policy' ("latest" or "drop_oldest") for frames
+    the client is too slow to receive and a 'protocol' ("json", "binary" or "delta",
+    see core.frame_codec) for the frame encoding. The frame rate can be changed later with a
+    {"type": "config", "value": {"fps": ...}} message.
     The training updates are broadcasted from the training_loop.
 
     Args:
         websocket (WebSocket): The WebSocket connection.
     """
     await websocket.accept()
-    # Extract the 'game' parameter from the query (unused in this endpoint but kept for future use)
     game = websocket.query_params.get("game", "pong")
-    training_ws_clients.add(websocket)
+    fps = websocket.query_params.get("fps")
+    policy = websocket.query_params.get("policy", "latest")
+    protocol = websocket.query_params.get("protocol", "json")
+    run = get_run_registry().get(websocket.query_params.get("run_id", ""))
+    broadcaster = run.broadcaster if run is not None else get_broadcaster(game)
+    channel = broadcaster.add(websocket, float(fps) if fps else None, policy, protocol=protocol)
     try:
         while True:
-            await asyncio.sleep(1)
+            message = await websocket.receive_json()
+            if message.get("type") == "config" and "fps" in message.get("value", {}):
+                channel.set_fps(message["value"]["fps"])
     except WebSocketDisconnect:
-        training_ws_clients.remove(websocket)
+        pass
     except Exception as e:
         print("Training visualization WS error:", e)
-        training_ws_clients.remove(websocket)
+    finally:
+        broadcaster.remove(websocket)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from agents.q_table import QTable
+
+
+def fill(table: QTable, keys: list) -> np.ndarray:
+    rows = table.indices(np.array(keys).reshape(-1, 1))
+    table.update(rows, np.zeros(len(rows)), np.zeros(len(rows)), rows, np.ones(len(rows)), 0.5, 0.9)
+    return rows
+
+
+def test_eviction_spares_rows_hit_earlier_in_the_batch():
+    table = QTable(num_actions=2, seed=0, max_states=4, evict_fraction=0.5)
+    fill(table, [0, 1, 2, 3])
+
+    rows = table.indices(np.array([[0], [10]]))
+
+    assert rows[0] != rows[1]
+    assert table.alive[rows].all()
+    assert table.index[table.key_bytes[rows[0]]] == rows[0]
+    assert np.array([0]) in table and np.array([10]) in table
+
+
+def test_eviction_keeps_every_state_mapped_to_its_own_row():
+    table = QTable(num_actions=2, seed=0, max_states=4, evict_fraction=0.5)
+    for start in range(0, 40, 3):
+        rows = fill(table, [start, start + 1, start + 2])
+        assert len(set(rows.tolist())) == 3
+        for key, row in zip(range(start, start + 3), rows.tolist()):
+            assert np.array([key]) in table
+            assert table.index[table.key_bytes[row]] == row
+    assert table.evictions > 0
+    assert len(table.index) == table.size
+
+
+def test_unbounded_table_never_evicts():
+    table = QTable(num_actions=3, capacity=2, seed=0)
+    rows = fill(table, list(range(100)))
+    assert len(table) == 100
+    assert np.array_equal(table.indices(np.arange(100).reshape(-1, 1)), rows)
+    assert table.stats()["evictions"] == 0